@@ -8,7 +8,6 @@ excluded_modules = [
     # HuggingFace相关（大型模块）
     'transformers',
     'datasets',
-    'tokenizers',
     'accelerate',
     'diffusers',
     'huggingface_hub.inference',
@@ -91,8 +90,8 @@ a = Analysis(
     ['src\\main.py'],
     pathex=[],
     binaries=[],
-    datas=[('src/config', 'config'), ('src/ui', 'ui'), ('src/pages', 'pages'), ('src/core', 'core')],
-    hiddenimports=['PyQt6', 'PyQt6.QtWidgets', 'PyQt6.QtCore', 'PyQt6.QtGui', 'qfluentwidgets', 'faster_whisper', 'torch', 'torchaudio', 'requests', 'hupper'],
+    datas=[('src/config', 'config'), ('src/ui', 'ui'), ('src/pages', 'pages'), ('src/core', 'core'), ('src/assets', 'assets')],
+    hiddenimports=['PyQt6', 'PyQt6.QtWidgets', 'PyQt6.QtCore', 'PyQt6.QtGui', 'qfluentwidgets', 'faster_whisper', 'torch', 'torchaudio', 'requests', 'hupper', 'tokenizers'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
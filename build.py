@@ -5,8 +5,37 @@ import os
 import sys
 import subprocess
 import shutil
+import urllib.request
 from pathlib import Path
 
+# DeepSeek分词器，保存路径与 AppConstants.DEEPSEEK_TOKENIZER_ASSET 保持一致
+TOKENIZER_URL = "https://huggingface.co/deepseek-ai/DeepSeek-V3/resolve/main/tokenizer.json"
+TOKENIZER_PATH = Path("src/assets/tokenizer/deepseek_tokenizer.json")
+
+
+def fetch_tokenizer(force=False):
+    """下载DeepSeek分词器到assets目录，打包时随应用分发，运行时不再联网"""
+    if TOKENIZER_PATH.exists() and not force:
+        print(f"✅ 分词器已存在: {TOKENIZER_PATH}")
+        return True
+
+    print(f"📥 正在下载分词器: {TOKENIZER_URL}")
+    TOKENIZER_PATH.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = TOKENIZER_PATH.with_name(TOKENIZER_PATH.name + ".part")
+    try:
+        with urllib.request.urlopen(TOKENIZER_URL, timeout=60) as response, open(temp_path, "wb") as f:
+            shutil.copyfileobj(response, f)
+        os.replace(temp_path, TOKENIZER_PATH)
+        print(f"✅ 分词器已保存: {TOKENIZER_PATH}")
+        return True
+    except OSError as e:
+        print(f"❌ 下载分词器失败: {e}")
+        print("💡 提示: 缺少分词器时Token数按比例估算")
+        return False
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
 
 def build_app():
     """构建应用程序（文件夹版本，推荐）"""
@@ -25,6 +54,9 @@ def build_app():
         print(f"❌ 错误: 找不到 {spec_file} 文件")
         return False
 
+    # 分词器随应用打包，下载失败时仍继续构建
+    fetch_tokenizer()
+
     # 使用优化的spec文件构建（排除模型缓存和大型模块）
     cmd = [
         "uv",
@@ -81,6 +113,8 @@ def build_folder():
         print("❌ 错误: 找不到 src/main.py 文件")
         return False
 
+    fetch_tokenizer()
+
     # 构建命令（不使用 --onefile）
     cmd = [
         "uv",
@@ -93,6 +127,7 @@ def build_folder():
         "--add-data=src/ui;ui",
         "--add-data=src/pages;pages",
         "--add-data=src/core;core",
+        "--add-data=src/assets;assets",
         "--hidden-import=PyQt6",
         "--hidden-import=PyQt6.QtWidgets",
         "--hidden-import=PyQt6.QtCore",
@@ -103,6 +138,7 @@ def build_folder():
         "--hidden-import=torchaudio",
         "--hidden-import=requests",
         "--hidden-import=hupper",
+        "--hidden-import=tokenizers",
         # 排除模型缓存和大文件
         "--exclude-module=transformers",
         "--exclude-module=huggingface_hub.file_download",
@@ -193,6 +229,8 @@ def build_legacy():
         print("❌ 错误: 找不到 src/main.py 文件")
         return False
 
+    fetch_tokenizer()
+
     # 传统构建命令
     cmd = [
         "uv",
@@ -206,6 +244,7 @@ def build_legacy():
         "--add-data=src/ui;ui",
         "--add-data=src/pages;pages",
         "--add-data=src/core;core",
+        "--add-data=src/assets;assets",
         "--hidden-import=PyQt6",
         "--hidden-import=PyQt6.QtWidgets",
         "--hidden-import=PyQt6.QtCore",
@@ -216,6 +255,7 @@ def build_legacy():
         "--hidden-import=torchaudio",
         "--hidden-import=requests",
         "--hidden-import=hupper",
+        "--hidden-import=tokenizers",
         "--clean",
         "--noconfirm",
     ]
@@ -260,6 +300,7 @@ def show_help():
     print("  legacy     - 传统构建方法（备选方案）")
     print("  clean      - 清理构建文件")
     print("  install    - 安装 PyInstaller")
+    print("  tokenizer  - 下载DeepSeek分词器到 src/assets/tokenizer")
     print("  help       - 显示此帮助信息")
     print("")
     print("构建方法说明:")
@@ -292,6 +333,8 @@ def main():
         success = True
     elif command == "install":
         success = install_pyinstaller()
+    elif command == "tokenizer":
+        success = fetch_tokenizer(force=True)
     elif command == "help" or command == "-h" or command == "--help":
         show_help()
         success = True
@@ -113,6 +113,24 @@ class AppConstants:
     REFINE_TIMER_TEXT_TEMPLATE = "耗时：{minutes:02d}:{seconds:02d}"
     REFINE_TIMER_INTERVAL_MS = 1000
     REFINE_TIMER_INITIAL_TEXT = "耗时：00:00"
+    REFINE_CHUNK_PROGRESS_TEMPLATE = "分段: {done}/{total}"
+    REFINE_STREAM_RENDER_INTERVAL_MS = 100  # 流式输出刷新间隔，合并高频增量
+    REFINE_ABORT_BUTTON_TEXT = "停止"
+    REFINE_CACHE_BYPASS_TEXT = "跳过缓存"
+    REFINE_PLAN_DEBOUNCE_MS = 300  # 文案变化后延迟统计Token，合并连续编辑
+    REFINE_PLAN_TEMPLATE = "原文Token: {tokens}{approx}，预计 {chunks} 段，预估费用 ¥{cost:.4f}"
+    REFINE_PLAN_APPROX_SUFFIX = "(估算)"
+    REFINE_TRUNCATION_WARNING = "第 {index} 段预计输出约 {tokens} Token，可能超过 max_tokens={limit} 被截断"
+    REFINE_CACHE_STATS_TEMPLATE = "缓存: 命中 {hits} / 未命中 {misses}"
+    REFINE_USAGE_TEMPLATE = "实际Token: 输入 {prompt}（前缀缓存命中 {hit}）/ 输出 {completion}，费用 ¥{cost:.4f}"
+    REFINE_GLOSSARY_LABEL = "术语表："
+    REFINE_GLOSSARY_PLACEHOLDER = "用逗号分隔，如：DeepSeek, Transformer, 微调"
+    REFINE_GLOSSARY_CONFIG_KEY = "refine_glossary"
+    REFINE_PATCH_MODE_TEXT = "仅返回修改（更快）"
+    REFINE_PATCH_MODE_CONFIG_KEY = "refine_patch_mode"
+    REFINE_INCREMENTAL_TEMPLATE = "仅修复有变化的段落，{reused} 个段落沿用上次结果"
+    # 修复结果与原文逐段的最低相似度（忽略标点和空白），低于该值视为模型调整了分段
+    REFINE_INCREMENTAL_MIN_SIMILARITY = 0.8
 
     # 提取音频页面UI常量
     EXTRACT_AUDIO_MODEL_COMBO_MIN_WIDTH = 150
@@ -160,6 +178,8 @@ class AppConstants:
     OUTPUT_FORMAT_TXT = "txt"
     OUTPUT_FORMAT_SRT = "srt"
     OUTPUT_FORMAT_VTT = "vtt"
+    OUTPUT_FORMAT_JSON = "json"
+    OUTPUT_FORMAT_TSV = "tsv"
     OUTPUT_FORMAT_DEFAULT = OUTPUT_FORMAT_TXT
     OUTPUT_FORMAT_LABEL_TEXT = "输出格式："
     OUTPUT_FORMAT_COMBO_MIN_WIDTH = 100
@@ -219,6 +239,75 @@ class AppConstants:
     ONLINE_AUDIO_PROCESS_BUTTON = "进一步处理音频"
     ONLINE_AUDIO_EXTRACT_TEXT_BUTTON = "提取文案"
     ONLINE_AUDIO_ANALYZE_BUTTON = "分析音频"
+    # yt-dlp输出文件名模板（标题截断到200字节，附加视频ID避免重名）
+    ONLINE_AUDIO_OUTPUT_TEMPLATE = "%(title).200B_%(id)s.%(ext)s"
+
+    # 在线音频后处理配置
+    ONLINE_AUDIO_PROFILE_NATIVE = "native"  # 保留原始音频流，不转码
+    ONLINE_AUDIO_PROFILE_WAV_16K = "wav16k"  # 16kHz单声道WAV，可直接用于转录
+    ONLINE_AUDIO_PROFILE_MP3 = "mp3"  # 192kbps MP3，便于导出分享
+    ONLINE_AUDIO_PROFILE_DEFAULT = ONLINE_AUDIO_PROFILE_NATIVE
+    ONLINE_AUDIO_PROFILE_LABELS = {
+        ONLINE_AUDIO_PROFILE_NATIVE: "原始音频（最快，用于转录）",
+        ONLINE_AUDIO_PROFILE_WAV_16K: "WAV 16kHz 单声道",
+        ONLINE_AUDIO_PROFILE_MP3: "MP3 192kbps（用于导出）",
+    }
+    ONLINE_AUDIO_PROFILE_LABEL_TEXT = "音频格式："
+    ONLINE_AUDIO_PROFILE_COMBO_MIN_WIDTH = 220
+    ONLINE_AUDIO_MP3_QUALITY = "192"
+    ONLINE_AUDIO_WAV_SAMPLE_RATE = "16000"
+    ONLINE_AUDIO_WAV_CHANNELS = "1"
+
+    # 在线音频下载管理常量
+    ONLINE_AUDIO_MAX_CONCURRENT_DOWNLOADS = 3  # 同时下载的视频数
+    ONLINE_AUDIO_CONCURRENT_FRAGMENTS = 4  # 单个视频的分片并发数
+    ONLINE_AUDIO_RETRIES = 10  # 下载及分片重试次数
+    ONLINE_AUDIO_DOWNLOAD_INDEX_FILE = "download_index.json"  # 已下载视频记录
+    ONLINE_AUDIO_BILIBILI_PLAYLIST_MARKERS = [
+        "/medialist/",
+        "/favlist",
+        "/channel/collectiondetail",
+        "/channel/seriesdetail",
+        "/lists/",
+    ]
+    ONLINE_AUDIO_MULTI_INPUT_PLACEHOLDER = (
+        "请输入YouTube或Bilibili视频/播放列表链接，每行一个"
+    )
+    ONLINE_AUDIO_URL_INPUT_HEIGHT = 90
+    ONLINE_AUDIO_TABLE_TITLE = "标题"
+    ONLINE_AUDIO_TABLE_STATUS = "状态"
+    ONLINE_AUDIO_TABLE_PROGRESS = "进度"
+    ONLINE_AUDIO_TABLE_SPEED = "速度"
+    ONLINE_AUDIO_TABLE_ETA = "剩余时间"
+    ONLINE_AUDIO_TABLE_MIN_HEIGHT = 180
+    ONLINE_AUDIO_CANCEL_BUTTON = "取消全部"
+    ONLINE_AUDIO_RETRY_BUTTON = "重试失败"
+    ONLINE_AUDIO_STATUS_TEXT = {
+        "queued": "排队中",
+        "resolving": "解析中",
+        "downloading": "下载中",
+        "postprocessing": "处理中",
+        "completed": "已完成",
+        "skipped": "已下载",
+        "failed": "失败",
+        "cancelled": "已取消",
+    }
+    # 平台字幕常量
+    ONLINE_AUDIO_SUBTITLE_CHECKBOX_TEXT = "优先使用平台字幕（有字幕时跳过语音识别）"
+    ONLINE_AUDIO_SUBTITLE_FORMAT_LABEL_TEXT = "文案格式："
+    ONLINE_AUDIO_SUBTITLE_LANGS = ["zh-Hans", "zh-CN", "zh", "ai-zh", "zh-Hant", "en"]
+    ONLINE_AUDIO_SUBTITLE_EXCLUDED_LANGS = ["live_chat", "danmaku", "rechat"]
+    ONLINE_AUDIO_SUBTITLE_FORMATS = ["vtt", "srt"]  # 可解析的字幕格式，按优先级排列
+    ONLINE_AUDIO_MSG_SUBTITLE_COMPLETE = "已获取平台字幕，无需语音识别"
+
+    # 片段下载配置
+    ONLINE_AUDIO_SECTION_LABEL_TEXT = "下载片段:"
+    ONLINE_AUDIO_SECTION_START_PLACEHOLDER = "开始 (如 1:30)"
+    ONLINE_AUDIO_SECTION_END_PLACEHOLDER = "结束 (留空到结尾)"
+    ONLINE_AUDIO_SECTION_INPUT_WIDTH = 140
+    ONLINE_AUDIO_MSG_INVALID_SECTION = "片段时间格式无效，请使用 HH:MM:SS、MM:SS 或秒数"
+    ONLINE_AUDIO_MSG_SECTION_ORDER = "片段结束时间必须晚于开始时间"
+    ONLINE_AUDIO_MSG_QUEUE_SUMMARY = "共 {total} 个任务，已完成 {done} 个，失败 {failed} 个"
 
     # 模型下载提示信息
     AUDIO_EXTRACT_MSG_DOWNLOADING = "正在下载模型，请稍候..."
@@ -226,13 +315,110 @@ class AppConstants:
     AUDIO_EXTRACT_MSG_DOWNLOAD_FAILED = "模型下载失败，请检查网络连接"
     AUDIO_EXTRACT_MSG_FIRST_RUN = "首次运行需要下载模型文件，这可能需要几分钟时间"
 
+    # 项目索引
+    PROJECT_INDEX_FILE_NAME = "projects_index.sqlite3"
+    PROJECT_INDEX_TIMEOUT = 10  # 等待数据库锁的秒数
+    PROJECT_INDEX_SCHEMA_VERSION = 2  # 结构变化时递增，旧索引会从磁盘重建
+    PROJECT_MSG_CANCELLED = "操作已取消"
+    PROJECT_WORKER_COUNT = 2  # 项目文件操作线程数
+    PROJECT_METADATA_FLUSH_DELAY = 0.5  # 元数据更新合并写入窗口（秒）
+    # 影响列表查询和清理的字段，更新时立即写入元数据文件和索引
+    PROJECT_METADATA_SYNC_FIELDS = frozenset({"status", "pinned"})
+
+    # 项目压缩包：只压缩文本类文件，音频等媒体文件直接存储
+    PROJECT_ARCHIVE_MANIFEST_NAME = "manifest.json"
+    PROJECT_ARCHIVE_FORMAT_VERSION = 1
+    PROJECT_ARCHIVE_COMPRESSED_EXTENSIONS = (
+        ".json", ".txt", ".srt", ".vtt", ".tsv", ".csv", ".md", ".lrc"
+    )
+
+    # 转录片段存储，位于项目的 transcripts 目录下
+    SEGMENT_STORE_DIR_NAME = "segments"
+
+    # 状态管理：进度通知每个通道每帧最多一次
+    STATE_PROGRESS_INTERVAL_MS = 16
+
+    # 项目保留策略
+    RETENTION_CONFIG_MAX_TOTAL_MB = "retention_max_total_mb"
+    RETENTION_CONFIG_MAX_AGE_DAYS = "retention_max_age_days"
+    RETENTION_CONFIG_KEEP_PINNED = "retention_keep_pinned"
+    RETENTION_DEFAULT_MAX_TOTAL_MB = 0  # 0表示不限制总容量
+    # 默认不按状态清理：转录中断或失败的项目也停留在created状态，其中可能有用户的文件
+    RETENTION_DEFAULT_MAX_AGE_DAYS = {}
+    RETENTION_GRACE_SECONDS = 3600  # 最近更新的项目和目录可能正在使用，不清理
+    RETENTION_START_DELAY_MS = 10000  # 启动后延迟执行，避免影响启动速度
+    RETENTION_LOG_PLAN = "项目清理: 工作空间占用 {total} 字节，{count} 项待清理，可回收 {reclaimable} 字节"
+    RETENTION_LOG_REMOVE_FAILED = "项目清理失败"
+    RETENTION_CONFIRM_TITLE = "清理项目工作空间"
+    RETENTION_CONFIRM_TEMPLATE = (
+        "以下 {count} 项可以清理，共可释放 {size:.1f} MB：\n\n{details}\n\n删除后无法恢复，确定要清理吗？"
+    )
+    RETENTION_CONFIRM_MAX_ITEMS = 10  # 确认框中最多列出的项数
+    RETENTION_CONFIRM_MORE_TEMPLATE = "…… 等共 {count} 项"
+    RETENTION_REASON_LABELS = {
+        "orphan": "创建未完成的项目目录",
+        "expired": "超过保留天数",
+        "quota": "超出工作空间容量上限",
+    }
+
+    # 内容寻址存储：相同内容的音频只保存一份
+    PROJECT_BLOB_DIR_NAME = "_blobs"
+    BLOB_FINGERPRINT_FILE_NAME = "fingerprints.sqlite3"
+    BLOB_TEMP_DIR_NAME = ".tmp"  # 写入中的临时文件，中途退出的残留由回收时清理
+    BLOB_CHUNK_SIZE = 4 * 1024 * 1024  # 读写分块大小(字节)
+    BLOB_FICLONE_IOCTL = 0x40049409  # Linux FICLONE，用于btrfs/xfs等文件系统的reflink
+    BLOB_GC_GRACE_SECONDS = 3600  # 最近写入的blob可能尚未被引用，回收时跳过
+
     # DeepSeek API 常量
     DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
     DEEPSEEK_DEFAULT_MODEL = "deepseek-chat"
     DEEPSEEK_DEFAULT_TEMPERATURE = 0.3
     DEEPSEEK_DEFAULT_MAX_TOKENS = 2000
     DEEPSEEK_REQUEST_TIMEOUT = 200
+    DEEPSEEK_CONNECT_TIMEOUT = 10  # 建立连接超时时间(秒)
+    DEEPSEEK_CONNECTIVITY_TIMEOUT = 10  # 连通性检查使用较短的超时时间
+    # 连通性检查请求模型列表接口，只校验密钥和网络，不消耗Token
+    DEEPSEEK_MODELS_URL = "https://api.deepseek.com/models"
+    DEEPSEEK_CONNECTIVITY_CACHE_TTL = 300  # 检查结果缓存时间(秒)，期间重复检查直接返回
+    DEEPSEEK_STATUS_UNAUTHORIZED = 401
+    DEEPSEEK_CONNECTIVITY_TIMINGS_TEMPLATE = "连接 {connect:.0f} ms{reused}，首字节 {ttfb:.0f} ms"
+    DEEPSEEK_CONNECTIVITY_CACHED_SUFFIX = "（{age:.0f} 秒前的检查结果）"
+    DEEPSEEK_POOL_CONNECTIONS = 4  # 连接池缓存的主机数
+    DEEPSEEK_POOL_MAXSIZE = 8  # 每个主机保持的长连接数
+    # 请求调度：限流/服务端错误/超时自动重试，指数退避加随机抖动
+    DEEPSEEK_RETRY_MAX_RETRIES = 4
+    DEEPSEEK_CONNECTIVITY_MAX_RETRIES = 1  # 连通性检查只重试一次，尽快给出结果
+    DEEPSEEK_RETRY_BASE_DELAY = 1.0  # 首次重试基础等待时间(秒)
+    DEEPSEEK_RETRY_MAX_DELAY = 30.0  # 单次重试最长等待时间(秒)
+    DEEPSEEK_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    DEEPSEEK_STATUS_TOO_MANY_REQUESTS = 429
+    DEEPSEEK_MAX_CONCURRENT_PER_KEY = 4  # 同一API密钥同时进行的请求数
+    # 熔断：连续失败达到阈值后在冷却时间内直接失败，不再请求
+    DEEPSEEK_CIRCUIT_FAILURE_THRESHOLD = 5
+    DEEPSEEK_CIRCUIT_RESET_SECONDS = 30.0
     DEEPSEEK_SUCCESS_STATUS_CODE = 200
+    # 分词器：使用随应用打包的DeepSeek分词器，不可用时按官方换算比例估算
+    # 相对于assets目录，构建时由 python build.py tokenizer 下载，运行时不访问网络
+    DEEPSEEK_TOKENIZER_ASSET = "tokenizer/deepseek_tokenizer.json"
+    DEEPSEEK_TOKENS_PER_CJK_CHAR = 0.6  # 官方换算：1个中文字符约0.6个Token
+    DEEPSEEK_TOKENS_PER_OTHER_CHAR = 0.3  # 官方换算：1个英文字符约0.3个Token
+    # 修复后文案与原文长度相近，按输入Token数乘以该系数预估输出Token数
+    DEEPSEEK_OUTPUT_TOKEN_RATIO = 1.1
+    # 价格（元/百万Token），用于预估费用
+    DEEPSEEK_PRICE_INPUT_PER_M = 2.0
+    DEEPSEEK_PRICE_INPUT_CACHE_HIT_PER_M = 0.5
+    DEEPSEEK_PRICE_OUTPUT_PER_M = 8.0
+    # 分段修复：输出长度与输入相近，单段预算需给 max_tokens 留出余量，避免输出被截断
+    DEEPSEEK_CHUNK_TOKEN_BUDGET = 1200
+    DEEPSEEK_MAX_PARALLEL_CHUNKS = 4  # 同时请求的分段数
+    DEEPSEEK_FINISH_REASON_LENGTH = "length"
+    # 提示词模板变更时递增，使旧的缓存结果失效
+    DEEPSEEK_PROMPT_TEMPLATE_VERSION = 2
+
+    # 文案修复结果缓存配置
+    REFINE_CACHE_DIR_NAME = "refine_cache"
+    REFINE_CACHE_MAX_ENTRIES = 1000
+    REFINE_CACHE_MAX_BYTES = 50 * 1024 * 1024
     DEEPSEEK_DEFAULT_DOMAIN = "通用"
 
     # DeepSeek API 请求头常量
@@ -246,16 +432,32 @@ class AppConstants:
     DEEPSEEK_PARAM_MESSAGES = "messages"
     DEEPSEEK_PARAM_TEMPERATURE = "temperature"
     DEEPSEEK_PARAM_MAX_TOKENS = "max_tokens"
+    DEEPSEEK_PARAM_STREAM = "stream"
+    DEEPSEEK_PARAM_RESPONSE_FORMAT = "response_format"
+    DEEPSEEK_RESPONSE_FORMAT_JSON = {"type": "json_object"}
+    DEEPSEEK_SSE_DATA_PREFIX = "data:"
+    DEEPSEEK_SSE_DONE = "[DONE]"
     DEEPSEEK_MESSAGE_ROLE = "role"
     DEEPSEEK_MESSAGE_CONTENT = "content"
     DEEPSEEK_ROLE_USER = "user"
+    DEEPSEEK_ROLE_SYSTEM = "system"
+    DEEPSEEK_PARAM_STREAM_OPTIONS = "stream_options"
 
     # DeepSeek API 响应常量
     DEEPSEEK_RESPONSE_CHOICES = "choices"
     DEEPSEEK_RESPONSE_MESSAGE = "message"
     DEEPSEEK_RESPONSE_CONTENT = "content"
+    DEEPSEEK_RESPONSE_FINISH_REASON = "finish_reason"
+    DEEPSEEK_RESPONSE_DELTA = "delta"
+    DEEPSEEK_RESPONSE_USAGE = "usage"
+    DEEPSEEK_USAGE_PROMPT_TOKENS = "prompt_tokens"
+    DEEPSEEK_USAGE_CACHE_HIT_TOKENS = "prompt_cache_hit_tokens"
+    DEEPSEEK_USAGE_COMPLETION_TOKENS = "completion_tokens"
     DEEPSEEK_RESULT_DOMAIN = "domain"
     DEEPSEEK_RESULT_REFINED_TEXT = "refined_text"
+    DEEPSEEK_RESULT_EDITS = "edits"
+    DEEPSEEK_EDIT_ORIGINAL = "original"
+    DEEPSEEK_EDIT_REPLACEMENT = "replacement"
 
     # DeepSeek 进度常量
     DEEPSEEK_PROGRESS_START = 10
@@ -270,6 +472,8 @@ class AppConstants:
     DEEPSEEK_ERROR_TIMEOUT = "API请求超时，请检查网络连接"
     DEEPSEEK_ERROR_CONNECTION = "网络连接失败，请检查网络设置"
     DEEPSEEK_ERROR_GENERAL = "文案修复失败：{error}"
+    DEEPSEEK_ERROR_ABORTED = "文案修复已中止"
+    DEEPSEEK_ERROR_CIRCUIT_OPEN = "DeepSeek服务暂时不可用，请在 {seconds:.0f} 秒后重试"
 
     # DeepSeek 日志消息常量
     DEEPSEEK_LOG_START_REFINING = "开始修复文案:"
@@ -277,18 +481,24 @@ class AppConstants:
     DEEPSEEK_LOG_REFINING_SUCCESS = "文案修复完成"
     DEEPSEEK_LOG_VALIDATION_ERROR = "验证错误:"
     DEEPSEEK_LOG_EXCEPTION = "Exception:"
-
-    # DeepSeek 提示词模板
-    DEEPSEEK_PROMPT_TEMPLATE = """请分析以下文案的专业领域，并在该领域的上下文中修复文案中的错别字、语法错误和专业术语。
-
-文案内容：
-{text}
+    DEEPSEEK_LOG_CHUNKS = "文案分为 {count} 段并行修复"
+    DEEPSEEK_LOG_INCREMENTAL = "增量修复：{reused} 个未修改的段落沿用上次结果"
+    DEEPSEEK_LOG_PATCH_APPLIED = "第 {index} 段按修改列表修复，共 {count} 处修改"
+    DEEPSEEK_LOG_PATCH_FALLBACK = "第 {index} 段修改列表校验失败，改为返回全文: {error}"
+    DEEPSEEK_LOG_RETRY = "请求失败({reason})，{delay:.1f} 秒后第 {attempt} 次重试"
+    DEEPSEEK_LOG_FIRST_TOKEN = "第 {index} 段首个Token耗时: {ms:.0f} ms"
+    DEEPSEEK_LOG_USAGE = "API用量: 输入 {prompt} tokens，其中前缀缓存命中 {hit} tokens"
+    DEEPSEEK_LOG_TRUNCATED = "警告: 第 {index} 段输出达到max_tokens上限，结果可能被截断"
+
+    # DeepSeek 系统提示词：固定不变的指令放在system消息开头，待修复文案作为user消息追加，
+    # 连续请求和多个分段共享相同前缀，可命中DeepSeek的上下文硬盘缓存
+    DEEPSEEK_SYSTEM_PROMPT = """请分析用户消息中文案的专业领域，并在该领域的上下文中修复文案中的错别字、语法错误和专业术语。
 
 请按照以下JSON格式返回结果：
-{{
+{
     "domain": "识别出的专业领域（如：科技、医疗、教育、金融等）",
     "refined_text": "修复后的文案内容"
-}}
+}
 
 修复要求：
 1. 保持原文的语义和风格
@@ -297,6 +507,38 @@ class AppConstants:
 4. 确保术语在该领域内的准确性
 5. 保持文案的流畅性和可读性"""
 
+    # 文案修复系统提示词（修复页面使用，返回纯文本）
+    DEEPSEEK_REFINE_SYSTEM_PROMPT = """请修复用户消息中文案的错别字、语法错误、专业术语和断句分段等问题。
+
+请按照以下要求修复文案：
+1. 修正错别字和语法错误，但是不要变更原文（插入或删除）
+2. 统一专业术语表达
+3. 优化断句和分段，提高可读性
+4. 保持原文的语义和风格
+5. 确保术语的准确性
+
+请直接返回修复后的文案内容，不需要JSON格式。"""
+
+    # 修改列表模式系统提示词：只返回需要修改的片段，由本地校验后应用，
+    # 大部分内容正确的长文案无需重新输出全文
+    DEEPSEEK_PATCH_SYSTEM_PROMPT = """请修复用户消息中文案的错别字、语法错误和专业术语问题，并识别文案的专业领域。
+
+不要返回修复后的全文，只返回需要修改的地方，按以下JSON格式输出：
+{
+    "domain": "识别出的专业领域（如：科技、医疗、教育、金融等）",
+    "edits": [
+        {"original": "原文中需要修改的片段", "replacement": "修改后的片段"}
+    ]
+}
+
+要求：
+1. original 必须与原文逐字一致（包括标点和空格），并包含足够的上下文使其在原文中可以唯一定位
+2. edits 按在原文中出现的顺序排列，片段之间不能重叠
+3. 只修改错别字、语法错误和术语，不要改写句式，不要插入或删除大段内容
+4. 没有需要修改的地方时返回空列表"""
+
+    # 术语表附加在系统提示词之后，按字典序排列保证前缀稳定
+    DEEPSEEK_GLOSSARY_HEADER = "术语表（文案中出现相近的词时统一使用以下写法）："
 
 class TitleBarConstants:
     """标题栏常量"""
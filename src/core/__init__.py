@@ -4,6 +4,12 @@ from .audio_extract_worker import AudioExtractWorker
 from .text_refine_worker import TextRefineWorker
 from .connectivity_checker import ConnectivityChecker
 from .config_manager import ConfigManager
+from .llm_http_client import LLMHttpClient, get_llm_http_client, reset_llm_http_client
+from .llm_request_scheduler import (
+    LLMRequestScheduler,
+    get_llm_request_scheduler,
+    reset_llm_request_scheduler,
+)
 from .state_manager import (
     StateManager,
     get_state_manager,
@@ -15,6 +21,7 @@ from .state_manager import (
     ExtractTextState,
     RefineTextState,
     AppState,
+    ProgressStats,
 )
 
 __all__ = [
@@ -22,6 +29,12 @@ __all__ = [
     "TextRefineWorker",
     "ConnectivityChecker",
     "ConfigManager",
+    "LLMHttpClient",
+    "get_llm_http_client",
+    "reset_llm_http_client",
+    "LLMRequestScheduler",
+    "get_llm_request_scheduler",
+    "reset_llm_request_scheduler",
     "StateManager",
     "get_state_manager",
     "reset_state_manager",
@@ -31,4 +44,5 @@ __all__ = [
     "ExtractTextState",
     "RefineTextState",
     "AppState",
+    "ProgressStats",
 ]
@@ -0,0 +1,183 @@
+"""
+异步项目管理
+在线程池中执行项目创建、导入和导出，通过信号报告字节级进度和结果，界面线程不再阻塞
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from config.core import AppConstants
+from core.project_manager import AudioProjectManager
+
+
+class ProjectTask(QObject):
+    """项目后台任务
+
+    信号在工作线程中发出，连接到界面对象的槽时会自动排队到界面线程执行。
+    任务创建后不会立即执行，连接好信号后调用 start()，避免结果在连接前发出而丢失；
+    启动后也可以通过 future 直接等待结果。
+    """
+
+    progress_updated = pyqtSignal("qint64", "qint64")  # 已处理字节数, 总字节数
+    finished = pyqtSignal(object)  # 任务结果
+    failed = pyqtSignal(str)  # 错误信息
+    cancelled = pyqtSignal()
+
+    def __init__(self, executor: ThreadPoolExecutor, operation: Callable[["ProjectTask"], object]):
+        """
+        初始化任务
+
+        Args:
+            executor: 执行任务的线程池
+            operation: 任务操作，参数为任务对象
+        """
+        super().__init__()
+        self.future: Optional[Future] = None
+        self._executor = executor
+        self._operation = operation
+        self._cancel_event = threading.Event()
+        self._last_percent = -1
+
+    def start(self) -> "ProjectTask":
+        """
+        提交到线程池执行，重复调用无效
+
+        Returns:
+            任务对象本身
+        """
+        if self.future is None:
+            self.future = self._executor.submit(self._run)
+        return self
+
+    def _run(self):
+        """在工作线程中执行操作并通过信号报告结果"""
+        try:
+            result = self._operation(self)
+        except InterruptedError:
+            self.cancelled.emit()
+            raise
+        except Exception as e:
+            self.failed.emit(str(e))
+            raise
+        if self.is_cancelled():
+            self.cancelled.emit()
+        else:
+            self.finished.emit(result)
+        return result
+
+    def cancel(self) -> None:
+        """请求取消，任务会在下一个数据块处停止并清理已写入的文件"""
+        self._cancel_event.set()
+        if self.future and self.future.cancel():
+            # 任务尚未开始，直接通知已取消
+            self.cancelled.emit()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def report_progress(self, done: int, total: int) -> None:
+        """报告进度，百分比变化时才发出信号，避免大量信号堆积在界面线程"""
+        percent = done * 100 // total if total else 100
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress_updated.emit(done, total)
+
+
+class AsyncProjectManager(QObject):
+    """异步项目管理器
+
+    包装 AudioProjectManager，耗时的文件操作在共享线程池中执行；
+    只读元数据等轻量操作仍可直接通过 manager 同步调用。
+    """
+
+    def __init__(
+        self,
+        manager: Optional[AudioProjectManager] = None,
+        max_workers: int = AppConstants.PROJECT_WORKER_COUNT,
+    ):
+        super().__init__()
+        self.manager = manager or AudioProjectManager()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="project"
+        )
+
+    def _submit(self, operation: Callable[[ProjectTask], object]) -> ProjectTask:
+        """创建在线程池中执行的任务，由调用方连接信号后 start()"""
+        return ProjectTask(self._executor, operation)
+
+    def create_project_async(self, name: str, audio_file: str) -> ProjectTask:
+        """
+        异步创建项目
+
+        Args:
+            name: 项目名称
+            audio_file: 原始音频文件路径
+
+        Returns:
+            未启动的任务对象，finished 信号携带项目ID
+        """
+        return self._submit(
+            lambda task: self.manager.create_project(
+                name, audio_file, task.report_progress, task.is_cancelled
+            )
+        )
+
+    def import_project_async(self, archive_path: str) -> ProjectTask:
+        """
+        异步导入项目
+
+        Args:
+            archive_path: 压缩包路径
+
+        Returns:
+            未启动的任务对象，finished 信号携带新项目ID
+        """
+        return self._submit(
+            lambda task: self.manager.import_project(
+                archive_path, task.report_progress, task.is_cancelled
+            )
+        )
+
+    def export_project_async(self, project_id: str, export_path: str) -> ProjectTask:
+        """
+        异步导出项目
+
+        Args:
+            project_id: 项目ID
+            export_path: 导出路径
+
+        Returns:
+            未启动的任务对象，finished 信号携带是否导出成功
+        """
+        return self._submit(
+            lambda task: self.manager.export_project(
+                project_id, export_path, task.report_progress, task.is_cancelled
+            )
+        )
+
+    def shutdown(self) -> None:
+        """取消未开始的任务并等待正在执行的任务结束"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# 全局异步项目管理器实例
+_async_project_manager: Optional[AsyncProjectManager] = None
+
+
+def get_async_project_manager() -> AsyncProjectManager:
+    """获取全局异步项目管理器实例（单例模式）"""
+    global _async_project_manager
+    if _async_project_manager is None:
+        _async_project_manager = AsyncProjectManager()
+    return _async_project_manager
+
+
+def reset_async_project_manager() -> None:
+    """重置异步项目管理器（主要用于测试）"""
+    global _async_project_manager
+    if _async_project_manager is not None:
+        _async_project_manager.shutdown()
+    _async_project_manager = None
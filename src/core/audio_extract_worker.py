@@ -5,7 +5,14 @@ import tempfile
 from pathlib import Path
 from PyQt6.QtCore import QThread, pyqtSignal
 from config.core import AppConstants
-from core.project_manager import AudioProjectManager
+from core.async_project_manager import get_async_project_manager
+from core.transcript_format import (
+    export_segments,
+    format_segments,
+    get_format_extension,
+    segment_confidence,
+    shift_segments,
+)
 
 
 class AudioExtractWorker(QThread):
@@ -17,16 +24,18 @@ class AudioExtractWorker(QThread):
     project_created = pyqtSignal(str)  # 新增：项目创建信号，传递项目ID
 
     def __init__(
-        self, audio_file_path: str, model_name: str = "base", output_format: str = "txt", use_gpu: bool = True
+        self, audio_file_path: str, model_name: str = "base", output_format: str = "txt", use_gpu: bool = True,
+        time_offset: float = 0.0,
     ):
         super().__init__()
         self.audio_file_path = audio_file_path
         self.model_name = model_name
         self.output_format = output_format
         self.use_gpu = use_gpu
+        self.time_offset = time_offset  # 片段音频在原视频中的起始秒数
         self.temp_txt_dir = None
         self.output_file_path = None
-        self.project_manager = AudioProjectManager()  # 新增：项目管理器
+        self.project_manager = get_async_project_manager().manager  # 与界面共用项目管理器
         self.project_id = None  # 新增：当前项目ID
 
     def is_cuda_available(self):
@@ -111,7 +120,9 @@ class AudioExtractWorker(QThread):
             # 创建项目
             audio_path = Path(self.audio_file_path)
             project_name = audio_path.stem  # 使用音频文件名作为项目名
-            self.project_id = self.project_manager.create_project(project_name, self.audio_file_path)
+            self.project_id = self.project_manager.create_project(
+                project_name, self.audio_file_path, should_cancel=self.isInterruptionRequested
+            )
             
             # 发送项目创建信号
             self.project_created.emit(self.project_id)
@@ -159,30 +170,15 @@ class AudioExtractWorker(QThread):
                         status="transcribed"
                     )
 
+                # 边转录边写入项目的片段存储，之后读取片段无需重新解析字幕文本
+                segments = self._collect_segments(segments)
+
+                if self.time_offset:
+                    # 片段音频的时间戳对齐到原视频时间轴
+                    segments = shift_segments(segments, self.time_offset)
+
                 # 根据输出格式生成不同的内容
-                if self.output_format == AppConstants.OUTPUT_FORMAT_TXT:
-                    # 纯文本格式
-                    text_segments = []
-                    for segment in segments:
-                        print("txt format: ", segment.text)
-                        text_segments.append(segment.text)
-                    text = AppConstants.AUDIO_EXTRACT_TEXT_JOIN_SEPARATOR.join(
-                        text_segments
-                    )
-                elif self.output_format == AppConstants.OUTPUT_FORMAT_SRT:
-                    # SRT字幕格式
-                    text = self._generate_srt_format(segments)
-                elif self.output_format == AppConstants.OUTPUT_FORMAT_VTT:
-                    # VTT字幕格式
-                    text = self._generate_vtt_format(segments)
-                else:
-                    # 默认使用纯文本格式
-                    text_segments = []
-                    for segment in segments:
-                        text_segments.append(segment.text)
-                    text = AppConstants.AUDIO_EXTRACT_TEXT_JOIN_SEPARATOR.join(
-                        text_segments
-                    )
+                text = format_segments(segments, self.output_format)
             except Exception as e:
                 print(
                     AppConstants.AUDIO_EXTRACT_ERROR_TRANSCRIPTION_FAILED.format(
@@ -203,7 +199,7 @@ class AudioExtractWorker(QThread):
             print("txt result len: ", len(text))
 
             # 保存文本到临时文件
-            self._save_text_to_file(text)
+            self._save_text_to_file(segments)
 
             # 发送结果
             self.text_extracted.emit(text)
@@ -216,28 +212,26 @@ class AudioExtractWorker(QThread):
                 AppConstants.AUDIO_EXTRACT_ERROR_GENERAL.format(error=str(e))
             )
 
-    def _generate_srt_format(self, segments):
-        """生成SRT格式的字幕"""
-        srt_content = []
-        for i, segment in enumerate(segments, 1):
-            start_time = self._format_timestamp_srt(segment.start)
-            end_time = self._format_timestamp_srt(segment.end)
-            srt_content.append(f"{i}")
-            srt_content.append(f"{start_time} --> {end_time}")
-            srt_content.append(segment.text.strip())
-            srt_content.append("")  # 空行分隔
-        return "\n".join(srt_content)
-
-    def _generate_vtt_format(self, segments):
-        """生成VTT格式的字幕"""
-        vtt_content = ["WEBVTT", ""]  # VTT文件头
-        for segment in segments:
-            start_time = self._format_timestamp_vtt(segment.start)
-            end_time = self._format_timestamp_vtt(segment.end)
-            vtt_content.append(f"{start_time} --> {end_time}")
-            vtt_content.append(segment.text.strip())
-            vtt_content.append("")  # 空行分隔
-        return "\n".join(vtt_content)
+    def _collect_segments(self, segments) -> list:
+        """逐条读取转录片段，同时追加到项目的片段存储"""
+        store = self.project_manager.get_segment_store(self.project_id) if self.project_id else None
+        if store is not None:
+            store.clear()
+        collected = []
+        try:
+            for segment in segments:
+                collected.append(segment)
+                if store is not None:
+                    store.append(
+                        segment.start + self.time_offset,
+                        segment.end + self.time_offset,
+                        segment.text.strip(),
+                        segment_confidence(segment),
+                    )
+        finally:
+            if store is not None:
+                store.close()
+        return collected
 
     def _ensure_temp_txt_dir(self):
         """确保TXT输出临时文件夹存在"""
@@ -247,8 +241,8 @@ class AudioExtractWorker(QThread):
             )
             os.makedirs(self.temp_txt_dir, exist_ok=True)
 
-    def _save_text_to_file(self, text: str):
-        """将文本保存到临时文件"""
+    def _save_text_to_file(self, segments):
+        """将片段按输出格式逐段写入临时文件"""
         try:
             self._ensure_temp_txt_dir()
 
@@ -256,39 +250,17 @@ class AudioExtractWorker(QThread):
             audio_filename = Path(self.audio_file_path).stem
 
             # 根据输出格式确定文件扩展名
-            if self.output_format == AppConstants.OUTPUT_FORMAT_SRT:
-                file_extension = ".srt"
-            elif self.output_format == AppConstants.OUTPUT_FORMAT_VTT:
-                file_extension = ".vtt"
-            else:
-                file_extension = ".txt"
+            file_extension = get_format_extension(self.output_format)
 
             # 构建输出文件路径
             output_filename = f"{audio_filename}{file_extension}"
             self.output_file_path = os.path.join(self.temp_txt_dir, output_filename)
 
             # 保存文件
-            with open(self.output_file_path, "w", encoding="utf-8") as f:
-                f.write(text)
+            export_segments(segments, self.output_format, self.output_file_path)
 
             print(f"文本已保存到: {self.output_file_path}")
 
         except Exception as e:
             print(f"保存文本文件失败: {str(e)}")
             self.output_file_path = None
-
-    def _format_timestamp_srt(self, seconds):
-        """格式化时间戳为SRT格式 (HH:MM:SS,mmm)"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        milliseconds = int((seconds % 1) * 1000)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
-
-    def _format_timestamp_vtt(self, seconds):
-        """格式化时间戳为VTT格式 (HH:MM:SS.mmm)"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        milliseconds = int((seconds % 1) * 1000)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}.{milliseconds:03d}"
@@ -0,0 +1,299 @@
+"""
+内容寻址存储
+按文件内容哈希保存音频，相同内容只存一份，项目通过硬链接或reflink引用
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Optional, Tuple
+
+from config.core import AppConstants
+
+
+# 读取进度回调：(已处理字节数, 总字节数)
+ProgressCallback = Callable[[int, int], None]
+
+
+def copy_stream(
+    src: BinaryIO,
+    dst: Optional[BinaryIO],
+    total: int,
+    done: int = 0,
+    progress: Optional[ProgressCallback] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    hasher=None,
+) -> int:
+    """
+    分块复制文件对象，可同时计算哈希，每块检查一次是否取消
+
+    Args:
+        src: 源文件对象
+        dst: 目标文件对象，为None时只读取
+        total: 进度总字节数
+        done: 此前已处理的字节数，多个文件共用一个进度时累加
+        progress: 进度回调
+        should_cancel: 返回True时抛出InterruptedError
+        hasher: hashlib哈希对象
+
+    Returns:
+        累计已处理的字节数
+    """
+    while True:
+        if should_cancel and should_cancel():
+            raise InterruptedError(AppConstants.PROJECT_MSG_CANCELLED)
+        chunk = src.read(AppConstants.BLOB_CHUNK_SIZE)
+        if not chunk:
+            return done
+        if hasher:
+            hasher.update(chunk)
+        if dst:
+            dst.write(chunk)
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+
+
+class BlobStore:
+    """内容寻址存储
+
+    文件按SHA-256保存在 <root>/<哈希前两位>/<哈希>，写入时先在临时目录中边复制边计算哈希，
+    再原子重命名到哈希路径，新文件只需读取一遍。
+    记录源文件(路径, 大小, 修改时间)到哈希的映射，同一个文件再次导入时无需重新计算哈希。
+    引用blob时依次尝试硬链接、reflink，都不支持时复制。
+    """
+
+    def __init__(self, root: Path):
+        """
+        初始化存储
+
+        Args:
+            root: 存储根目录
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._db_path = self.root / AppConstants.BLOB_FINGERPRINT_FILE_NAME
+        self._lock = threading.Lock()
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest TEXT NOT NULL
+                )
+                """
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=AppConstants.PROJECT_INDEX_TIMEOUT)
+
+    def blob_path(self, digest: str) -> Path:
+        """
+        获取blob文件路径
+
+        Args:
+            digest: 内容哈希
+
+        Returns:
+            blob文件路径
+        """
+        return self.root / digest[:2] / digest
+
+    def _lookup_fingerprint(self, path: str, stat: os.stat_result) -> Optional[str]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT digest FROM fingerprints WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row and self.blob_path(row[0]).exists():
+            return row[0]
+        return None
+
+    def _save_fingerprint(self, path: str, stat: os.stat_result, digest: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?)",
+                        (path, stat.st_size, stat.st_mtime_ns, digest),
+                    )
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _copy_chunks(
+        source: Path,
+        dest: Optional[Path],
+        progress: Optional[ProgressCallback],
+        should_cancel: Optional[Callable[[], bool]],
+        hasher=None,
+    ) -> None:
+        """分块读取源文件，可同时计算哈希和写入目标文件"""
+        total = source.stat().st_size
+        with open(source, "rb") as src:
+            dst = open(dest, "wb") if dest else None
+            try:
+                copy_stream(src, dst, total, 0, progress, should_cancel, hasher)
+            finally:
+                if dst:
+                    dst.close()
+
+    def put(
+        self,
+        file_path: str,
+        progress: Optional[ProgressCallback] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> str:
+        """
+        保存文件，内容已存在时不再写入
+
+        Args:
+            file_path: 源文件路径
+            progress: 进度回调
+            should_cancel: 返回True时中止并抛出InterruptedError
+
+        Returns:
+            内容哈希
+        """
+        source = Path(file_path).resolve()
+        stat = source.stat()
+        digest = self._lookup_fingerprint(str(source), stat)
+        if digest:
+            if progress:
+                progress(stat.st_size, stat.st_size)
+            return digest
+
+        # 哈希未知时写入临时文件的同时计算哈希，不必先读一遍求哈希再读一遍复制；
+        # 支持reflink时临时文件不占额外空间，只需读取一遍计算哈希
+        temp_dir = self.root / AppConstants.BLOB_TEMP_DIR_NAME
+        temp_dir.mkdir(exist_ok=True)
+        temp_path = temp_dir / f"{uuid.uuid4().hex}.tmp"
+        hasher = hashlib.sha256()
+        try:
+            if self._reflink(source, temp_path):
+                self._copy_chunks(temp_path, None, progress, should_cancel, hasher)
+            else:
+                self._copy_chunks(source, temp_path, progress, should_cancel, hasher)
+            digest = hasher.hexdigest()
+            blob = self.blob_path(digest)
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp_path, blob)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        self._save_fingerprint(str(source), stat, digest)
+        return digest
+
+    @staticmethod
+    def _reflink(source: Path, dest: Path) -> bool:
+        """尝试在支持的文件系统(btrfs/xfs等)上创建写时复制副本"""
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            import fcntl
+
+            with open(source, "rb") as src, open(dest, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), AppConstants.BLOB_FICLONE_IOCTL, src.fileno())
+            return True
+        except (ImportError, OSError):
+            if dest.exists():
+                dest.unlink()
+            return False
+
+    def link_into(self, digest: str, dest: Path) -> str:
+        """
+        在项目目录中引用blob
+
+        Args:
+            digest: 内容哈希
+            dest: 目标文件路径
+
+        Returns:
+            使用的方式：hardlink、reflink 或 copy
+        """
+        blob = self.blob_path(digest)
+        try:
+            os.link(blob, dest)
+            return "hardlink"
+        except OSError:
+            pass
+        if self._reflink(blob, dest):
+            return "reflink"
+        shutil.copy2(blob, dest)
+        return "copy"
+
+    def remove(self, digest: str) -> None:
+        """
+        删除blob
+
+        Args:
+            digest: 内容哈希
+        """
+        try:
+            self.blob_path(digest).unlink()
+        except FileNotFoundError:
+            pass
+
+    def collect_garbage(self, referenced: Iterable[str]) -> Tuple[int, int]:
+        """
+        删除未被引用的blob和残留的临时文件
+
+        Args:
+            referenced: 仍被项目引用的内容哈希
+
+        Returns:
+            (删除的文件数, 释放的字节数)
+        """
+        referenced = set(referenced)
+        # 刚写入、尚未被项目元数据引用的blob和正在写入的临时文件不清理
+        cutoff = time.time() - AppConstants.BLOB_GC_GRACE_SECONDS
+        removed, freed = 0, 0
+        for bucket in self.root.iterdir():
+            if not bucket.is_dir():
+                continue
+            for entry in bucket.iterdir():
+                if entry.name in referenced:
+                    continue
+                try:
+                    stat = entry.stat()
+                    if stat.st_mtime > cutoff:
+                        continue
+                    entry.unlink()
+                except OSError:
+                    continue
+                removed += 1
+                freed += stat.st_size
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    digests = [
+                        row[0]
+                        for row in conn.execute("SELECT DISTINCT digest FROM fingerprints")
+                        if not self.blob_path(row[0]).exists()
+                    ]
+                    conn.executemany(
+                        "DELETE FROM fingerprints WHERE digest = ?",
+                        [(digest,) for digest in digests],
+                    )
+            finally:
+                conn.close()
+        return removed, freed
@@ -1,71 +1,164 @@
 """DeepSeek API连通性检查器"""
 
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
 import requests
 from PyQt6.QtCore import QThread, pyqtSignal
 from config.core import AppConstants
+from core.llm_http_client import LLMRequestMetrics, get_llm_http_client
+from core.llm_request_scheduler import (
+    CircuitOpenError,
+    LLMHTTPError,
+    get_llm_request_scheduler,
+)
+
+
+@dataclass
+class ConnectivityResult:
+    """连通性检查结果"""
+
+    ok: bool
+    error: str = ""
+    connect_ms: float = 0.0  # 建立连接（含TLS握手）耗时，复用长连接时为0
+    ttfb_ms: float = 0.0  # 首字节耗时
+    reused_connection: bool = False
+    checked_at: float = 0.0  # time.monotonic() 时间戳
+
+    @property
+    def age(self) -> float:
+        """距检查完成的秒数"""
+        return time.monotonic() - self.checked_at
+
+
+# 按API密钥哈希缓存检查结果，只缓存成功和密钥无效两种确定的结果
+_connectivity_cache: Dict[str, ConnectivityResult] = {}
+_connectivity_lock = threading.Lock()
+
+
+def _key_hash(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def get_cached_connectivity(
+    api_key: str, ttl: float = AppConstants.DEEPSEEK_CONNECTIVITY_CACHE_TTL
+) -> Optional[ConnectivityResult]:
+    """获取未过期的检查结果，没有时返回None"""
+    with _connectivity_lock:
+        result = _connectivity_cache.get(_key_hash(api_key))
+    if result is None or result.age > ttl:
+        return None
+    return result
+
+
+def record_connectivity(api_key: str, result: ConnectivityResult) -> None:
+    """记录检查结果，文案修复请求成功时也会记录，之后的检查可直接复用"""
+    with _connectivity_lock:
+        _connectivity_cache[_key_hash(api_key)] = result
+
+
+def clear_connectivity_cache() -> None:
+    """清空检查结果缓存（主要用于测试）"""
+    with _connectivity_lock:
+        _connectivity_cache.clear()
 
 
 class ConnectivityChecker(QThread):
-    """API连通性检查工作线程"""
+    """API连通性检查工作线程
+
+    请求模型列表接口校验密钥和网络，不发起对话请求、不消耗Token。
+    有效期内的检查结果直接复用，同时发出连接和首字节耗时。
+    """
 
     check_completed = pyqtSignal()
     check_failed = pyqtSignal(str)
+    timings_measured = pyqtSignal(float, float, bool, float)  # 连接ms, 首字节ms, 是否复用连接, 结果缓存秒数
 
-    def __init__(self, api_key: str, api_url: str = None):
+    def __init__(self, api_key: str, api_url: str = None, use_cache: bool = True):
         super().__init__()
         self.api_key = api_key
-        self.api_url = api_url or AppConstants.DEEPSEEK_API_URL
+        self.api_url = api_url or AppConstants.DEEPSEEK_MODELS_URL
+        self.use_cache = use_cache
+        self._metrics = LLMRequestMetrics()  # 最近一次检查请求的耗时，命中缓存时不更新
+
+    def _send(self) -> LLMRequestMetrics:
+        """发送检查请求，与文案修复共用连接池，检查后建立的连接可直接被修复请求复用
+
+        Returns:
+            LLMRequestMetrics: 本次请求的耗时指标
+        """
+        client = get_llm_http_client()
+        metrics = LLMRequestMetrics()
+        response = client.get(
+            self.api_url,
+            self.api_key,
+            read_timeout=AppConstants.DEEPSEEK_CONNECTIVITY_TIMEOUT,  # 较短的超时时间用于连通性检查
+            metrics=metrics,
+        )
+        self._metrics = metrics
+        if response.status_code != AppConstants.DEEPSEEK_SUCCESS_STATUS_CODE:
+            raise LLMHTTPError(
+                response.status_code,
+                response.text,
+                response.headers.get("Retry-After"),
+            )
+        return metrics
+
+    def _emit_result(self, result: ConnectivityResult, cached_age: float = 0.0) -> None:
+        self.timings_measured.emit(
+            result.connect_ms, result.ttfb_ms, result.reused_connection, cached_age
+        )
+        if result.ok:
+            self.check_completed.emit()
+        else:
+            self.check_failed.emit(result.error)
 
     def run(self):
         """执行连通性检查"""
+        if self.use_cache:
+            cached = get_cached_connectivity(self.api_key)
+            if cached is not None:
+                self._emit_result(cached, cached.age)
+                return
+
         try:
-            # 构建请求头
-            headers = {
-                AppConstants.DEEPSEEK_HEADER_CONTENT_TYPE: AppConstants.DEEPSEEK_CONTENT_TYPE_JSON,
-                AppConstants.DEEPSEEK_HEADER_AUTHORIZATION: f"{AppConstants.DEEPSEEK_AUTH_PREFIX}{self.api_key}",
-            }
-
-            # 构建一个简单的测试请求
-            payload = {
-                AppConstants.DEEPSEEK_PARAM_MODEL: AppConstants.DEEPSEEK_DEFAULT_MODEL,
-                AppConstants.DEEPSEEK_PARAM_MESSAGES: [
-                    {
-                        AppConstants.DEEPSEEK_MESSAGE_ROLE: AppConstants.DEEPSEEK_ROLE_USER,
-                        AppConstants.DEEPSEEK_MESSAGE_CONTENT: "测试连接",
-                    }
-                ],
-                AppConstants.DEEPSEEK_PARAM_TEMPERATURE: 0.1,
-                AppConstants.DEEPSEEK_PARAM_MAX_TOKENS: 10,
-            }
-
-            # 发送请求
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=10,  # 较短的超时时间用于连通性检查
+            # 与文案修复共用调度器，服务不可用时同样熔断，只做一次快速重试
+            metrics = get_llm_request_scheduler().run(
+                self.api_key,
+                self._send,
+                max_retries=AppConstants.DEEPSEEK_CONNECTIVITY_MAX_RETRIES,
             )
+            result = ConnectivityResult(
+                ok=True,
+                connect_ms=metrics.connect_time * 1000,
+                ttfb_ms=metrics.ttfb * 1000,
+                reused_connection=metrics.reused_connection,
+                checked_at=time.monotonic(),
+            )
+            record_connectivity(self.api_key, result)
+            self._emit_result(result)
 
-            if response.status_code == AppConstants.DEEPSEEK_SUCCESS_STATUS_CODE:
-                # 检查响应格式是否正确
-                result = response.json()
-                if (
-                    AppConstants.DEEPSEEK_RESPONSE_CHOICES in result
-                    and len(result[AppConstants.DEEPSEEK_RESPONSE_CHOICES]) > 0
-                ):
-                    self.check_completed.emit()
-                else:
-                    self.check_failed.emit("API响应格式异常")
-            else:
-                error_msg = f"HTTP {response.status_code}"
-                try:
-                    error_detail = response.json().get("error", {}).get("message", "")
-                    if error_detail:
-                        error_msg += f": {error_detail}"
-                except:
-                    pass
-                self.check_failed.emit(error_msg)
-
+        except LLMHTTPError as e:
+            error_msg = f"HTTP {e.status_code}"
+            try:
+                error_detail = json.loads(e.error).get("error", {}).get("message", "")
+                if error_detail:
+                    error_msg += f": {error_detail}"
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # 响应体不是预期的JSON错误格式时只显示状态码
+                pass
+            if e.status_code == AppConstants.DEEPSEEK_STATUS_UNAUTHORIZED:
+                # 密钥无效不会自行恢复，缓存后修复前可直接提示
+                record_connectivity(
+                    self.api_key,
+                    ConnectivityResult(ok=False, error=error_msg, checked_at=time.monotonic()),
+                )
+            self.check_failed.emit(error_msg)
+        except CircuitOpenError as e:
+            self.check_failed.emit(str(e))
         except requests.exceptions.Timeout:
             self.check_failed.emit("请求超时，请检查网络连接")
         except requests.exceptions.ConnectionError:
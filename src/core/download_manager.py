@@ -0,0 +1,821 @@
+"""在线音频下载管理模块 - 管理多链接、播放列表的并发下载队列"""
+
+import json
+import os
+import re
+import tempfile
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from config.core import AppConstants
+from core.transcript_format import (
+    format_segments,
+    get_format_extension,
+    parse_subtitle,
+)
+
+
+class DownloadStatus(Enum):
+    """下载任务状态枚举"""
+
+    QUEUED = "queued"  # 排队中
+    RESOLVING = "resolving"  # 正在解析播放列表
+    DOWNLOADING = "downloading"  # 正在下载
+    POSTPROCESSING = "postprocessing"  # 正在后处理
+    COMPLETED = "completed"  # 下载完成
+    SKIPPED = "skipped"  # 已下载过，跳过
+    FAILED = "failed"  # 下载失败
+    CANCELLED = "cancelled"  # 已取消
+
+
+@dataclass
+class DownloadItem:
+    """下载任务数据类"""
+
+    item_id: str
+    url: str
+    video_key: str = ""  # 平台+视频ID+音频格式+时间段，用于去重
+    resolved_key: str = ""  # 下载后由yt-dlp返回的平台+视频ID生成的去重键
+    title: str = ""
+    status: DownloadStatus = DownloadStatus.QUEUED
+    progress: float = 0.0  # 百分比 0-100
+    speed: float = 0.0  # 字节/秒
+    eta: float = 0.0  # 剩余秒数
+    file_path: str = ""
+    transcript_path: str = ""  # 使用平台字幕时的文案文件路径
+    section: Optional[Tuple[float, float]] = None  # 只下载的时间段(开始秒, 结束秒)
+    profile: str = AppConstants.ONLINE_AUDIO_PROFILE_DEFAULT  # 后处理配置
+    error_message: str = ""
+
+    @property
+    def is_finished(self) -> bool:
+        """任务是否已结束"""
+        return self.status in (
+            DownloadStatus.COMPLETED,
+            DownloadStatus.SKIPPED,
+            DownloadStatus.FAILED,
+            DownloadStatus.CANCELLED,
+        )
+
+
+class DownloadCancelled(Exception):
+    """下载被用户取消"""
+
+
+def parse_section_time(text: str) -> Optional[float]:
+    """解析时间段输入，支持 HH:MM:SS、MM:SS 和秒数，空输入返回None
+
+    Raises:
+        ValueError: 输入格式无效
+    """
+    text = text.strip()
+    if not text:
+        return None
+    parts = text.split(":")
+    if len(parts) > 3:
+        raise ValueError(f"无效的时间: {text}")
+    seconds = 0.0
+    for part in parts:
+        value = float(part)
+        if value < 0:
+            raise ValueError(f"无效的时间: {text}")
+        seconds = seconds * 60 + value
+    return seconds
+
+
+def format_section_key(section: Optional[Tuple[float, float]]) -> str:
+    """生成时间段标识，用于区分同一视频的不同片段"""
+    if not section:
+        return ""
+    start, end = section
+    end_text = "end" if end == float("inf") else f"{end:g}"
+    return f"{start:g}-{end_text}"
+
+
+def build_download_key(
+    video_key: str, profile: str, section: Optional[Tuple[float, float]] = None
+) -> str:
+    """生成下载去重键，同一视频的不同音频格式或时间段视为不同的下载"""
+    if not video_key:
+        return ""
+    download_key = f"{video_key}#{profile}"
+    if section:
+        download_key = f"{download_key}@{format_section_key(section)}"
+    return download_key
+
+
+def parse_video_key(url: str) -> str:
+    """从链接中解析平台和视频ID，无法识别时返回空字符串"""
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return ""
+    netloc = parsed.netloc.lower()
+
+    if "youtu.be" in netloc:
+        video_id = parsed.path.strip("/").split("/")[0]
+        return f"youtube:{video_id}" if video_id else ""
+    if "youtube.com" in netloc:
+        video_id = parse_qs(parsed.query).get("v", [""])[0]
+        if not video_id:
+            match = re.match(r"^/(?:shorts|live|embed)/([\w-]+)", parsed.path)
+            video_id = match.group(1) if match else ""
+        return f"youtube:{video_id}" if video_id else ""
+    if "bilibili.com" in netloc:
+        match = re.search(r"/video/(BV[0-9A-Za-z]+|av\d+)", parsed.path)
+        if match:
+            # 多P视频的每一P视为不同的视频，与yt-dlp的ID规则保持一致
+            page = parse_qs(parsed.query).get("p", ["1"])[0]
+            suffix = f"_p{page}" if page not in ("", "1") else ""
+            return f"bilibili:{match.group(1)}{suffix}"
+    return ""
+
+
+def is_playlist_url(url: str) -> bool:
+    """判断链接是否为播放列表/合集"""
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return False
+    netloc = parsed.netloc.lower()
+    if "youtube.com" in netloc:
+        if parsed.path.startswith("/playlist"):
+            return True
+        # 同时带有视频ID和列表ID的链接按单个视频处理
+        query = parse_qs(parsed.query)
+        return "list" in query and "v" not in query
+    if "bilibili.com" in netloc:
+        return any(
+            marker in parsed.path
+            for marker in AppConstants.ONLINE_AUDIO_BILIBILI_PLAYLIST_MARKERS
+        )
+    return False
+
+
+def build_postprocessors(profile: str) -> list:
+    """根据后处理配置生成yt-dlp后处理器列表
+
+    原始音频配置不做任何转码，Whisper可直接解码Opus/M4A，
+    省去一次完整的编码过程。
+    """
+    if profile == AppConstants.ONLINE_AUDIO_PROFILE_WAV_16K:
+        return [{
+            "key": "FFmpegExtractAudio",
+            "preferredcodec": "wav",
+        }]
+    if profile == AppConstants.ONLINE_AUDIO_PROFILE_MP3:
+        return [{
+            "key": "FFmpegExtractAudio",
+            "preferredcodec": "mp3",
+            "preferredquality": AppConstants.ONLINE_AUDIO_MP3_QUALITY,
+        }]
+    return []
+
+
+def build_postprocessor_args(profile: str) -> dict:
+    """生成后处理器的FFmpeg输出参数"""
+    if profile == AppConstants.ONLINE_AUDIO_PROFILE_WAV_16K:
+        # 直接输出Whisper所需的采样率和声道数，避免转录时再次重采样
+        return {
+            "extractaudio+ffmpeg_o": [
+                "-ar", AppConstants.ONLINE_AUDIO_WAV_SAMPLE_RATE,
+                "-ac", AppConstants.ONLINE_AUDIO_WAV_CHANNELS,
+            ]
+        }
+    return {}
+
+
+def _match_subtitle_lang(tracks: dict, lang: str) -> Optional[str]:
+    """在字幕字典中查找匹配语言的键，支持zh匹配zh-Hans这类子标签"""
+    if lang in tracks:
+        return lang
+    for key in tracks:
+        if key.lower().startswith(f"{lang.lower()}-"):
+            return key
+    return None
+
+
+def _pick_subtitle_format(formats: list) -> Optional[dict]:
+    """从同一语言的多个字幕格式中选择可解析的格式"""
+    for ext in AppConstants.ONLINE_AUDIO_SUBTITLE_FORMATS:
+        for track in formats or []:
+            if track.get("ext") == ext and (track.get("data") or track.get("url")):
+                return track
+    return None
+
+
+def select_subtitle_track(info: dict) -> Optional[dict]:
+    """选择最合适的平台字幕轨道
+
+    优先级：上传者字幕（偏好语言、视频原语言） > 原语言自动字幕。
+    不使用自动翻译的字幕，质量不如重新转录。
+
+    Returns:
+        字幕轨道字典（含ext及url或data），没有合适的字幕时返回None
+    """
+    subtitles = {
+        lang: formats
+        for lang, formats in (info.get("subtitles") or {}).items()
+        if lang not in AppConstants.ONLINE_AUDIO_SUBTITLE_EXCLUDED_LANGS
+    }
+    automatic = info.get("automatic_captions") or {}
+    video_lang = info.get("language")
+
+    candidates = []
+    for lang in AppConstants.ONLINE_AUDIO_SUBTITLE_LANGS + [video_lang]:
+        key = _match_subtitle_lang(subtitles, lang) if lang else None
+        if key:
+            candidates.append(subtitles[key])
+    # YouTube自动字幕中以-orig结尾的是原语言识别结果
+    candidates.extend(
+        formats for lang, formats in automatic.items() if lang.endswith("-orig")
+    )
+    if video_lang and video_lang in automatic:
+        candidates.append(automatic[video_lang])
+
+    for formats in candidates:
+        track = _pick_subtitle_format(formats)
+        if track:
+            return track
+    return None
+
+
+class OnlineAudioWorker(QThread):
+    """在线音频下载工作线程"""
+
+    status_changed = pyqtSignal(object)  # DownloadStatus
+    download_progress = pyqtSignal(float, float, float)  # 百分比, 速度(B/s), 剩余秒数
+    info_resolved = pyqtSignal(str, str)  # video_key, title
+    subtitle_extracted = pyqtSignal(str, str)  # 字幕文案, 文案文件路径
+    extraction_completed = pyqtSignal(str)  # 提取完成信号，传递文件路径
+    extraction_failed = pyqtSignal(str)  # 提取失败信号
+
+    def __init__(
+        self,
+        url: str,
+        output_dir: str,
+        profile: str = AppConstants.ONLINE_AUDIO_PROFILE_DEFAULT,
+        prefer_subtitles: bool = False,
+        subtitle_format: str = AppConstants.OUTPUT_FORMAT_DEFAULT,
+        section: Optional[Tuple[float, float]] = None,
+    ):
+        super().__init__()
+        self.url = url
+        self.output_dir = output_dir
+        self.profile = profile
+        self.prefer_subtitles = prefer_subtitles
+        self.subtitle_format = subtitle_format
+        self.section = section
+        self.final_file_path = None  # 由后处理钩子回填的最终文件路径
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """请求取消下载，在下一次进度回调时生效"""
+        self._cancelled = True
+
+    def _on_progress_hook(self, d: dict):
+        """yt-dlp下载进度钩子，转换为数值进度信号"""
+        if self._cancelled:
+            raise DownloadCancelled()
+
+        if d.get("status") == "downloading":
+            downloaded = d.get("downloaded_bytes") or 0
+            total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
+            percent = downloaded * 100.0 / total if total else 0.0
+            self.download_progress.emit(
+                percent, float(d.get("speed") or 0), float(d.get("eta") or 0)
+            )
+        elif d.get("status") == "finished":
+            self.download_progress.emit(100.0, 0.0, 0.0)
+
+    def _on_postprocessor_hook(self, d: dict):
+        """yt-dlp后处理钩子，记录每个后处理步骤完成后的文件路径"""
+        if self._cancelled:
+            raise DownloadCancelled()
+
+        if d.get("status") == "started":
+            self.status_changed.emit(DownloadStatus.POSTPROCESSING)
+        elif d.get("status") == "finished":
+            file_path = d.get("info_dict", {}).get("filepath")
+            if file_path:
+                # 后处理器按顺序执行，最后一次回调即为最终文件
+                self.final_file_path = file_path
+
+    def _build_video_key(self, info: dict) -> str:
+        """根据yt-dlp解析结果生成下载去重键（含音频格式和时间段）"""
+        video_key = f"{info.get('extractor_key', '').lower()}:{info.get('id', '')}"
+        return build_download_key(video_key, self.profile, self.section)
+
+    def _resolve_downloaded_path(self, info: dict):
+        """从extract_info的返回结果中解析最终文件路径"""
+        if not info:
+            return None
+        requested = info.get("requested_downloads") or []
+        if requested:
+            return requested[-1].get("filepath") or requested[-1].get("_filename")
+        return info.get("filepath")
+
+    def _fetch_subtitle_text(self, ydl, info: dict) -> Optional[str]:
+        """获取平台字幕并转换为目标输出格式，没有可用字幕时返回None"""
+        track = select_subtitle_track(info)
+        if not track:
+            return None
+
+        content = track.get("data")
+        if not content:
+            content = ydl.urlopen(track["url"]).read().decode("utf-8", errors="ignore")
+
+        segments = parse_subtitle(content)
+        if self.section:
+            # 只保留时间段内的字幕，时间戳保持原视频时间轴
+            start, end = self.section
+            segments = [
+                segment for segment in segments
+                if segment.end > start and segment.start < end
+            ]
+        if not segments:
+            return None
+        return format_segments(segments, self.subtitle_format)
+
+    def _save_subtitle_text(self, ydl, info: dict, text: str) -> str:
+        """将字幕文案保存到文案输出目录，文件名与音频文件保持一致"""
+        output_dir = os.path.join(tempfile.gettempdir(), AppConstants.TXT_OUTPUT_TEMP_DIR)
+        os.makedirs(output_dir, exist_ok=True)
+        base_name = os.path.splitext(os.path.basename(ydl.prepare_filename(info)))[0]
+        file_path = os.path.join(
+            output_dir, f"{base_name}{get_format_extension(self.subtitle_format)}"
+        )
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return os.path.normpath(file_path)
+
+    def build_ydl_opts(self) -> dict:
+        """生成yt-dlp下载选项"""
+        # 文件名由yt-dlp根据标题和视频ID生成，ID保证同名视频互不覆盖，
+        # 同时保证中断后重新下载时能找到同一个.part文件继续下载
+        template = AppConstants.ONLINE_AUDIO_OUTPUT_TEMPLATE
+        if self.section:
+            # 片段文件名带上时间段，避免与完整下载或其他片段互相覆盖
+            name, ext = os.path.splitext(template)
+            template = f"{name}_{format_section_key(self.section)}{ext}"
+        output_template = os.path.join(self.output_dir, template)
+
+        ydl_opts = {
+            "format": "bestaudio/best",
+            "outtmpl": output_template,
+            "postprocessors": build_postprocessors(self.profile),
+            "postprocessor_args": build_postprocessor_args(self.profile),
+            "progress_hooks": [self._on_progress_hook],
+            "postprocessor_hooks": [self._on_postprocessor_hook],
+            "noplaylist": True,
+            "quiet": True,
+            "noprogress": True,
+            "continuedl": True,  # 断点续传
+            "nopart": False,  # 保留.part文件以便续传
+            "retries": AppConstants.ONLINE_AUDIO_RETRIES,
+            "fragment_retries": AppConstants.ONLINE_AUDIO_RETRIES,
+            "concurrent_fragment_downloads": (
+                AppConstants.ONLINE_AUDIO_CONCURRENT_FRAGMENTS
+            ),
+            "restrictfilenames": True,  # 限制文件名为ASCII字符
+            "windowsfilenames": True,   # 确保Windows兼容性
+        }
+        if self.section:
+            from yt_dlp.utils import download_range_func
+
+            # 只下载并后处理指定时间段
+            ydl_opts["download_ranges"] = download_range_func(None, [self.section])
+        return ydl_opts
+
+    def run(self):
+        """执行音频提取"""
+        try:
+            import yt_dlp
+
+            self.status_changed.emit(DownloadStatus.DOWNLOADING)
+
+            with yt_dlp.YoutubeDL(self.build_ydl_opts()) as ydl:
+                if self.prefer_subtitles:
+                    # 先只解析元数据，有平台字幕时无需下载音频和转录
+                    info = ydl.extract_info(self.url, download=False)
+                    text = self._fetch_subtitle_text(ydl, info)
+                    if text:
+                        self.info_resolved.emit(self._build_video_key(info), info.get("title", ""))
+                        file_path = self._save_subtitle_text(ydl, info, text)
+                        print(f"使用平台字幕: {file_path}")
+                        self.subtitle_extracted.emit(text, file_path)
+                        return
+                    # 没有合适的字幕，复用已解析的元数据继续下载音频
+                    info = ydl.process_ie_result(info, download=True)
+                else:
+                    # 一次调用完成元数据解析、下载和后处理
+                    info = ydl.extract_info(self.url, download=True)
+
+            if info:
+                self.info_resolved.emit(self._build_video_key(info), info.get("title", ""))
+
+            file_path = self.final_file_path or self._resolve_downloaded_path(info)
+            if file_path and os.path.exists(file_path):
+                file_path = os.path.normpath(file_path)
+                print(f"音频文件: {file_path}")
+                self.extraction_completed.emit(file_path)
+                return
+
+            self.extraction_failed.emit("未找到提取的音频文件")
+
+        except ImportError:
+            self.extraction_failed.emit("缺少yt-dlp依赖，请运行: uv sync --extra video")
+        except Exception as e:
+            if self._cancelled:
+                self.status_changed.emit(DownloadStatus.CANCELLED)
+                return
+            self.extraction_failed.emit(f"提取失败: {str(e)}")
+
+
+class PlaylistResolveWorker(QThread):
+    """播放列表解析工作线程 - 只获取条目列表，不解析每个视频的详细信息"""
+
+    resolved = pyqtSignal(list)  # [(url, title), ...]
+    resolve_failed = pyqtSignal(str)
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+
+    def run(self):
+        """执行播放列表解析"""
+        try:
+            import yt_dlp
+
+            ydl_opts = {
+                "quiet": True,
+                "extract_flat": "in_playlist",
+                "skip_download": True,
+            }
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(self.url, download=False)
+
+            entries = []
+            for entry in (info or {}).get("entries") or []:
+                if not entry:
+                    continue
+                entry_url = entry.get("url") or entry.get("webpage_url")
+                if entry_url:
+                    entries.append((entry_url, entry.get("title") or ""))
+            self.resolved.emit(entries)
+
+        except ImportError:
+            self.resolve_failed.emit("缺少yt-dlp依赖，请运行: uv sync --extra video")
+        except Exception as e:
+            self.resolve_failed.emit(f"播放列表解析失败: {str(e)}")
+
+
+class DownloadManager(QObject):
+    """在线音频下载管理器
+
+    维护一个下载队列，以有限的并发数运行下载任务；
+    已下载过的视频（按平台+视频ID）直接复用已有文件。
+    """
+
+    item_added = pyqtSignal(str)  # item_id
+    item_removed = pyqtSignal(str)  # item_id
+    item_status_changed = pyqtSignal(str, object)  # item_id, DownloadStatus
+    item_progress = pyqtSignal(str, float, float, float)  # item_id, 百分比, 速度, 剩余秒数
+    item_completed = pyqtSignal(str, str)  # item_id, file_path
+    item_transcript_ready = pyqtSignal(str, str)  # item_id, 字幕文案
+    item_failed = pyqtSignal(str, str)  # item_id, error_message
+    queue_finished = pyqtSignal()
+
+    def __init__(
+        self,
+        output_dir: str,
+        max_concurrent: int = AppConstants.ONLINE_AUDIO_MAX_CONCURRENT_DOWNLOADS,
+        profile: str = AppConstants.ONLINE_AUDIO_PROFILE_DEFAULT,
+    ):
+        super().__init__()
+        self.output_dir = output_dir
+        self.max_concurrent = max(1, max_concurrent)
+        self.profile = profile
+        self.prefer_subtitles = False  # 优先使用平台字幕
+        self.subtitle_format = AppConstants.OUTPUT_FORMAT_DEFAULT
+        self.section: Optional[Tuple[float, float]] = None  # 新任务只下载的时间段
+        self._items: Dict[str, DownloadItem] = {}
+        self._order: List[str] = []
+        self._queue: Deque[str] = deque()
+        self._workers: Dict[str, OnlineAudioWorker] = {}
+        self._resolvers: Dict[str, PlaylistResolveWorker] = {}
+        self._index_file = os.path.join(
+            output_dir, AppConstants.ONLINE_AUDIO_DOWNLOAD_INDEX_FILE
+        )
+        self._downloaded = self._load_index()
+
+    # ==================== 下载记录 ====================
+
+    def _load_index(self) -> Dict[str, str]:
+        """加载已下载视频的记录"""
+        if not os.path.exists(self._index_file):
+            return {}
+        try:
+            with open(self._index_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"加载下载记录失败: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        """保存已下载视频的记录"""
+        try:
+            with open(self._index_file, "w", encoding="utf-8") as f:
+                json.dump(self._downloaded, f, ensure_ascii=False, indent=2)
+        except IOError as e:
+            print(f"保存下载记录失败: {e}")
+
+    def find_downloaded(self, video_key: str) -> Optional[str]:
+        """查找已下载视频的文件路径，文件已被删除时返回None"""
+        if not video_key:
+            return None
+        file_path = self._downloaded.get(video_key)
+        if file_path and os.path.exists(file_path):
+            return file_path
+        return None
+
+    # ==================== 队列管理 ====================
+
+    @property
+    def items(self) -> List[DownloadItem]:
+        """按添加顺序返回所有任务"""
+        return [self._items[item_id] for item_id in self._order]
+
+    def get_item(self, item_id: str) -> Optional[DownloadItem]:
+        """获取任务"""
+        return self._items.get(item_id)
+
+    def is_busy(self) -> bool:
+        """是否还有未结束的任务"""
+        return bool(self._queue or self._workers or self._resolvers)
+
+    def add_urls(self, urls: List[str]) -> List[str]:
+        """添加多个链接到下载队列
+
+        Returns:
+            新增任务的ID列表
+        """
+        added = []
+        for url in urls:
+            if is_playlist_url(url):
+                self._resolve_playlist(url, self.section, self.profile)
+                continue
+            item_id = self._add_item(url, "", self.section, self.profile)
+            if item_id:
+                added.append(item_id)
+        self._schedule()
+        return added
+
+    def _add_item(
+        self,
+        url: str,
+        title: str,
+        section: Optional[Tuple[float, float]],
+        profile: str,
+    ) -> Optional[str]:
+        """添加单个视频任务，队列中已有相同下载时返回None"""
+        video_key = build_download_key(parse_video_key(url), profile, section)
+        if video_key and any(
+            item.video_key == video_key
+            and item.status not in (DownloadStatus.FAILED, DownloadStatus.CANCELLED)
+            for item in self._items.values()
+        ):
+            return None
+
+        item = DownloadItem(
+            item_id=uuid.uuid4().hex,
+            url=url,
+            video_key=video_key,
+            title=title or url,
+            section=section,
+            profile=profile,
+        )
+        self._items[item.item_id] = item
+        self._order.append(item.item_id)
+        self.item_added.emit(item.item_id)
+
+        existing = self.find_downloaded(video_key)
+        if existing:
+            item.file_path = existing
+            item.progress = 100.0
+            self._set_status(item, DownloadStatus.SKIPPED)
+            self.item_completed.emit(item.item_id, existing)
+        else:
+            self._queue.append(item.item_id)
+        return item.item_id
+
+    def _resolve_playlist(
+        self, url: str, section: Optional[Tuple[float, float]], profile: str
+    ) -> None:
+        """启动播放列表解析，解析期间以占位任务显示
+
+        占位任务记录提交时的时间段和音频格式，解析完成后展开的任务沿用，
+        不受解析期间修改的输入影响。
+        """
+        item = DownloadItem(
+            item_id=uuid.uuid4().hex,
+            url=url,
+            title=url,
+            status=DownloadStatus.RESOLVING,
+            section=section,
+            profile=profile,
+        )
+        self._items[item.item_id] = item
+        self._order.append(item.item_id)
+        self.item_added.emit(item.item_id)
+
+        resolver = PlaylistResolveWorker(url)
+        resolver.resolved.connect(
+            lambda entries, i=item.item_id: self._on_playlist_resolved(i, entries)
+        )
+        resolver.resolve_failed.connect(
+            lambda error, i=item.item_id: self._on_playlist_failed(i, error)
+        )
+        self._resolvers[item.item_id] = resolver
+        resolver.start()
+
+    def _on_playlist_resolved(self, item_id: str, entries: list) -> None:
+        """播放列表解析完成，占位任务展开为单个视频任务"""
+        self._release_resolver(item_id)
+        item = self._items.get(item_id)
+        if item is None or item.status != DownloadStatus.RESOLVING:
+            # 解析期间已取消，丢弃结果
+            self._schedule()
+            return
+        self._items.pop(item_id)
+        self._order.remove(item_id)
+        self.item_removed.emit(item_id)
+        for entry_url, title in entries:
+            self._add_item(entry_url, title, item.section, item.profile)
+        self._schedule()
+
+    def _on_playlist_failed(self, item_id: str, error_message: str) -> None:
+        """播放列表解析失败，占位任务标记为失败"""
+        self._release_resolver(item_id)
+        item = self._items.get(item_id)
+        if item is None or item.status != DownloadStatus.RESOLVING:
+            self._schedule()
+            return
+        item.error_message = error_message
+        self._set_status(item, DownloadStatus.FAILED)
+        self.item_failed.emit(item_id, error_message)
+        self._schedule()
+
+    def _release_resolver(self, item_id: str) -> None:
+        """释放播放列表解析线程"""
+        resolver = self._resolvers.pop(item_id, None)
+        if resolver:
+            resolver.deleteLater()
+
+    def _schedule(self) -> None:
+        """在并发上限内启动排队中的任务"""
+        while self._queue and len(self._workers) < self.max_concurrent:
+            self._start_item(self._queue.popleft())
+
+        if not self.is_busy():
+            self.queue_finished.emit()
+
+    def _start_item(self, item_id: str) -> None:
+        """启动单个下载任务"""
+        item = self._items[item_id]
+        worker = OnlineAudioWorker(
+            item.url,
+            self.output_dir,
+            item.profile,
+            self.prefer_subtitles,
+            self.subtitle_format,
+            item.section,
+        )
+        worker.status_changed.connect(
+            lambda status, i=item_id: self._on_worker_status(i, status)
+        )
+        worker.download_progress.connect(
+            lambda percent, speed, eta, i=item_id: self._on_worker_progress(
+                i, percent, speed, eta
+            )
+        )
+        worker.info_resolved.connect(
+            lambda key, title, i=item_id: self._on_worker_info(i, key, title)
+        )
+        worker.subtitle_extracted.connect(
+            lambda text, path, i=item_id: self._on_worker_subtitle(i, text, path)
+        )
+        worker.extraction_completed.connect(
+            lambda path, i=item_id: self._on_worker_completed(i, path)
+        )
+        worker.extraction_failed.connect(
+            lambda error, i=item_id: self._on_worker_failed(i, error)
+        )
+        worker.finished.connect(lambda i=item_id: self._on_worker_finished(i))
+        self._workers[item_id] = worker
+        worker.start()
+
+    def cancel_all(self) -> None:
+        """取消所有排队和进行中的任务，正在解析的播放列表不再展开"""
+        while self._queue:
+            item = self._items[self._queue.popleft()]
+            self._set_status(item, DownloadStatus.CANCELLED)
+        for item_id in self._resolvers:
+            # 解析线程无法中断，结束后在回调中丢弃结果
+            self._set_status(self._items[item_id], DownloadStatus.CANCELLED)
+        for worker in self._workers.values():
+            worker.cancel()
+
+    def wait_all(self) -> None:
+        """等待所有工作线程退出（用于关闭页面）"""
+        for worker in list(self._workers.values()):
+            worker.wait()
+        for resolver in list(self._resolvers.values()):
+            resolver.wait()
+
+    def retry_failed(self) -> None:
+        """重新排队所有失败或取消的任务，已下载的部分会继续下载"""
+        retry_playlists = []
+        for item in self.items:
+            if item.status not in (DownloadStatus.FAILED, DownloadStatus.CANCELLED):
+                continue
+            if is_playlist_url(item.url):
+                retry_playlists.append(item)
+                continue
+            item.error_message = ""
+            self._set_status(item, DownloadStatus.QUEUED)
+            self._queue.append(item.item_id)
+
+        for item in retry_playlists:
+            self._items.pop(item.item_id)
+            self._order.remove(item.item_id)
+            self.item_removed.emit(item.item_id)
+            self._resolve_playlist(item.url, item.section, item.profile)
+        self._schedule()
+
+    # ==================== 工作线程回调 ====================
+
+    def _set_status(self, item: DownloadItem, status: DownloadStatus) -> None:
+        """更新任务状态并发射信号"""
+        item.status = status
+        self.item_status_changed.emit(item.item_id, status)
+
+    def _on_worker_status(self, item_id: str, status: DownloadStatus) -> None:
+        """工作线程状态变化"""
+        self._set_status(self._items[item_id], status)
+
+    def _on_worker_progress(
+        self, item_id: str, percent: float, speed: float, eta: float
+    ) -> None:
+        """工作线程下载进度"""
+        item = self._items[item_id]
+        item.progress = percent
+        item.speed = speed
+        item.eta = eta
+        self.item_progress.emit(item_id, percent, speed, eta)
+
+    def _on_worker_info(self, item_id: str, video_key: str, title: str) -> None:
+        """下载完成后补充视频信息"""
+        item = self._items[item_id]
+        item.resolved_key = video_key
+        if title:
+            item.title = title
+
+    def _on_worker_completed(self, item_id: str, file_path: str) -> None:
+        """单个任务下载完成"""
+        item = self._items[item_id]
+        item.file_path = file_path
+        item.progress = 100.0
+        keys = {key for key in (item.video_key, item.resolved_key) if key}
+        if keys:
+            for key in keys:
+                self._downloaded[key] = file_path
+            self._save_index()
+        self._set_status(item, DownloadStatus.COMPLETED)
+        self.item_completed.emit(item_id, file_path)
+
+    def _on_worker_subtitle(self, item_id: str, text: str, file_path: str) -> None:
+        """单个任务通过平台字幕直接得到文案"""
+        item = self._items[item_id]
+        item.transcript_path = file_path
+        item.progress = 100.0
+        self._set_status(item, DownloadStatus.COMPLETED)
+        self.item_transcript_ready.emit(item_id, text)
+
+    def _on_worker_failed(self, item_id: str, error_message: str) -> None:
+        """单个任务下载失败"""
+        item = self._items[item_id]
+        item.error_message = error_message
+        self._set_status(item, DownloadStatus.FAILED)
+        self.item_failed.emit(item_id, error_message)
+
+    def _on_worker_finished(self, item_id: str) -> None:
+        """工作线程退出，调度下一个任务"""
+        worker = self._workers.pop(item_id, None)
+        if worker:
+            worker.deleteLater()
+        self._schedule()
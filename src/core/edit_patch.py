@@ -0,0 +1,75 @@
+"""修改列表模块 - 解析、校验并在本地应用模型返回的修改"""
+
+import json
+from dataclasses import dataclass
+from typing import List, Tuple
+from config.core import AppConstants
+
+
+class PatchValidationError(ValueError):
+    """修改列表格式错误或无法在原文中定位"""
+
+
+@dataclass(frozen=True)
+class TextEdit:
+    """单处修改：原文片段和替换内容"""
+
+    original: str
+    replacement: str
+
+
+def _strip_code_fence(content: str) -> str:
+    """去掉模型可能附带的Markdown代码块标记"""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("\n", 1)[1] if "\n" in content else ""
+        if content.rstrip().endswith("```"):
+            content = content.rstrip()[:-3]
+    return content
+
+
+def parse_edits(content: str) -> Tuple[str, List[TextEdit]]:
+    """解析模型输出的修改列表，返回(领域, 修改列表)"""
+    try:
+        data = json.loads(_strip_code_fence(content))
+    except json.JSONDecodeError as e:
+        raise PatchValidationError(f"不是有效的JSON: {e}")
+    if not isinstance(data, dict) or not isinstance(
+        data.get(AppConstants.DEEPSEEK_RESULT_EDITS), list
+    ):
+        raise PatchValidationError("缺少edits列表")
+
+    edits = []
+    for item in data[AppConstants.DEEPSEEK_RESULT_EDITS]:
+        original = item.get(AppConstants.DEEPSEEK_EDIT_ORIGINAL) if isinstance(item, dict) else None
+        replacement = item.get(AppConstants.DEEPSEEK_EDIT_REPLACEMENT) if isinstance(item, dict) else None
+        if not isinstance(original, str) or not isinstance(replacement, str) or not original:
+            raise PatchValidationError(f"修改项格式错误: {item}")
+        if original != replacement:
+            edits.append(TextEdit(original, replacement))
+
+    domain = data.get(AppConstants.DEEPSEEK_RESULT_DOMAIN)
+    if not isinstance(domain, str) or not domain:
+        domain = AppConstants.DEEPSEEK_DEFAULT_DOMAIN
+    return domain, edits
+
+
+def apply_edits(text: str, edits: List[TextEdit]) -> str:
+    """按顺序在原文中定位并应用修改
+
+    每个片段从上一处修改之后开始查找，片段必须存在且在剩余文本中唯一，
+    保证修改不重叠、不会误改到其他相同的内容，任一处无法定位时抛出PatchValidationError。
+    """
+    parts = []
+    cursor = 0
+    for edit in edits:
+        position = text.find(edit.original, cursor)
+        if position < 0:
+            raise PatchValidationError(f"原文中找不到片段: {edit.original}")
+        if text.find(edit.original, position + 1) >= 0:
+            raise PatchValidationError(f"片段在原文中不唯一: {edit.original}")
+        parts.append(text[cursor:position])
+        parts.append(edit.replacement)
+        cursor = position + len(edit.original)
+    parts.append(text[cursor:])
+    return "".join(parts)
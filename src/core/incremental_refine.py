@@ -0,0 +1,126 @@
+"""增量修复模块 - 按段落哈希找出修改过的段落，只重新修复变化部分"""
+
+import hashlib
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+from config.core import AppConstants
+from core.text_chunker import detect_separator
+
+
+# 比较段落内容时忽略的标点和空白，修复通常只会调整这些字符
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+
+def split_paragraphs(text: str, separator: str) -> List[str]:
+    """按分隔符拆分段落，与 detect_separator 的判断方式一致"""
+    if separator == "\n\n":
+        return re.split(r"\n\s*\n", text)
+    return text.split(separator)
+
+
+def paragraph_hash(paragraph: str) -> str:
+    """段落内容哈希，忽略首尾空白"""
+    return hashlib.sha1(paragraph.strip().encode("utf-8")).hexdigest()
+
+
+def paragraph_similarity(first: str, second: str) -> float:
+    """两个段落忽略标点和空白后的相似度 0~1"""
+    first = _NON_WORD_PATTERN.sub("", first)
+    second = _NON_WORD_PATTERN.sub("", second)
+    if not first and not second:
+        return 1.0
+    return SequenceMatcher(None, first, second, autojunk=False).ratio()
+
+
+def paragraphs_aligned(source_paragraphs: List[str], refined_paragraphs: List[str]) -> bool:
+    """校验修复结果与原文的段落逐一对应
+
+    段落数相同不代表一一对应：模型可能合并一段又拆分另一段。
+    每段修复结果都要与对应原文足够相似，且比与相邻原文段落更相似，
+    否则视为对应关系不明确。
+    """
+    if len(source_paragraphs) != len(refined_paragraphs):
+        return False
+    count = len(source_paragraphs)
+    for index, (source, refined) in enumerate(zip(source_paragraphs, refined_paragraphs)):
+        similarity = paragraph_similarity(source, refined)
+        if similarity < AppConstants.REFINE_INCREMENTAL_MIN_SIMILARITY:
+            return False
+        for neighbour in (index - 1, index + 1):
+            if not 0 <= neighbour < count:
+                continue
+            if (
+                paragraph_similarity(source_paragraphs[neighbour], refined) >= similarity
+                or paragraph_similarity(source, refined_paragraphs[neighbour]) >= similarity
+            ):
+                return False
+    return True
+
+
+def plan_incremental_refine(
+    source_text: str, refined_text: str, new_text: str
+) -> Optional[Dict[int, str]]:
+    """对比上次修复的原文和当前文案，找出可以沿用修复结果的段落
+
+    上次修复结果与原文段落一一对应时才能按段落拼接；对应关系不明确
+    （如模型调整了分段）、分段方式变化或没有可沿用的段落时返回None，需完整修复。
+
+    Args:
+        source_text: 上次修复时的原文
+        refined_text: 上次的修复结果
+        new_text: 当前文案
+
+    Returns:
+        Optional[Dict[int, str]]: 当前文案中未变化的段落序号 -> 沿用的修复结果
+    """
+    if not source_text or not refined_text or not new_text:
+        return None
+    separator = detect_separator(source_text)
+    if detect_separator(new_text) != separator:
+        return None
+
+    source_paragraphs = split_paragraphs(source_text, separator)
+    refined_paragraphs = split_paragraphs(refined_text, separator)
+    if not paragraphs_aligned(source_paragraphs, refined_paragraphs):
+        return None
+
+    refined_by_hash = {}
+    for source, refined in zip(source_paragraphs, refined_paragraphs):
+        refined_by_hash.setdefault(paragraph_hash(source), refined)
+
+    reused = {}
+    for index, paragraph in enumerate(split_paragraphs(new_text, separator)):
+        refined = refined_by_hash.get(paragraph_hash(paragraph))
+        if refined is not None:
+            reused[index] = refined
+    return reused or None
+
+
+def group_changed_paragraphs(
+    text: str, reused: Dict[int, str]
+) -> List[Tuple[bool, str]]:
+    """按原顺序把段落分组：连续的变化段落合并为一组待修复文本，未变化段落直接使用修复结果
+
+    Returns:
+        List[Tuple[bool, str]]: (是否需要修复, 文本)，用 detect_separator(text) 拼接即为完整文案；
+        只有空白的变化段落无需修复，原样保留
+    """
+    separator = detect_separator(text)
+    groups: List[Tuple[bool, str]] = []
+    pending: List[str] = []
+
+    def flush() -> None:
+        if pending:
+            group_text = separator.join(pending)
+            groups.append((bool(group_text.strip()), group_text))
+            pending.clear()
+
+    for index, paragraph in enumerate(split_paragraphs(text, separator)):
+        if index in reused:
+            flush()
+            groups.append((False, reused[index]))
+        else:
+            pending.append(paragraph)
+    flush()
+    return groups
@@ -0,0 +1,253 @@
+"""大模型API HTTP客户端模块 - 共享连接池与长连接"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config.core import AppConstants
+
+
+# 记录当前线程最近一次新建连接的耗时，连接复用时为None
+_connect_timing = threading.local()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    """记录建立连接耗时的HTTP连接"""
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect_timing.seconds = time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """记录建立连接（含TLS握手）耗时的HTTPS连接"""
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect_timing.seconds = time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """使用可计时连接的连接池适配器"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+@dataclass
+class LLMRequestMetrics:
+    """单次请求的耗时指标（秒）"""
+
+    connect_time: float = 0.0  # 建立连接耗时，复用长连接时为0
+    ttfb: float = 0.0  # 发出请求到收到响应头的耗时
+    total_time: float = 0.0  # 请求总耗时（含读取响应体）
+    reused_connection: bool = False
+
+
+@dataclass
+class LLMClientStats:
+    """客户端累计统计"""
+
+    request_count: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0
+    total_connect_time: float = 0.0
+    total_ttfb: float = 0.0
+
+    @property
+    def average_ttfb(self) -> float:
+        return self.total_ttfb / self.request_count if self.request_count else 0.0
+
+
+class LLMHttpClient:
+    """大模型API HTTP客户端
+
+    所有DeepSeek请求共用一个Session，连接池保持长连接，
+    连续的文案修复和连通性检查可以复用已建立的连接，省去DNS、TCP和TLS握手。
+    客户端在多个线程间共享，单次请求的指标通过调用方传入的 metrics 对象返回。
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = AppConstants.DEEPSEEK_POOL_CONNECTIONS,
+        pool_maxsize: int = AppConstants.DEEPSEEK_POOL_MAXSIZE,
+        connect_timeout: float = AppConstants.DEEPSEEK_CONNECT_TIMEOUT,
+        read_timeout: float = AppConstants.DEEPSEEK_REQUEST_TIMEOUT,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.stats = LLMClientStats()
+        self._lock = threading.Lock()
+
+        self._session = requests.Session()
+        adapter = _TimedHTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    @staticmethod
+    def build_headers(api_key: str) -> dict:
+        """构建DeepSeek请求头"""
+        return {
+            AppConstants.DEEPSEEK_HEADER_CONTENT_TYPE: AppConstants.DEEPSEEK_CONTENT_TYPE_JSON,
+            AppConstants.DEEPSEEK_HEADER_AUTHORIZATION: f"{AppConstants.DEEPSEEK_AUTH_PREFIX}{api_key}",
+        }
+
+    def post_json(
+        self,
+        url: str,
+        api_key: str,
+        payload: dict,
+        read_timeout: Optional[float] = None,
+        stream: bool = False,
+        metrics: Optional[LLMRequestMetrics] = None,
+    ) -> requests.Response:
+        """发送JSON POST请求
+
+        Args:
+            url: 请求地址
+            api_key: API密钥
+            payload: 请求体
+            read_timeout: 读取超时时间，默认使用客户端配置
+            stream: 为True时不读取响应体，由调用方逐步读取
+            metrics: 用于接收本次请求耗时指标的对象
+
+        Returns:
+            requests.Response: 响应对象，异常与requests保持一致
+        """
+        return self._request("POST", url, api_key, payload, read_timeout, stream, metrics)
+
+    def get(
+        self,
+        url: str,
+        api_key: str,
+        read_timeout: Optional[float] = None,
+        metrics: Optional[LLMRequestMetrics] = None,
+    ) -> requests.Response:
+        """发送GET请求，用于模型列表等轻量接口"""
+        return self._request("GET", url, api_key, None, read_timeout, False, metrics)
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        api_key: str,
+        payload: Optional[dict],
+        read_timeout: Optional[float],
+        stream: bool,
+        metrics: Optional[LLMRequestMetrics] = None,
+    ) -> requests.Response:
+        """发送请求并记录连接和首字节耗时，传入 metrics 时写入本次请求的指标"""
+        timeout = (
+            self.connect_timeout,
+            read_timeout if read_timeout is not None else self.read_timeout,
+        )
+        _connect_timing.seconds = None
+        start = time.perf_counter()
+        response = self._session.request(
+            method,
+            url,
+            headers=self.build_headers(api_key),
+            json=payload,
+            timeout=timeout,
+            stream=True,
+        )
+        # 响应头已收到，此时的耗时即首字节时间
+        ttfb = time.perf_counter() - start
+        if not stream:
+            response.content  # 读取响应体，连接随后归还连接池
+
+        connect_time = _connect_timing.seconds
+        if metrics is None:
+            metrics = LLMRequestMetrics()
+        metrics.connect_time = connect_time or 0.0
+        metrics.ttfb = ttfb
+        metrics.total_time = time.perf_counter() - start
+        metrics.reused_connection = connect_time is None
+        self._record_metrics(metrics)
+        return response
+
+    def _record_metrics(self, metrics: LLMRequestMetrics) -> None:
+        """累计请求指标"""
+        with self._lock:
+            self.stats.request_count += 1
+            if metrics.reused_connection:
+                self.stats.reused_connections += 1
+            else:
+                self.stats.new_connections += 1
+            self.stats.total_connect_time += metrics.connect_time
+            self.stats.total_ttfb += metrics.ttfb
+
+        print(
+            f"LLM请求: 连接 {metrics.connect_time * 1000:.0f} ms"
+            f"{'(复用)' if metrics.reused_connection else ''}, "
+            f"首字节 {metrics.ttfb * 1000:.0f} ms, 总计 {metrics.total_time * 1000:.0f} ms"
+        )
+
+    def close(self) -> None:
+        """关闭连接池"""
+        self._session.close()
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[dict]:
+    """解析服务器推送事件(SSE)的数据行，逐个返回JSON事件，收到[DONE]时结束
+
+    Args:
+        lines: 响应的文本行，通常为 response.iter_lines(decode_unicode=True)
+    """
+    for line in lines:
+        if not line or not line.startswith(AppConstants.DEEPSEEK_SSE_DATA_PREFIX):
+            # 空行为事件分隔，":"开头为保活注释
+            continue
+        data = line[len(AppConstants.DEEPSEEK_SSE_DATA_PREFIX):].strip()
+        if data == AppConstants.DEEPSEEK_SSE_DONE:
+            return
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+# 全局客户端实例
+_llm_http_client: Optional[LLMHttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_http_client() -> LLMHttpClient:
+    """获取全局大模型HTTP客户端实例"""
+    global _llm_http_client
+    with _client_lock:
+        if _llm_http_client is None:
+            _llm_http_client = LLMHttpClient()
+        return _llm_http_client
+
+
+def reset_llm_http_client() -> None:
+    """重置大模型HTTP客户端（主要用于测试）"""
+    global _llm_http_client
+    with _client_lock:
+        if _llm_http_client is not None:
+            _llm_http_client.close()
+        _llm_http_client = None
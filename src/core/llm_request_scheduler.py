@@ -0,0 +1,239 @@
+"""大模型请求调度模块 - 重试退避、并发限制与熔断"""
+
+import hashlib
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, TypeVar
+
+import requests
+
+from config.core import AppConstants
+
+
+T = TypeVar("T")
+
+
+class LLMHTTPError(Exception):
+    """API返回非成功状态码"""
+
+    def __init__(self, status_code: int, error: str, retry_after: Optional[str] = None):
+        super().__init__(
+            AppConstants.DEEPSEEK_ERROR_API_REQUEST.format(
+                status_code=status_code, error=error
+            )
+        )
+        self.status_code = status_code
+        self.error = error
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """熔断中，请求被直接拒绝"""
+
+    def __init__(self, remaining: float):
+        super().__init__(AppConstants.DEEPSEEK_ERROR_CIRCUIT_OPEN.format(seconds=remaining))
+        self.remaining = remaining
+
+
+class RequestCancelled(Exception):
+    """等待重试期间请求被取消"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析Retry-After响应头，支持秒数和HTTP日期两种格式"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """熔断器
+
+    连续失败达到阈值后进入熔断状态，冷却时间内的请求直接失败；
+    冷却结束后放行一个试探请求，成功则恢复，失败则重新熔断。
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = AppConstants.DEEPSEEK_CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = AppConstants.DEEPSEEK_CIRCUIT_RESET_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        """请求前检查，熔断中抛出CircuitOpenError"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_seconds - time.monotonic()
+            if remaining > 0 or self._trial_running:
+                raise CircuitOpenError(max(remaining, 0.0))
+            # 冷却结束，放行一个试探请求
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release_trial(self) -> None:
+        """试探请求因其他原因结束（如被取消），允许下一个请求继续试探"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class LLMRequestScheduler:
+    """大模型请求调度器
+
+    文案修复和连通性检查共用同一调度器：
+    - 同一API密钥的并发请求数受限，多段并行修复时不会集中触发限流
+    - 429/5xx/超时/连接失败按指数退避加随机抖动重试，优先遵循Retry-After
+    - 服务端持续失败时熔断，冷却期间直接失败而不是逐个等待超时
+    """
+
+    def __init__(
+        self,
+        max_concurrent_per_key: int = AppConstants.DEEPSEEK_MAX_CONCURRENT_PER_KEY,
+        base_delay: float = AppConstants.DEEPSEEK_RETRY_BASE_DELAY,
+        max_delay: float = AppConstants.DEEPSEEK_RETRY_MAX_DELAY,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.max_concurrent_per_key = max_concurrent_per_key
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _get_semaphore(self, api_key: str) -> threading.BoundedSemaphore:
+        """获取API密钥对应的并发信号量，只保存密钥哈希"""
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key_hash not in self._semaphores:
+                self._semaphores[key_hash] = threading.BoundedSemaphore(
+                    self.max_concurrent_per_key
+                )
+            return self._semaphores[key_hash]
+
+    def compute_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """计算第attempt次重试前的等待时间，Retry-After优先，否则指数退避加全抖动"""
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_delay)
+        backoff = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(backoff / 2, backoff)
+
+    @staticmethod
+    def _sleep(delay: float, should_cancel: Optional[Callable[[], bool]]) -> None:
+        """等待重试，期间可被取消"""
+        deadline = time.monotonic() + delay
+        while True:
+            if should_cancel and should_cancel():
+                raise RequestCancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.1))
+
+    def run(
+        self,
+        api_key: str,
+        send: Callable[[], T],
+        max_retries: int = AppConstants.DEEPSEEK_RETRY_MAX_RETRIES,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> T:
+        """执行请求，失败时按策略重试
+
+        Args:
+            api_key: API密钥，用于并发限制
+            send: 发送请求并返回结果的函数，非成功状态码应抛出LLMHTTPError
+            max_retries: 最大重试次数
+            should_cancel: 返回True时停止等待重试
+
+        Returns:
+            send 的返回值
+        """
+        semaphore = self._get_semaphore(api_key)
+        attempt = 0
+        while True:
+            self.circuit_breaker.before_request()
+            retry_after = None
+            try:
+                with semaphore:
+                    result = send()
+                self.circuit_breaker.record_success()
+                return result
+            except LLMHTTPError as e:
+                if e.status_code not in AppConstants.DEEPSEEK_RETRY_STATUS_CODES:
+                    # 鉴权、参数等错误说明服务可用，不计入熔断
+                    self.circuit_breaker.record_success()
+                    raise
+                if e.status_code == AppConstants.DEEPSEEK_STATUS_TOO_MANY_REQUESTS:
+                    # 限流说明服务可用，只退避不计入熔断
+                    self.circuit_breaker.release_trial()
+                else:
+                    self.circuit_breaker.record_failure()
+                retry_after = e.retry_after
+                reason = f"HTTP {e.status_code}"
+                error = e
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                self.circuit_breaker.record_failure()
+                reason = type(e).__name__
+                error = e
+            except BaseException:
+                self.circuit_breaker.release_trial()
+                raise
+
+            attempt += 1
+            if attempt > max_retries:
+                raise error
+            delay = self.compute_delay(attempt, retry_after)
+            print(
+                AppConstants.DEEPSEEK_LOG_RETRY.format(
+                    reason=reason, delay=delay, attempt=attempt
+                )
+            )
+            self._sleep(delay, should_cancel)
+
+
+# 全局调度器实例
+_llm_request_scheduler: Optional[LLMRequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_request_scheduler() -> LLMRequestScheduler:
+    """获取全局大模型请求调度器实例"""
+    global _llm_request_scheduler
+    with _scheduler_lock:
+        if _llm_request_scheduler is None:
+            _llm_request_scheduler = LLMRequestScheduler()
+        return _llm_request_scheduler
+
+
+def reset_llm_request_scheduler() -> None:
+    """重置大模型请求调度器（主要用于测试）"""
+    global _llm_request_scheduler
+    with _scheduler_lock:
+        _llm_request_scheduler = None
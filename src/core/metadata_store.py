@@ -0,0 +1,200 @@
+"""
+元数据存储
+缓存项目元数据JSON，短时间内的多次更新合并为一次原子写入
+"""
+
+import atexit
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.core import AppConstants
+
+
+class MetadataStore:
+    """元数据存储
+
+    读取时按文件(修改时间, 大小)校验缓存，外部修改过的文件会重新读取；
+    写入先更新缓存再落盘，延迟写入在合并窗口结束时统一写一次。
+    落盘时先写同目录临时文件再原子重命名，中途失败不会留下半个JSON文件。
+    延迟写入可以带写入完成回调，用于在文件落盘后再同步索引等派生数据；
+    回调在释放锁之后调用，回调中可以再次读写元数据。
+    """
+
+    def __init__(self, flush_delay: float = AppConstants.PROJECT_METADATA_FLUSH_DELAY):
+        """
+        初始化元数据存储
+
+        Args:
+            flush_delay: 延迟写入的合并窗口（秒）
+        """
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._cache: Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        self._pending: Dict[Path, Dict[str, Any]] = {}
+        self._on_written: Dict[Path, Callable[[Dict[str, Any]], None]] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, path: Path) -> Optional[Dict[str, Any]]:
+        """
+        读取元数据
+
+        Args:
+            path: 元数据文件路径
+
+        Returns:
+            元数据字典的副本，文件不存在返回None
+        """
+        path = Path(path)
+        with self._lock:
+            # 尚未落盘的更新比磁盘上的内容新
+            if path in self._pending:
+                return dict(self._pending[path])
+
+            signature = self._signature(path)
+            if signature is None:
+                self._cache.pop(path, None)
+                return None
+            cached = self._cache.get(path)
+            if cached and cached[0] == signature:
+                return dict(cached[1])
+
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._cache[path] = (signature, data)
+            return dict(data)
+
+    def save(
+        self,
+        path: Path,
+        data: Dict[str, Any],
+        defer: bool = False,
+        on_written: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> None:
+        """
+        保存元数据
+
+        Args:
+            path: 元数据文件路径
+            data: 元数据字典
+            defer: 是否延迟到合并窗口结束时写入
+            on_written: 延迟写入落盘后的回调，参数为写入的数据；合并的多次更新只调用最后一次的回调
+        """
+        path = Path(path)
+        data = dict(data)
+        with self._lock:
+            if defer:
+                self._pending[path] = data
+                if on_written:
+                    self._on_written[path] = on_written
+                else:
+                    self._on_written.pop(path, None)
+                if self._timer is None:
+                    self._timer = threading.Timer(self.flush_delay, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            self._pending.pop(path, None)
+            self._on_written.pop(path, None)
+            self._write(path, data)
+
+    def _write(self, path: Path, data: Dict[str, Any]) -> None:
+        """原子写入文件并更新缓存"""
+        temp_path = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        self._cache[path] = (self._signature(path), data)
+
+    def flush(self, path: Optional[Path] = None) -> None:
+        """
+        立即写入延迟的更新
+
+        Args:
+            path: 只写入该文件，None表示全部
+        """
+        written = []
+        with self._lock:
+            if path is None:
+                pending, self._pending = self._pending, {}
+                callbacks, self._on_written = self._on_written, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            else:
+                path = Path(path)
+                pending = {path: self._pending.pop(path)} if path in self._pending else {}
+                callbacks = {path: self._on_written.pop(path)} if path in self._on_written else {}
+
+            for file_path, data in pending.items():
+                if not file_path.parent.exists():
+                    # 项目已被删除
+                    continue
+                try:
+                    self._write(file_path, data)
+                except OSError as e:
+                    print(f"写入元数据失败 {file_path}: {e}")
+                    continue
+                if file_path in callbacks:
+                    written.append((callbacks[file_path], data))
+
+        for callback, data in written:
+            try:
+                callback(dict(data))
+            except Exception as e:
+                print(f"元数据写入回调失败: {e}")
+
+    def discard(self, directory: Path) -> None:
+        """
+        丢弃目录下所有文件的缓存和未写入的更新，删除项目前调用
+
+        Args:
+            directory: 项目目录
+        """
+        directory = Path(directory)
+        with self._lock:
+            for cache in (self._cache, self._pending, self._on_written):
+                for path in [p for p in cache if directory in p.parents]:
+                    del cache[path]
+
+
+# 全局元数据存储实例
+_metadata_store: Optional[MetadataStore] = None
+_metadata_store_lock = threading.Lock()
+
+
+def get_metadata_store() -> MetadataStore:
+    """获取全局元数据存储实例（单例模式），程序退出时写入所有延迟的更新"""
+    global _metadata_store
+    with _metadata_store_lock:
+        if _metadata_store is None:
+            _metadata_store = MetadataStore()
+            atexit.register(_metadata_store.flush)
+        return _metadata_store
+
+
+def reset_metadata_store() -> None:
+    """写入延迟的更新并重置元数据存储（主要用于测试）"""
+    global _metadata_store
+    with _metadata_store_lock:
+        if _metadata_store is not None:
+            _metadata_store.flush()
+            atexit.unregister(_metadata_store.flush)
+        _metadata_store = None
@@ -0,0 +1,194 @@
+"""
+项目归档
+流式导出、导入项目压缩包：媒体文件不压缩直接存储，只压缩JSON和文本；
+压缩包带清单文件，导入时先校验清单再解压
+"""
+
+import json
+import os
+import shutil
+import zipfile
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, List, Optional
+
+from config.core import AppConstants
+from core.blob_store import ProgressCallback, copy_stream
+
+
+class ArchiveValidationError(ValueError):
+    """压缩包清单校验失败"""
+
+
+def _compress_type(path: Path) -> int:
+    """文本类文件压缩，音频等已压缩的媒体文件直接存储，避免无效的CPU开销"""
+    if path.suffix.lower() in AppConstants.PROJECT_ARCHIVE_COMPRESSED_EXTENSIONS:
+        return zipfile.ZIP_DEFLATED
+    return zipfile.ZIP_STORED
+
+
+def export_archive(
+    project_dir: Path,
+    export_path: str,
+    progress: Optional[ProgressCallback] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+) -> str:
+    """
+    将项目目录导出为压缩包
+
+    Args:
+        project_dir: 项目目录
+        export_path: 导出路径，没有 .zip 后缀时自动添加
+        progress: 字节级进度回调
+        should_cancel: 返回True时取消并抛出InterruptedError
+
+    Returns:
+        实际写入的压缩包路径
+    """
+    if not export_path.endswith(".zip"):
+        export_path += ".zip"
+    paths = sorted(project_dir.rglob("*"))
+    directories = [p.relative_to(project_dir).as_posix() for p in paths if p.is_dir()]
+    files = [p for p in paths if p.is_file()]
+    # 只用于进度显示，清单中的大小以实际写入的字节数为准
+    total = sum(p.stat().st_size for p in files)
+
+    # 先写临时文件，完成后再重命名，取消或失败时不留下不完整的压缩包
+    temp_path = f"{export_path}.part"
+    try:
+        with zipfile.ZipFile(temp_path, "w") as archive:
+            # 保留空目录，导入后项目结构完整
+            for directory in directories:
+                archive.writestr(directory + "/", "")
+            done = 0
+            entries = []
+            for file_path in files:
+                # from_file 记录文件大小，超过4GB的文件自动使用ZIP64
+                info = zipfile.ZipInfo.from_file(
+                    file_path, file_path.relative_to(project_dir).as_posix()
+                )
+                info.compress_type = _compress_type(file_path)
+                with open(file_path, "rb") as src, archive.open(info, "w") as dst:
+                    done = copy_stream(src, dst, total, done, progress, should_cancel)
+                # 写入完成后 file_size 为实际写入的字节数，导出期间文件被改写也与条目一致
+                entries.append({"path": info.filename, "size": info.file_size})
+
+            # 清单最后写入；导入时通过中央目录读取，不需要解压数据即可校验
+            manifest = {
+                "format_version": AppConstants.PROJECT_ARCHIVE_FORMAT_VERSION,
+                "exported_at": datetime.now().isoformat(),
+                "directories": directories,
+                "files": entries,
+            }
+            archive.writestr(
+                AppConstants.PROJECT_ARCHIVE_MANIFEST_NAME,
+                json.dumps(manifest, ensure_ascii=False, indent=2),
+                compress_type=zipfile.ZIP_DEFLATED,
+            )
+        os.replace(temp_path, export_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return export_path
+
+
+def _check_member_path(name: str) -> None:
+    path = PurePosixPath(name)
+    if path.is_absolute() or ".." in path.parts or "\\" in name or ":" in name:
+        raise ArchiveValidationError(f"压缩包包含非法路径: {name}")
+
+
+def read_manifest(archive: zipfile.ZipFile) -> Dict:
+    """
+    读取并校验清单，不解压任何数据
+
+    没有清单的旧版压缩包按条目列表生成清单，要求包含项目元数据文件。
+
+    Args:
+        archive: 已打开的压缩包
+
+    Returns:
+        清单字典
+
+    Raises:
+        ArchiveValidationError: 清单缺失、版本不支持或与压缩包内容不一致
+    """
+    members: Dict[str, zipfile.ZipInfo] = {
+        info.filename: info for info in archive.infolist() if not info.is_dir()
+    }
+    for name in archive.namelist():
+        _check_member_path(name)
+
+    manifest_name = AppConstants.PROJECT_ARCHIVE_MANIFEST_NAME
+    if manifest_name in members:
+        try:
+            manifest = json.loads(archive.read(manifest_name).decode("utf-8"))
+            version = int(manifest.get("format_version", 0))
+            entries: List[Dict] = list(manifest["files"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise ArchiveValidationError(f"压缩包清单无法解析: {e}")
+        if version > AppConstants.PROJECT_ARCHIVE_FORMAT_VERSION:
+            raise ArchiveValidationError(f"不支持的压缩包版本: {version}")
+        del members[manifest_name]
+
+        listed = set()
+        for entry in entries:
+            info = members.get(entry.get("path"))
+            if info is None:
+                raise ArchiveValidationError(f"压缩包缺少文件: {entry.get('path')}")
+            if info.file_size != entry.get("size"):
+                raise ArchiveValidationError(f"文件大小与清单不一致: {info.filename}")
+            listed.add(info.filename)
+        unlisted = set(members) - listed
+        if unlisted:
+            raise ArchiveValidationError(f"压缩包包含清单外的文件: {sorted(unlisted)[0]}")
+    else:
+        manifest = {
+            "format_version": 0,
+            "directories": [
+                info.filename.rstrip("/") for info in archive.infolist() if info.is_dir()
+            ],
+            "files": [{"path": name, "size": info.file_size} for name, info in members.items()],
+        }
+
+    if "metadata.json" not in members:
+        raise ArchiveValidationError("压缩包中没有项目元数据")
+    return manifest
+
+
+def import_archive(
+    archive_path: str,
+    project_dir: Path,
+    progress: Optional[ProgressCallback] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+) -> None:
+    """
+    校验清单后流式解压到项目目录
+
+    Args:
+        archive_path: 压缩包路径
+        project_dir: 目标项目目录，不能已存在
+        progress: 字节级进度回调（按解压后大小计算）
+        should_cancel: 返回True时取消并抛出InterruptedError
+
+    Raises:
+        ArchiveValidationError: 清单校验失败或磁盘空间不足
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        manifest = read_manifest(archive)
+        total = sum(entry["size"] for entry in manifest["files"])
+        free = shutil.disk_usage(project_dir.parent).free
+        if total > free:
+            raise ArchiveValidationError(f"磁盘空间不足，需要 {total} 字节，可用 {free} 字节")
+
+        project_dir.mkdir()
+        for directory in manifest.get("directories", []):
+            _check_member_path(directory)
+            (project_dir / directory).mkdir(parents=True, exist_ok=True)
+        done = 0
+        for entry in manifest["files"]:
+            target = project_dir / entry["path"]
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # 读取到条目末尾时 zipfile 会校验CRC，数据损坏时抛出 BadZipFile
+            with archive.open(entry["path"]) as src, open(target, "wb") as dst:
+                done = copy_stream(src, dst, total, done, progress, should_cancel)
@@ -0,0 +1,286 @@
+"""
+项目索引
+使用SQLite保存项目元数据目录，列出、筛选和分页查询项目时无需逐个读取metadata.json
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from config.core import AppConstants
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    audio_duration REAL NOT NULL DEFAULT 0,
+    audio_blob TEXT NOT NULL DEFAULT '',
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_projects_updated_at ON projects (updated_at);
+CREATE INDEX IF NOT EXISTS idx_projects_status_updated_at ON projects (status, updated_at);
+CREATE INDEX IF NOT EXISTS idx_projects_name ON projects (name);
+CREATE INDEX IF NOT EXISTS idx_projects_audio_blob ON projects (audio_blob);
+"""
+
+# 允许排序的列，避免拼接任意SQL
+_SORT_COLUMNS = ("updated_at", "created_at", "name", "audio_duration", "status")
+
+
+class ProjectIndex:
+    """项目索引
+
+    每个项目一行，metadata列保存完整元数据JSON，查询结果可直接还原为ProjectMetadata。
+    每次操作使用独立连接，可在工作线程中调用；写操作在事务中执行，
+    调用方可以通过 transaction() 把文件操作放进同一事务，文件操作失败时索引一并回滚。
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        初始化项目索引
+
+        Args:
+            db_path: 索引数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.is_new = not self.db_path.exists()
+        self._lock = threading.Lock()
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != AppConstants.PROJECT_INDEX_SCHEMA_VERSION:
+                # 索引可以随时从磁盘重建，结构变化时直接重建表
+                conn.execute("DROP TABLE IF EXISTS projects")
+                conn.execute(
+                    f"PRAGMA user_version = {AppConstants.PROJECT_INDEX_SCHEMA_VERSION}"
+                )
+                self.is_new = True
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=AppConstants.PROJECT_INDEX_TIMEOUT)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        写事务，代码块正常结束时提交，抛出异常时回滚
+
+        Yields:
+            数据库连接
+        """
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    @staticmethod
+    def upsert(conn: sqlite3.Connection, metadata) -> None:
+        """
+        写入或更新项目记录
+
+        Args:
+            conn: transaction() 返回的连接
+            metadata: 项目元数据
+        """
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO projects
+                (id, name, status, created_at, updated_at, audio_duration, audio_blob, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                metadata.id,
+                metadata.name,
+                metadata.status,
+                metadata.created_at,
+                metadata.updated_at,
+                metadata.audio_duration,
+                metadata.audio_blob,
+                json.dumps(asdict(metadata), ensure_ascii=False),
+            ),
+        )
+
+    @staticmethod
+    def update_if_newer(conn: sqlite3.Connection, metadata) -> None:
+        """
+        更新已有的项目记录，记录已被删除或已有更新的数据时不修改
+
+        Args:
+            conn: transaction() 返回的连接
+            metadata: 项目元数据
+        """
+        conn.execute(
+            """
+            UPDATE projects
+            SET name = ?, status = ?, created_at = ?, updated_at = ?,
+                audio_duration = ?, audio_blob = ?, metadata = ?
+            WHERE id = ? AND updated_at <= ?
+            """,
+            (
+                metadata.name,
+                metadata.status,
+                metadata.created_at,
+                metadata.updated_at,
+                metadata.audio_duration,
+                metadata.audio_blob,
+                json.dumps(asdict(metadata), ensure_ascii=False),
+                metadata.id,
+                metadata.updated_at,
+            ),
+        )
+
+    @staticmethod
+    def remove(conn: sqlite3.Connection, project_id: str) -> None:
+        """
+        删除项目记录
+
+        Args:
+            conn: transaction() 返回的连接
+            project_id: 项目ID
+        """
+        conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    @staticmethod
+    def _build_filter(
+        status: Optional[str], name_contains: Optional[str]
+    ) -> Tuple[str, list]:
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if name_contains:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = (
+                name_contains.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            params.append(f"%{escaped}%")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        metadata_cls,
+        status: Optional[str] = None,
+        name_contains: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        order_by: str = "updated_at",
+        descending: bool = True,
+    ) -> List:
+        """
+        分页查询项目
+
+        Args:
+            metadata_cls: 元数据类，用于还原查询结果
+            status: 只返回该状态的项目
+            name_contains: 只返回名称包含该文本的项目
+            limit: 返回数量上限，None表示不限
+            offset: 跳过的数量
+            order_by: 排序列
+            descending: 是否降序
+
+        Returns:
+            项目元数据列表
+        """
+        if order_by not in _SORT_COLUMNS:
+            raise ValueError(f"不支持的排序列: {order_by}")
+        where, params = self._build_filter(status, name_contains)
+        sql = (
+            f"SELECT metadata FROM projects{where} "
+            f"ORDER BY {order_by} {'DESC' if descending else 'ASC'}, id"
+        )
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+
+        known_fields = {field.name for field in fields(metadata_cls)}
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [
+            metadata_cls(
+                **{k: v for k, v in json.loads(row[0]).items() if k in known_fields}
+            )
+            for row in rows
+        ]
+
+    def count(self, status: Optional[str] = None, name_contains: Optional[str] = None) -> int:
+        """
+        统计符合条件的项目数
+
+        Args:
+            status: 项目状态
+            name_contains: 名称包含的文本
+
+        Returns:
+            项目数量
+        """
+        where, params = self._build_filter(status, name_contains)
+        conn = self._connect()
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM projects{where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def count_blob_references(self, digest: str) -> int:
+        """
+        统计引用某个blob的项目数
+
+        Args:
+            digest: 内容哈希
+
+        Returns:
+            项目数量
+        """
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM projects WHERE audio_blob = ?", (digest,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def referenced_blobs(self) -> List[str]:
+        """
+        获取所有被项目引用的blob
+
+        Returns:
+            内容哈希列表
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT audio_blob FROM projects WHERE audio_blob != ''"
+            ).fetchall()
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+    def rebuild(self, metadata_list: List) -> None:
+        """
+        用磁盘上读取的元数据重建索引
+
+        Args:
+            metadata_list: 所有项目的元数据
+        """
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM projects")
+            for metadata in metadata_list:
+                self.upsert(conn, metadata)
+
@@ -4,14 +4,21 @@
 """
 
 import os
-import json
 import uuid
 import shutil
+import zipfile
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List
 from dataclasses import dataclass, asdict
 
+from config.core import AppConstants
+from core.blob_store import BlobStore, ProgressCallback
+from core.metadata_store import get_metadata_store
+from core.project_archive import export_archive, import_archive
+from core.project_index import ProjectIndex
+from core.segment_store import SegmentStore
+
 @dataclass
 class ProjectMetadata:
     """项目元数据"""
@@ -25,6 +32,8 @@ class ProjectMetadata:
     speakers_count: int = 0
     status: str = "created"  # created, analyzing, analyzed, processing, completed
     target_language: str = "zh"
+    audio_blob: str = ""  # 原始音频在内容寻址存储中的哈希，为空表示未使用共享存储
+    pinned: bool = False  # 固定的项目不会被保留策略清理
 
 class AudioProjectManager:
     """音频项目管理器"""
@@ -45,14 +54,33 @@ class AudioProjectManager:
         
         self.workspace_dir = Path(workspace_dir)
         self.workspace_dir.mkdir(parents=True, exist_ok=True)
-        
-    def create_project(self, name: str, audio_file: str) -> str:
+
+        # 元数据缓存，多个管理器实例共用，未落盘的更新对所有实例可见
+        self.metadata_store = get_metadata_store()
+
+        # 内容寻址存储，相同音频在多个项目间共享
+        self.blobs = BlobStore(self.workspace_dir / AppConstants.PROJECT_BLOB_DIR_NAME)
+
+        # 项目索引，首次创建时从磁盘导入已有项目
+        self.index = ProjectIndex(self.workspace_dir / AppConstants.PROJECT_INDEX_FILE_NAME)
+        if self.index.is_new:
+            self.rebuild_index()
+        
+    def create_project(
+        self,
+        name: str,
+        audio_file: str,
+        progress: Optional[ProgressCallback] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> str:
         """
         创建新项目
         
         Args:
             name: 项目名称
             audio_file: 原始音频文件路径
+            progress: 字节级进度回调 (已处理字节数, 总字节数)
+            should_cancel: 返回True时取消并抛出InterruptedError
             
         Returns:
             项目ID
@@ -66,11 +94,15 @@ class AudioProjectManager:
         (project_dir / "transcripts").mkdir(exist_ok=True)
         (project_dir / "outputs").mkdir(exist_ok=True)
         
-        # 复制原始音频
+        # 原始音频存入共享存储，项目目录中通过硬链接或reflink引用
         audio_path = Path(audio_file)
         if audio_path.exists():
             dest_audio = project_dir / f"original_audio{audio_path.suffix}"
-            shutil.copy2(audio_file, dest_audio)
+            try:
+                audio_blob = self._store_audio(audio_file, dest_audio, progress, should_cancel)
+            except Exception:
+                shutil.rmtree(project_dir, ignore_errors=True)
+                raise
             
             # 创建项目元数据
             metadata = ProjectMetadata(
@@ -78,16 +110,51 @@ class AudioProjectManager:
                 name=name,
                 created_at=datetime.now().isoformat(),
                 updated_at=datetime.now().isoformat(),
-                original_audio=dest_audio.name
+                original_audio=dest_audio.name,
+                audio_blob=audio_blob,
             )
             
-            # 保存元数据
-            self._save_metadata(project_id, metadata)
+            # 保存元数据并写入索引，任一步失败时清理项目目录
+            try:
+                with self.index.transaction() as conn:
+                    self.index.upsert(conn, metadata)
+                    self._save_metadata(project_id, metadata)
+            except Exception:
+                shutil.rmtree(project_dir, ignore_errors=True)
+                raise
             
             return project_id
         else:
             raise FileNotFoundError(f"音频文件不存在: {audio_file}")
             
+    def _store_audio(
+        self,
+        audio_file: str,
+        dest_audio: Path,
+        progress: Optional[ProgressCallback] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> str:
+        """
+        将音频存入共享存储并在项目目录中引用
+        
+        Args:
+            audio_file: 原始音频文件路径
+            dest_audio: 项目中的音频路径
+            progress: 进度回调
+            should_cancel: 取消检查
+            
+        Returns:
+            内容哈希
+        """
+        audio_blob = self.blobs.put(audio_file, progress, should_cancel)
+        try:
+            self.blobs.link_into(audio_blob, dest_audio)
+        except FileNotFoundError:
+            # blob恰好被回收，重新写入一次
+            audio_blob = self.blobs.put(audio_file, progress, should_cancel)
+            self.blobs.link_into(audio_blob, dest_audio)
+        return audio_blob
+            
     def get_project(self, project_id: str) -> Optional[ProjectMetadata]:
         """
         获取项目信息
@@ -98,18 +165,19 @@ class AudioProjectManager:
         Returns:
             项目元数据，如果不存在返回None
         """
-        metadata_file = self.workspace_dir / project_id / "metadata.json"
-        
-        if metadata_file.exists():
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return ProjectMetadata(**data)
+        data = self.metadata_store.load(self.workspace_dir / project_id / "metadata.json")
+        if data is not None:
+            return ProjectMetadata(**data)
         
         return None
         
     def update_project(self, project_id: str, **kwargs) -> bool:
         """
         更新项目信息
+
+        状态和固定标记会影响列表查询和清理，元数据文件和索引立即同步写入；
+        其他字段的元数据文件延迟合并写入，文件落盘后再更新索引，
+        索引中的数据不会比文件新，中途退出后重建索引不会丢失更新。
         
         Args:
             project_id: 项目ID
@@ -127,15 +195,88 @@ class AudioProjectManager:
                     
             metadata.updated_at = datetime.now().isoformat()
             
-            # 保存更新
-            self._save_metadata(project_id, metadata)
+            if AppConstants.PROJECT_METADATA_SYNC_FIELDS.intersection(kwargs):
+                with self.index.transaction() as conn:
+                    self.index.upsert(conn, metadata)
+                    self._save_metadata(project_id, metadata)
+            else:
+                # 元数据文件在合并窗口结束时写一次，连续更新不会反复重写
+                self._save_metadata(
+                    project_id, metadata, defer=True, on_written=self._on_metadata_written
+                )
             return True
             
         return False
         
-    def list_projects(self) -> List[ProjectMetadata]:
+    def set_pinned(self, project_id: str, pinned: bool) -> bool:
+        """
+        固定或取消固定项目，固定的项目不会被保留策略清理
+        
+        Args:
+            project_id: 项目ID
+            pinned: 是否固定
+            
+        Returns:
+            是否更新成功
+        """
+        return self.update_project(project_id, pinned=pinned)
+        
+    def list_projects(
+        self,
+        status: Optional[str] = None,
+        name_contains: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[ProjectMetadata]:
         """
-        列出所有项目
+        从索引列出项目，按更新时间倒序
+        
+        Args:
+            status: 只返回该状态的项目
+            name_contains: 只返回名称包含该文本的项目
+            limit: 每页数量，None表示全部
+            offset: 跳过的数量
+            
+        Returns:
+            项目列表
+        """
+        return self.index.query(
+            ProjectMetadata,
+            status=status,
+            name_contains=name_contains,
+            limit=limit,
+            offset=offset,
+        )
+        
+    def count_projects(
+        self, status: Optional[str] = None, name_contains: Optional[str] = None
+    ) -> int:
+        """
+        统计项目数量
+        
+        Args:
+            status: 项目状态
+            name_contains: 名称包含的文本
+            
+        Returns:
+            项目数量
+        """
+        return self.index.count(status=status, name_contains=name_contains)
+        
+    def rebuild_index(self) -> int:
+        """
+        扫描工作空间中的项目目录重建索引
+        
+        Returns:
+            索引中的项目数量
+        """
+        projects = self._scan_projects()
+        self.index.rebuild(projects)
+        return len(projects)
+        
+    def _scan_projects(self) -> List[ProjectMetadata]:
+        """
+        逐个读取项目目录中的元数据
         
         Returns:
             项目列表
@@ -147,9 +288,6 @@ class AudioProjectManager:
                 metadata = self.get_project(project_dir.name)
                 if metadata:
                     projects.append(metadata)
-                    
-        # 按更新时间排序
-        projects.sort(key=lambda x: x.updated_at, reverse=True)
         
         return projects
         
@@ -166,11 +304,29 @@ class AudioProjectManager:
         project_dir = self.workspace_dir / project_id
         
         if project_dir.exists():
-            shutil.rmtree(project_dir)
+            metadata = self.get_project(project_id)
+            self.metadata_store.discard(project_dir)
+            with self.index.transaction() as conn:
+                self.index.remove(conn, project_id)
+                shutil.rmtree(project_dir)
+                
+            # 没有其他项目引用时删除共享的音频
+            if metadata and metadata.audio_blob:
+                if self.index.count_blob_references(metadata.audio_blob) == 0:
+                    self.blobs.remove(metadata.audio_blob)
             return True
             
         return False
         
+    def collect_garbage(self) -> tuple:
+        """
+        回收不再被任何项目引用的共享音频
+        
+        Returns:
+            (删除的文件数, 释放的字节数)
+        """
+        return self.blobs.collect_garbage(self.index.referenced_blobs())
+        
     def get_project_dir(self, project_id: str) -> Path:
         """
         获取项目目录路径
@@ -213,6 +369,20 @@ class AudioProjectManager:
         """
         return self.get_project_dir(project_id) / "speakers"
         
+    def get_segment_store(self, project_id: str) -> SegmentStore:
+        """
+        打开项目的转录片段存储
+        
+        Args:
+            project_id: 项目ID
+            
+        Returns:
+            片段存储
+        """
+        return SegmentStore(
+            self.get_project_dir(project_id) / "transcripts" / AppConstants.SEGMENT_STORE_DIR_NAME
+        )
+        
     def create_speaker_dir(self, project_id: str, speaker_id: str) -> Path:
         """
         创建说话人目录
@@ -241,10 +411,7 @@ class AudioProjectManager:
             metadata: 元数据字典
         """
         speaker_dir = self.get_speakers_dir(project_id) / speaker_id
-        metadata_file = speaker_dir / "metadata.json"
-        
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        self.metadata_store.save(speaker_dir / "metadata.json", metadata)
             
     def get_speaker_metadata(self, project_id: str, speaker_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -257,34 +424,53 @@ class AudioProjectManager:
         Returns:
             元数据字典，如果不存在返回None
         """
-        metadata_file = self.get_speakers_dir(project_id) / speaker_id / "metadata.json"
-        
-        if metadata_file.exists():
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-                
-        return None
-        
-    def _save_metadata(self, project_id: str, metadata: ProjectMetadata):
+        return self.metadata_store.load(
+            self.get_speakers_dir(project_id) / speaker_id / "metadata.json"
+        )
+        
+    def _save_metadata(
+        self,
+        project_id: str,
+        metadata: ProjectMetadata,
+        defer: bool = False,
+        on_written: Optional[Callable[[dict], None]] = None,
+    ):
         """
         保存项目元数据
         
         Args:
             project_id: 项目ID
             metadata: 项目元数据
+            defer: 是否延迟合并写入
+            on_written: 延迟写入落盘后的回调
         """
-        metadata_file = self.workspace_dir / project_id / "metadata.json"
-        
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(asdict(metadata), f, ensure_ascii=False, indent=2)
+        self.metadata_store.save(
+            self.workspace_dir / project_id / "metadata.json",
+            asdict(metadata),
+            defer=defer,
+            on_written=on_written,
+        )
+        
+    def _on_metadata_written(self, data: dict):
+        """延迟写入的元数据落盘后同步索引"""
+        with self.index.transaction() as conn:
+            self.index.update_if_newer(conn, ProjectMetadata(**data))
             
-    def export_project(self, project_id: str, export_path: str) -> bool:
+    def export_project(
+        self,
+        project_id: str,
+        export_path: str,
+        progress: Optional[ProgressCallback] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> bool:
         """
         导出项目为压缩包
         
         Args:
             project_id: 项目ID
             export_path: 导出路径
+            progress: 字节级进度回调
+            should_cancel: 返回True时取消并抛出InterruptedError
             
         Returns:
             是否导出成功
@@ -292,22 +478,26 @@ class AudioProjectManager:
         project_dir = self.get_project_dir(project_id)
         
         if project_dir.exists():
-            # 创建压缩包
-            shutil.make_archive(
-                export_path.replace('.zip', ''), 
-                'zip', 
-                project_dir
-            )
+            # 先写入延迟的元数据更新，导出的内容才是最新的
+            self.metadata_store.flush(project_dir / "metadata.json")
+            export_archive(project_dir, export_path, progress, should_cancel)
             return True
             
         return False
         
-    def import_project(self, archive_path: str) -> Optional[str]:
+    def import_project(
+        self,
+        archive_path: str,
+        progress: Optional[ProgressCallback] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> Optional[str]:
         """
         从压缩包导入项目
         
         Args:
             archive_path: 压缩包路径
+            progress: 字节级进度回调（按解压后大小计算）
+            should_cancel: 返回True时取消并抛出InterruptedError
             
         Returns:
             导入的项目ID，失败返回None
@@ -320,22 +510,29 @@ class AudioProjectManager:
         project_dir = self.workspace_dir / new_project_id
         
         try:
-            # 解压到新项目目录
-            shutil.unpack_archive(archive_path, project_dir)
+            # 解压到新项目目录，zip压缩包先校验清单，不合法时不会写入任何数据
+            if zipfile.is_zipfile(archive_path):
+                import_archive(archive_path, project_dir, progress, should_cancel)
+            else:
+                shutil.unpack_archive(archive_path, project_dir)
             
             # 更新项目ID
             metadata = self.get_project(new_project_id)
             if metadata:
                 metadata.id = new_project_id
+                # 导入的音频是独立文件，不引用本机共享存储
+                metadata.audio_blob = ""
                 metadata.updated_at = datetime.now().isoformat()
-                self._save_metadata(new_project_id, metadata)
+                with self.index.transaction() as conn:
+                    self.index.upsert(conn, metadata)
+                    self._save_metadata(new_project_id, metadata)
                 
                 return new_project_id
                 
-        except Exception as e:
-            # 清理失败的导入
+        except BaseException as e:
+            # 清理失败或取消的导入
             if project_dir.exists():
                 shutil.rmtree(project_dir)
             raise e
             
-        return None 
\ No newline at end of file
+        return None
@@ -0,0 +1,296 @@
+"""
+项目保留策略
+按总容量上限、各状态的最长保留天数清理旧项目，固定的项目不清理；
+同时清理创建中途失败留下的不完整项目目录。
+先生成清理计划，由用户确认后再删除
+"""
+
+import shutil
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from config.core import AppConstants
+from core.config_manager import ConfigManager
+
+
+@dataclass
+class RetentionPolicy:
+    """保留策略"""
+
+    max_total_bytes: int = 0  # 工作空间总容量上限，0表示不限制
+    max_age_days: Dict[str, float] = field(default_factory=dict)  # 状态 -> 最长保留天数
+    keep_pinned: bool = True  # 固定的项目不清理
+    grace_seconds: float = AppConstants.RETENTION_GRACE_SECONDS  # 最近更新的项目和目录不清理
+
+    @classmethod
+    def from_config(cls, config: Optional[ConfigManager] = None) -> "RetentionPolicy":
+        """
+        从配置文件读取策略
+
+        Args:
+            config: 配置管理器，默认读取应用配置
+
+        Returns:
+            保留策略
+        """
+        config = config or ConfigManager()
+        max_total_mb = config.get(
+            AppConstants.RETENTION_CONFIG_MAX_TOTAL_MB, AppConstants.RETENTION_DEFAULT_MAX_TOTAL_MB
+        )
+        return cls(
+            max_total_bytes=int(max_total_mb * 1024 * 1024),
+            max_age_days=dict(
+                config.get(
+                    AppConstants.RETENTION_CONFIG_MAX_AGE_DAYS,
+                    AppConstants.RETENTION_DEFAULT_MAX_AGE_DAYS,
+                )
+            ),
+            keep_pinned=config.get(AppConstants.RETENTION_CONFIG_KEEP_PINNED, True),
+        )
+
+
+@dataclass
+class RetentionCandidate:
+    """待清理项"""
+
+    path: Path
+    reason: str  # orphan, expired, quota
+    reclaimable_bytes: int
+    project_id: str = ""  # 不完整的项目目录为空
+    name: str = ""  # 显示名称，不完整的项目目录为目录名
+
+
+@dataclass
+class RetentionPlan:
+    """清理计划"""
+
+    total_bytes: int = 0  # 工作空间当前占用
+    candidates: List[RetentionCandidate] = field(default_factory=list)
+
+    @property
+    def reclaimable_bytes(self) -> int:
+        return sum(candidate.reclaimable_bytes for candidate in self.candidates)
+
+
+def _parse_time(value: str) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _disk_usage(path: Path) -> int:
+    """统计目录占用，硬链接的文件只计一次"""
+    seen = set()
+    total = 0
+    for entry in path.rglob("*"):
+        try:
+            stat = entry.lstat()
+        except OSError:
+            continue
+        if not entry.is_file() or (stat.st_dev, stat.st_ino) in seen:
+            continue
+        seen.add((stat.st_dev, stat.st_ino))
+        total += stat.st_size
+    return total
+
+
+class RetentionEngine:
+    """保留策略执行器
+
+    plan() 逐个项目统计可回收空间，apply() 逐个删除，两者都可以通过
+    should_cancel 在项目之间中止，适合在后台线程中分批执行。
+    """
+
+    def __init__(self, manager, policy: RetentionPolicy):
+        """
+        初始化执行器
+
+        Args:
+            manager: 项目管理器
+            policy: 保留策略
+        """
+        self.manager = manager
+        self.policy = policy
+
+    def _reclaimable(self, metadata) -> int:
+        """删除项目可释放的空间：只属于该项目的文件，加上仅被该项目引用的共享音频"""
+        size = 0
+        for entry in self.manager.get_project_dir(metadata.id).rglob("*"):
+            try:
+                stat = entry.lstat()
+            except OSError:
+                continue
+            if entry.is_file() and stat.st_nlink == 1:
+                size += stat.st_size
+        if metadata.audio_blob and self.manager.index.count_blob_references(metadata.audio_blob) == 1:
+            try:
+                size += self.manager.blobs.blob_path(metadata.audio_blob).stat().st_size
+            except OSError:
+                pass
+        return size
+
+    def _find_orphans(self, now: float) -> List[RetentionCandidate]:
+        """没有元数据文件的项目目录是创建中途失败留下的"""
+        orphans = []
+        for entry in self.manager.workspace_dir.iterdir():
+            if not entry.is_dir() or entry.name.startswith("_"):
+                continue
+            if (entry / "metadata.json").exists():
+                continue
+            if now - entry.stat().st_mtime < self.policy.grace_seconds:
+                # 可能正在创建
+                continue
+            orphans.append(
+                RetentionCandidate(entry, "orphan", _disk_usage(entry), name=entry.name)
+            )
+        return orphans
+
+    def plan(self, should_cancel: Optional[Callable[[], bool]] = None) -> RetentionPlan:
+        """
+        计算清理计划，不删除任何文件
+
+        Args:
+            should_cancel: 返回True时中止并抛出InterruptedError
+
+        Returns:
+            清理计划
+        """
+        now = time.time()
+        plan = RetentionPlan(total_bytes=_disk_usage(self.manager.workspace_dir))
+        plan.candidates.extend(self._find_orphans(now))
+
+        # 从最旧的项目开始，先按状态过期清理，超出总容量时再继续清理最旧的
+        remaining = plan.total_bytes - plan.reclaimable_bytes
+        for metadata in reversed(self.manager.list_projects()):
+            if should_cancel and should_cancel():
+                raise InterruptedError(AppConstants.PROJECT_MSG_CANCELLED)
+            if self.policy.keep_pinned and metadata.pinned:
+                continue
+            updated = _parse_time(metadata.updated_at)
+            if now - updated < self.policy.grace_seconds:
+                continue
+
+            max_age = self.policy.max_age_days.get(metadata.status)
+            if max_age is not None and now - updated > max_age * 86400:
+                reason = "expired"
+            elif self.policy.max_total_bytes and remaining > self.policy.max_total_bytes:
+                reason = "quota"
+            else:
+                continue
+            reclaimable = self._reclaimable(metadata)
+            remaining -= reclaimable
+            plan.candidates.append(
+                RetentionCandidate(
+                    self.manager.get_project_dir(metadata.id),
+                    reason,
+                    reclaimable,
+                    metadata.id,
+                    metadata.name,
+                )
+            )
+        return plan
+
+    def apply(
+        self,
+        plan: RetentionPlan,
+        on_removed: Optional[Callable[[RetentionCandidate], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> int:
+        """
+        按计划逐个删除
+
+        Args:
+            plan: plan() 返回的清理计划
+            on_removed: 每删除一项后回调
+            should_cancel: 返回True时在下一项之前停止
+
+        Returns:
+            实际释放的字节数
+        """
+        freed = 0
+        for candidate in plan.candidates:
+            if should_cancel and should_cancel():
+                break
+            try:
+                if candidate.project_id:
+                    # 计划生成后被固定的项目不删除
+                    metadata = self.manager.get_project(candidate.project_id)
+                    if metadata is None or (self.policy.keep_pinned and metadata.pinned):
+                        continue
+                    self.manager.delete_project(candidate.project_id)
+                else:
+                    shutil.rmtree(candidate.path)
+            except OSError as e:
+                print(f"{AppConstants.RETENTION_LOG_REMOVE_FAILED}: {candidate.path}: {e}")
+                continue
+            freed += candidate.reclaimable_bytes
+            if on_removed:
+                on_removed(candidate)
+        self.manager.collect_garbage()
+        return freed
+
+
+class RetentionWorker(QThread):
+    """保留策略后台线程
+
+    默认只生成清理计划并通过 plan_ready 报告，不删除任何文件；
+    传入用户确认过的 plan 时跳过计划阶段，按该计划逐个清理。
+    """
+
+    plan_ready = pyqtSignal(object)  # RetentionPlan
+    project_removed = pyqtSignal(str, "qint64")  # 路径, 释放字节数
+    cleanup_finished = pyqtSignal("qint64")  # 共释放字节数
+    error_occurred = pyqtSignal(str)
+
+    def __init__(
+        self,
+        manager,
+        policy: Optional[RetentionPolicy] = None,
+        dry_run: bool = True,
+        plan: Optional[RetentionPlan] = None,
+    ):
+        """
+        初始化清理线程
+
+        Args:
+            manager: 项目管理器
+            policy: 保留策略，默认读取配置
+            dry_run: 为True时只生成计划
+            plan: 已确认的清理计划，提供时直接执行
+        """
+        super().__init__()
+        self.engine = RetentionEngine(manager, policy or RetentionPolicy.from_config())
+        self.dry_run = dry_run and plan is None
+        self.plan = plan
+
+    def run(self):
+        """生成清理计划，非 dry_run 时按计划清理"""
+        try:
+            plan = self.plan or self.engine.plan(self.isInterruptionRequested)
+            print(
+                AppConstants.RETENTION_LOG_PLAN.format(
+                    total=plan.total_bytes,
+                    count=len(plan.candidates),
+                    reclaimable=plan.reclaimable_bytes,
+                )
+            )
+            self.plan_ready.emit(plan)
+            if self.dry_run or not plan.candidates:
+                return
+            freed = self.engine.apply(
+                plan,
+                lambda c: self.project_removed.emit(str(c.path), c.reclaimable_bytes),
+                self.isInterruptionRequested,
+            )
+            self.cleanup_finished.emit(freed)
+        except InterruptedError:
+            pass
+        except Exception as e:
+            print(f"{AppConstants.RETENTION_LOG_REMOVE_FAILED}: {e}")
+            self.error_occurred.emit(str(e))
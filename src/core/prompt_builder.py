@@ -0,0 +1,53 @@
+"""提示词构建模块 - 固定前缀的系统提示词与可变文案分离"""
+
+import re
+from typing import Iterable, List, Optional
+from config.core import AppConstants
+
+
+def parse_glossary(text: str) -> List[str]:
+    """解析术语表输入，支持中英文逗号、顿号、分号和换行分隔"""
+    return [term.strip() for term in re.split(r"[,，、;；\n]", text) if term.strip()]
+
+
+class RefinePromptBuilder:
+    """文案修复提示词构建器
+
+    DeepSeek按请求前缀命中上下文缓存，因此固定的指令和术语表放在system消息中，
+    只把待修复的文案作为user消息追加在后面。同一次修复的所有分段以及相同设置下的
+    重复修复都共享完全相同的前缀，前缀部分的Token按缓存命中计费，首字节也更快。
+    """
+
+    def __init__(
+        self,
+        system_prompt: Optional[str] = None,
+        glossary: Optional[Iterable[str]] = None,
+    ):
+        self.system_prompt = system_prompt or AppConstants.DEEPSEEK_SYSTEM_PROMPT
+        # 去重并排序，术语输入顺序不同也得到相同前缀
+        self.glossary = sorted({term.strip() for term in glossary or [] if term.strip()})
+        self.system_prefix = self._build_system_prefix()
+
+    def _build_system_prefix(self) -> str:
+        """生成固定的系统提示词前缀"""
+        if not self.glossary:
+            return self.system_prompt
+        return "\n\n".join(
+            [
+                self.system_prompt,
+                AppConstants.DEEPSEEK_GLOSSARY_HEADER + "\n" + "\n".join(self.glossary),
+            ]
+        )
+
+    def build_messages(self, text: str) -> List[dict]:
+        """生成请求消息列表：固定的系统前缀 + 待修复文案"""
+        return [
+            {
+                AppConstants.DEEPSEEK_MESSAGE_ROLE: AppConstants.DEEPSEEK_ROLE_SYSTEM,
+                AppConstants.DEEPSEEK_MESSAGE_CONTENT: self.system_prefix,
+            },
+            {
+                AppConstants.DEEPSEEK_MESSAGE_ROLE: AppConstants.DEEPSEEK_ROLE_USER,
+                AppConstants.DEEPSEEK_MESSAGE_CONTENT: text,
+            },
+        ]
@@ -0,0 +1,138 @@
+"""文案修复结果缓存模块 - 按提示词哈希持久化修复结果"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from config.core import AppConstants
+
+
+def make_cache_key(
+    text: str,
+    prompt_template: str,
+    model: str = AppConstants.DEEPSEEK_DEFAULT_MODEL,
+    temperature: float = AppConstants.DEEPSEEK_DEFAULT_TEMPERATURE,
+    template_version: int = AppConstants.DEEPSEEK_PROMPT_TEMPLATE_VERSION,
+) -> str:
+    """根据模型、温度、模板版本和输入文案生成缓存键"""
+    source = json.dumps(
+        [model, temperature, template_version, prompt_template, text],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class RefineCache:
+    """文案修复结果磁盘缓存
+
+    每条结果保存为一个JSON文件，命中时更新文件修改时间，
+    超出条目数或总大小上限时按修改时间淘汰最久未使用的条目(LRU)。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_entries: int = AppConstants.REFINE_CACHE_MAX_ENTRIES,
+        max_bytes: int = AppConstants.REFINE_CACHE_MAX_BYTES,
+    ):
+        self.cache_dir = cache_dir or (
+            Path.home() / ".expert-potato" / AppConstants.REFINE_CACHE_DIR_NAME
+        )
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Tuple[float, int]]] = None  # 键 -> (最近使用时间, 文件大小)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> Dict[str, Tuple[float, int]]:
+        """首次访问时扫描缓存目录建立索引"""
+        if self._index is None:
+            self._index = {}
+            if self.cache_dir.exists():
+                for entry in os.scandir(self.cache_dir):
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        self._index[entry.name[:-5]] = (stat.st_mtime, stat.st_size)
+        return self._index
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """读取缓存，返回(领域, 修复后文案)，未命中返回None"""
+        with self._lock:
+            index = self._load_index()
+            path = self._entry_path(key)
+            if key in index:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    # 更新文件修改时间，下次启动时仍能按最近使用排序
+                    os.utime(path)
+                    index[key] = (time.time(), index[key][1])
+                    self.hits += 1
+                    return data["domain"], data["text"]
+                except (OSError, json.JSONDecodeError, KeyError) as e:
+                    print(f"读取修复缓存失败: {e}")
+                    index.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, domain: str, text: str) -> None:
+        """写入缓存并按LRU淘汰超出上限的条目"""
+        with self._lock:
+            index = self._load_index()
+            path = self._entry_path(key)
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                temp_path = path.with_suffix(".tmp")
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump({"domain": domain, "text": text}, f, ensure_ascii=False)
+                os.replace(temp_path, path)
+                index[key] = (time.time(), path.stat().st_size)
+            except OSError as e:
+                print(f"写入修复缓存失败: {e}")
+                return
+            self._evict(index)
+
+    def _evict(self, index: Dict[str, Tuple[float, int]]) -> None:
+        """淘汰最久未使用的条目直到满足上限"""
+        total_bytes = sum(size for _, size in index.values())
+        if len(index) <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+        for key in sorted(index, key=lambda k: index[k][0]):
+            if len(index) <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            total_bytes -= index.pop(key)[1]
+            try:
+                self._entry_path(key).unlink()
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            for key in list(self._load_index()):
+                try:
+                    self._entry_path(key).unlink()
+                except OSError:
+                    pass
+            self._index = {}
+
+
+# 全局缓存实例
+_refine_cache: Optional[RefineCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_refine_cache() -> RefineCache:
+    """获取全局文案修复缓存实例"""
+    global _refine_cache
+    with _cache_lock:
+        if _refine_cache is None:
+            _refine_cache = RefineCache()
+        return _refine_cache
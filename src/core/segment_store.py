@@ -0,0 +1,295 @@
+"""
+转录片段存储
+按列保存片段的开始、结束时间和置信度，文本拼接为一个UTF-8文件并记录偏移，
+按时间二分查找，转录过程中可逐条追加，读取时无需重新解析字幕文本
+"""
+
+import bisect
+import os
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from core.transcript_format import TranscriptSegment, segment_confidence
+
+
+# 列文件名 -> array类型码，数值统一按小端序存储
+_COLUMNS = {
+    "start": "d",
+    "end": "d",
+    "confidence": "f",
+    "offsets": "Q",  # 每个片段文本在文本文件中的结束字节偏移
+}
+_TEXT_FILE = "text.utf8"
+
+
+class SegmentStore:
+    """项目转录片段存储
+
+    片段按开始时间顺序追加，开始时间必须不小于上一个片段。
+    追加只写文件末尾，调用 flush() 后落盘；打开时各列长度不一致
+    （如写入中途退出）会截断到完整的片段数。
+    """
+
+    def __init__(self, directory: Path):
+        """
+        打开片段存储，目录不存在时创建
+
+        Args:
+            directory: 存储目录
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._columns: Dict[str, array] = {}
+        self._text = bytearray()
+        self._handles: Dict[str, BinaryIO] = {}
+        self._max_duration = 0.0
+        self._load()
+
+    # ---------- 读写文件 ----------
+
+    def _column_path(self, name: str) -> Path:
+        return self.directory / f"{name}.bin"
+
+    @staticmethod
+    def _to_disk(values: array) -> bytes:
+        if sys.byteorder == "big":
+            values = array(values.typecode, values)
+            values.byteswap()
+        return values.tobytes()
+
+    def _load(self) -> None:
+        for name, typecode in _COLUMNS.items():
+            values = array(typecode)
+            path = self._column_path(name)
+            if path.exists():
+                data = path.read_bytes()
+                values.frombytes(data[: len(data) - len(data) % values.itemsize])
+                if sys.byteorder == "big":
+                    values.byteswap()
+            self._columns[name] = values
+        text_path = self.directory / _TEXT_FILE
+        self._text = bytearray(text_path.read_bytes()) if text_path.exists() else bytearray()
+
+        # 中途退出时各列可能只写入了一部分，截断到完整的片段
+        count = min(len(values) for values in self._columns.values())
+        offsets = self._columns["offsets"]
+        while count and offsets[count - 1] > len(self._text):
+            count -= 1
+        text_size = offsets[count - 1] if count else 0
+        consistent = (
+            all(len(values) == count for values in self._columns.values())
+            and len(self._text) == text_size
+        )
+        if not consistent:
+            for name in _COLUMNS:
+                del self._columns[name][count:]
+            del self._text[text_size:]
+            self._rewrite()
+
+        starts, ends = self._columns["start"], self._columns["end"]
+        self._max_duration = max((e - s for s, e in zip(starts, ends)), default=0.0)
+
+    def _rewrite(self) -> None:
+        """用内存中的数据原子重写所有文件"""
+        self._close_handles()
+        contents = {self._column_path(name): self._to_disk(self._columns[name]) for name in _COLUMNS}
+        contents[self.directory / _TEXT_FILE] = bytes(self._text)
+        for path, data in contents.items():
+            temp_path = path.with_name(f".{path.name}.tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+
+    def _handle(self, name: str) -> BinaryIO:
+        handle = self._handles.get(name)
+        if handle is None:
+            path = self.directory / _TEXT_FILE if name == _TEXT_FILE else self._column_path(name)
+            handle = open(path, "ab")
+            self._handles[name] = handle
+        return handle
+
+    def _close_handles(self) -> None:
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+
+    # ---------- 写入 ----------
+
+    def append(self, start: float, end: float, text: str, confidence: float = 1.0) -> int:
+        """
+        追加一个片段
+
+        Args:
+            start: 开始时间（秒）
+            end: 结束时间（秒）
+            text: 片段文本
+            confidence: 置信度 0~1
+
+        Returns:
+            片段序号
+
+        Raises:
+            ValueError: 开始时间早于上一个片段
+        """
+        with self._lock:
+            starts = self._columns["start"]
+            if starts and start < starts[-1]:
+                raise ValueError(f"片段开始时间 {start} 早于上一个片段 {starts[-1]}")
+            encoded = text.encode("utf-8")
+            self._text += encoded
+            row = {
+                "start": start,
+                "end": end,
+                "confidence": confidence,
+                "offsets": len(self._text),
+            }
+            # 先写文本再写偏移，中途退出时打开会丢弃不完整的片段
+            self._handle(_TEXT_FILE).write(encoded)
+            for name, typecode in _COLUMNS.items():
+                self._columns[name].append(row[name])
+                self._handle(name).write(self._to_disk(array(typecode, [row[name]])))
+            self._max_duration = max(self._max_duration, end - start)
+            return len(starts) - 1
+
+    def extend(self, segments: Iterable) -> None:
+        """
+        追加多个片段并落盘
+
+        Args:
+            segments: 带 start/end/text 属性的片段，可带 confidence
+        """
+        with self._lock:
+            for segment in segments:
+                self.append(
+                    segment.start,
+                    segment.end,
+                    segment.text,
+                    segment_confidence(segment),
+                )
+            self.flush()
+
+    def flush(self) -> None:
+        """把追加的片段写入磁盘"""
+        with self._lock:
+            for handle in self._handles.values():
+                handle.flush()
+
+    def clear(self) -> None:
+        """删除所有片段，重新转录前调用"""
+        with self._lock:
+            for name, typecode in _COLUMNS.items():
+                self._columns[name] = array(typecode)
+            self._text = bytearray()
+            self._max_duration = 0.0
+            self._rewrite()
+
+    def close(self) -> None:
+        """落盘并关闭文件"""
+        with self._lock:
+            self.flush()
+            self._close_handles()
+
+    # ---------- 读取 ----------
+
+    def __len__(self) -> int:
+        return len(self._columns["start"])
+
+    def text(self, index: int) -> str:
+        """
+        获取片段文本
+
+        Args:
+            index: 片段序号
+
+        Returns:
+            片段文本
+        """
+        with self._lock:
+            offsets = self._columns["offsets"]
+            begin = offsets[index - 1] if index > 0 else 0
+            return self._text[begin:offsets[index]].decode("utf-8")
+
+    def __getitem__(self, index: int) -> TranscriptSegment:
+        with self._lock:
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(index)
+            return TranscriptSegment(
+                self._columns["start"][index],
+                self._columns["end"][index],
+                self.text(index),
+                self._columns["confidence"][index],
+            )
+
+    def __iter__(self) -> Iterator[TranscriptSegment]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def index_at(self, time: float) -> Optional[int]:
+        """
+        二分查找覆盖某个时间点的片段
+
+        Args:
+            time: 时间（秒）
+
+        Returns:
+            片段序号，多个片段重叠时返回开始时间最晚的，该时间没有片段时返回None
+        """
+        with self._lock:
+            starts, ends = self._columns["start"], self._columns["end"]
+            # 片段可能重叠，向前查找到 time - 最长片段时长 为止，更早的片段不可能覆盖该时间
+            low = bisect.bisect_left(starts, time - self._max_duration)
+            for index in range(bisect.bisect_right(starts, time) - 1, low - 1, -1):
+                if time < ends[index]:
+                    return index
+            return None
+
+    def between(self, start: float, end: float) -> List[TranscriptSegment]:
+        """
+        获取与时间区间重叠的片段
+
+        Args:
+            start: 区间开始（秒）
+            end: 区间结束（秒）
+
+        Returns:
+            片段列表，按开始时间排序
+        """
+        with self._lock:
+            starts, ends = self._columns["start"], self._columns["end"]
+            # 开始时间早于 start - 最长片段时长 的片段不可能与区间重叠
+            low = bisect.bisect_left(starts, start - self._max_duration)
+            high = bisect.bisect_left(starts, end)
+            return [self[i] for i in range(low, high) if ends[i] > start]
+
+    def search(self, keyword: str) -> List[int]:
+        """
+        查找包含关键词的片段
+
+        Args:
+            keyword: 关键词
+
+        Returns:
+            片段序号列表
+        """
+        if not keyword:
+            return []
+        needle = keyword.encode("utf-8")
+        with self._lock:
+            offsets = self._columns["offsets"]
+            matches: List[int] = []
+            position = self._text.find(needle)
+            while position >= 0:
+                # 匹配位置所在的片段，跨片段边界的匹配不计入
+                index = bisect.bisect_right(offsets, position)
+                if position + len(needle) <= offsets[index]:
+                    matches.append(index)
+                    position = self._text.find(needle, offsets[index])
+                else:
+                    position = self._text.find(needle, position + 1)
+            return matches
+
@@ -1,9 +1,10 @@
 """全局状态管理模块 - 类似Vue Pinia的状态管理方案"""
 
-from typing import Any, Dict, Callable, Optional, List
-from PyQt6.QtCore import QObject, pyqtSignal
+import time
+from typing import Any, Dict, Callable, Optional, List, Sequence, Tuple, Union
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 from enum import Enum
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from config.core import AppConstants
 
 
@@ -40,6 +41,7 @@ class FileStateData:
     path: str = ""
     name: str = ""
     state: FileState = FileState.NONE
+    time_offset: float = 0.0  # 片段音频在原视频中的起始秒数
 
 
 @dataclass
@@ -64,6 +66,29 @@ class RefineTextState:
     detected_domain: str = ""
     error_message: str = ""
     refine_time: int = 0  # 修复耗时（秒）
+    source_text: str = ""  # 本次修复结果对应的原文，用于下次增量修复
+
+
+@dataclass
+class ProgressStats:
+    """进度通知统计，每次开始提取或修复时重新计数"""
+
+    received: int = 0  # 收到的进度更新次数
+    emitted: int = 0  # 实际发出的通知次数
+    started_at: float = 0.0  # 首次收到更新的 time.monotonic() 时间戳
+
+    @property
+    def dropped(self) -> int:
+        """被合并掉的更新次数"""
+        return self.received - self.emitted
+
+    @property
+    def emit_rate(self) -> float:
+        """每秒发出的通知数"""
+        if not self.started_at:
+            return 0.0
+        elapsed = time.monotonic() - self.started_at
+        return self.emitted / elapsed if elapsed > 0 else 0.0
 
 
 @dataclass
@@ -75,6 +100,23 @@ class AppState:
     refine: RefineTextState = field(default_factory=RefineTextState)
 
 
+# 长文本字段只按对象判断是否变化，避免逐字符比较
+_LARGE_TEXT_FIELDS = {
+    "extract.extracted_text",
+    "refine.refined_text",
+    "refine.source_text",
+}
+
+
+@dataclass
+class _Selection:
+    """字段订阅"""
+
+    paths: Tuple[str, ...]
+    callback: Callable
+    versions: Tuple[int, ...]
+
+
 class StateManager(QObject):
     """全局状态管理器 - 类似Vue Pinia的Store"""
 
@@ -107,68 +149,135 @@ class StateManager(QObject):
             "extract": [],
             "refine": [],
         }
+        self._versions: Dict[str, int] = {}  # 字段路径 -> 版本号，字段值变化时加一
+        self._selections: List[_Selection] = []
+
+        # 进度通知节流：每个通道每帧最多通知一次，期间的更新只保留最新值
+        self._progress_interval = AppConstants.STATE_PROGRESS_INTERVAL_MS / 1000
+        self._progress_stats: Dict[str, ProgressStats] = {}
+        self._progress_last_emit: Dict[str, float] = {}
+        self._progress_timers: Dict[str, QTimer] = {}
+        for channel in ("extract", "refine"):
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda channel=channel: self._emit_progress(channel))
+            self._progress_timers[channel] = timer
+            self._reset_progress(channel)
 
     @property
     def state(self) -> AppState:
         """获取当前状态"""
         return self._state
 
+    # ==================== 字段版本 ====================
+
+    def _update(self, section: str, **values: Any) -> bool:
+        """写入状态字段，值变化的字段版本号加一
+
+        长文本字段只比较是否为同一对象，不逐字符比较内容；其他字段按值比较。
+
+        Args:
+            section: 状态分区 ('file', 'extract', 'refine')
+            **values: 字段名 -> 新值
+
+        Returns:
+            bool: 是否有字段变化
+        """
+        target = getattr(self._state, section)
+        changed = False
+        for name, value in values.items():
+            old = getattr(target, name)
+            path = f"{section}.{name}"
+            if old is value or (path not in _LARGE_TEXT_FIELDS and old == value):
+                continue
+            setattr(target, name, value)
+            self._versions[path] = self._versions.get(path, 0) + 1
+            changed = True
+        return changed
+
+    def _replace_section(self, section: str, new_state: Any) -> bool:
+        """用新的状态对象替换分区，逐字段比较以保留版本号"""
+        return self._update(
+            section,
+            **{f.name: getattr(new_state, f.name) for f in fields(new_state)},
+        )
+
+    def get_version(self, path: str) -> int:
+        """获取字段版本号，版本号相同说明字段未变化
+
+        Args:
+            path: 字段路径，如 'extract.extracted_text'
+
+        Returns:
+            int: 版本号
+        """
+        return self._versions.get(path, 0)
+
     # ==================== 文件状态管理 ====================
 
-    def set_file(self, file_path: str) -> None:
-        """设置选中的文件"""
+    def set_file(self, file_path: str, time_offset: float = 0.0) -> None:
+        """设置选中的文件
+
+        Args:
+            file_path: 文件路径
+            time_offset: 文件为视频片段时，片段在原视频中的起始秒数
+        """
         import os
 
-        self._state.file.path = file_path
-        self._state.file.name = os.path.basename(file_path) if file_path else ""
-        self._state.file.state = FileState.LOADED if file_path else FileState.NONE
+        changed = self._update(
+            "file",
+            path=file_path,
+            time_offset=time_offset,
+            name=os.path.basename(file_path) if file_path else "",
+            state=FileState.LOADED if file_path else FileState.NONE,
+        )
 
         # 发射信号
         self.file_state_changed.emit(self._state.file.state)
         self.file_selected.emit(file_path, self._state.file.name)
 
         # 通知订阅者
-        self._notify_subscribers("file")
+        if changed:
+            self._notify_subscribers("file")
 
     def reset_file(self) -> None:
         """重置文件状态"""
-        self._state.file = FileStateData()
+        changed = self._replace_section("file", FileStateData())
         self.file_state_changed.emit(self._state.file.state)
-        self._notify_subscribers("file")
+        if changed:
+            self._notify_subscribers("file")
 
     # ==================== 文本提取状态管理 ====================
 
     def start_extract(self, model_name: str = None) -> None:
         """开始文本提取"""
-        if model_name:
-            self._state.extract.selected_model = model_name
-        self._state.extract.state = ExtractState.PROCESSING
-        self._state.extract.progress = 0
-        self._state.extract.extracted_text = ""
-        self._state.extract.error_message = ""
+        self._reset_progress("extract")
+        changed = self._update(
+            "extract",
+            selected_model=model_name or self._state.extract.selected_model,
+            state=ExtractState.PROCESSING,
+            progress=0,
+            extracted_text="",
+            error_message="",
+        )
 
         # 发射信号
         self.extract_state_changed.emit(self._state.extract.state)
         self.extract_started.emit(self._state.extract.selected_model)
 
         # 通知订阅者
-        self._notify_subscribers("extract")
+        if changed:
+            self._notify_subscribers("extract")
 
     def update_extract_progress(self, progress: int) -> None:
-        """更新提取进度"""
-        self._state.extract.progress = progress
-
-        # 发射信号
-        self.extract_progress_updated.emit(progress)
-
-        # 通知订阅者
-        self._notify_subscribers("extract")
+        """更新提取进度，通知按帧间隔合并"""
+        self._throttle_progress("extract", self._update("extract", progress=progress))
 
     def complete_extract(self, extracted_text: str) -> None:
         """完成文本提取"""
-        self._state.extract.state = ExtractState.COMPLETED
-        self._state.extract.extracted_text = extracted_text
-        self._state.extract.progress = 100
+        self._flush_progress("extract")
+        self._update("extract", state=ExtractState.COMPLETED, progress=100)
+        text_changed = self._update("extract", extracted_text=extracted_text)
 
         # 发射信号
         self.extract_state_changed.emit(self._state.extract.state)
@@ -177,67 +286,85 @@ class StateManager(QObject):
 
         # 通知订阅者
         self._notify_subscribers("extract")
-        self._notify_subscribers("refine")  # 修复区域也需要更新
+        if text_changed:
+            self._notify_subscribers("refine")  # 修复区域依赖提取的文本
 
     def fail_extract(self, error_message: str) -> None:
         """提取失败"""
-        self._state.extract.state = ExtractState.ERROR
-        self._state.extract.error_message = error_message
+        self._flush_progress("extract")
+        changed = self._update(
+            "extract", state=ExtractState.ERROR, error_message=error_message
+        )
 
         # 发射信号
         self.extract_state_changed.emit(self._state.extract.state)
         self.extract_failed.emit(error_message)
 
         # 通知订阅者
-        self._notify_subscribers("extract")
+        if changed:
+            self._notify_subscribers("extract")
 
     def reset_extract(self) -> None:
         """重置提取状态"""
-        self._state.extract = ExtractTextState()
+        self._reset_progress("extract")
+        changed = self._replace_section("extract", ExtractTextState())
         self.extract_state_changed.emit(self._state.extract.state)
         self.extract_text_changed.emit("")
-        self._notify_subscribers("extract")
+        if changed:
+            self._notify_subscribers("extract")
 
     # ==================== 文本修复状态管理 ====================
 
     def set_api_key(self, api_key: str) -> None:
         """设置API密钥"""
-        self._state.refine.api_key = api_key
-        self._notify_subscribers("refine")
+        if self._update("refine", api_key=api_key):
+            self._notify_subscribers("refine")
 
     def start_refine(self) -> None:
         """开始文本修复"""
         original_text = self._state.extract.extracted_text
-        self._state.refine.state = RefineState.PROCESSING
-        self._state.refine.progress = 0
-        self._state.refine.refined_text = ""
-        self._state.refine.detected_domain = ""
-        self._state.refine.error_message = ""
-        self._state.refine.refine_time = 0
+        self._reset_progress("refine")
+        changed = self._update(
+            "refine",
+            state=RefineState.PROCESSING,
+            progress=0,
+            refined_text="",
+            detected_domain="",
+            error_message="",
+            refine_time=0,
+        )
 
         # 发射信号
         self.refine_state_changed.emit(self._state.refine.state)
         self.refine_started.emit(original_text)
 
         # 通知订阅者
-        self._notify_subscribers("refine")
+        if changed:
+            self._notify_subscribers("refine")
 
     def update_refine_progress(self, progress: int) -> None:
-        """更新修复进度"""
-        self._state.refine.progress = progress
-
-        # 发射信号
-        self.refine_progress_updated.emit(progress)
+        """更新修复进度，通知按帧间隔合并"""
+        self._throttle_progress("refine", self._update("refine", progress=progress))
 
-        # 通知订阅者
-        self._notify_subscribers("refine")
+    def complete_refine(
+        self, refined_text: str, detected_domain: str = "", source_text: str = ""
+    ) -> None:
+        """完成文本修复
 
-    def complete_refine(self, refined_text: str, detected_domain: str = "") -> None:
-        """完成文本修复"""
-        self._state.refine.state = RefineState.COMPLETED
-        self._state.refine.refined_text = refined_text
-        self._state.refine.detected_domain = detected_domain
-        self._state.refine.progress = 100
+        Args:
+            refined_text: 修复后的文案
+            detected_domain: 检测到的领域
+            source_text: 修复时使用的原文，下次修复时据此找出未修改的段落
+        """
+        self._flush_progress("refine")
+        self._update(
+            "refine",
+            state=RefineState.COMPLETED,
+            refined_text=refined_text,
+            source_text=source_text,
+            detected_domain=detected_domain,
+            progress=100,
+        )
 
         # 发射信号
         self.refine_state_changed.emit(self._state.refine.state)
@@ -249,29 +376,95 @@ class StateManager(QObject):
 
     def fail_refine(self, error_message: str) -> None:
         """修复失败"""
-        self._state.refine.state = RefineState.ERROR
-        self._state.refine.error_message = error_message
+        self._flush_progress("refine")
+        changed = self._update(
+            "refine", state=RefineState.ERROR, error_message=error_message
+        )
 
         # 发射信号
         self.refine_state_changed.emit(self._state.refine.state)
         self.refine_failed.emit(error_message)
 
         # 通知订阅者
-        self._notify_subscribers("refine")
+        if changed:
+            self._notify_subscribers("refine")
 
     def update_refine_time(self, refine_time: int) -> None:
         """更新修复耗时"""
-        self._state.refine.refine_time = refine_time
-        self._notify_subscribers("refine")
+        if self._update("refine", refine_time=refine_time):
+            self._notify_subscribers("refine")
 
     def reset_refine(self) -> None:
         """重置修复状态"""
-        api_key = self._state.refine.api_key  # 保留API密钥
-        self._state.refine = RefineTextState()
-        self._state.refine.api_key = api_key
+        self._reset_progress("refine")
+        # 保留API密钥
+        changed = self._replace_section(
+            "refine", RefineTextState(api_key=self._state.refine.api_key)
+        )
         self.refine_state_changed.emit(self._state.refine.state)
         self.refine_text_changed.emit("")
-        self._notify_subscribers("refine")
+        if changed:
+            self._notify_subscribers("refine")
+
+    # ==================== 进度通知节流 ====================
+
+    def _throttle_progress(self, channel: str, changed: bool = True) -> None:
+        """距上次通知超过帧间隔时立即通知，否则在间隔结束时用最新进度通知一次
+
+        Args:
+            channel: 'extract' 或 'refine'
+            changed: 进度值是否变化，未变化的更新只计数不通知
+        """
+        stats = self._progress_stats[channel]
+        now = time.monotonic()
+        stats.received += 1
+        if not stats.started_at:
+            stats.started_at = now
+        if not changed:
+            return
+
+        timer = self._progress_timers[channel]
+        if timer.isActive():
+            # 已安排通知，届时读取最新进度
+            return
+        wait = self._progress_last_emit[channel] + self._progress_interval - now
+        if wait <= 0:
+            self._emit_progress(channel)
+        else:
+            timer.start(max(1, round(wait * 1000)))
+
+    def _emit_progress(self, channel: str) -> None:
+        """发出当前进度的通知"""
+        self._progress_timers[channel].stop()
+        self._progress_last_emit[channel] = time.monotonic()
+        self._progress_stats[channel].emitted += 1
+        if channel == "extract":
+            self.extract_progress_updated.emit(self._state.extract.progress)
+        else:
+            self.refine_progress_updated.emit(self._state.refine.progress)
+        self._notify_subscribers(channel)
+
+    def _flush_progress(self, channel: str) -> None:
+        """立即发出尚未发出的进度通知，完成或失败前调用，保证顺序"""
+        if self._progress_timers[channel].isActive():
+            self._emit_progress(channel)
+
+    def _reset_progress(self, channel: str) -> None:
+        """丢弃尚未发出的通知并重新计数"""
+        self._progress_timers[channel].stop()
+        self._progress_stats[channel] = ProgressStats()
+        self._progress_last_emit[channel] = 0.0
+
+    def get_progress_stats(self, channel: str) -> ProgressStats:
+        """获取进度通知统计
+
+        Args:
+            channel: 'extract' 或 'refine'
+
+        Returns:
+            本次提取或修复的进度通知统计
+        """
+        return self._progress_stats[channel]
 
     # ==================== 订阅机制 ====================
 
@@ -298,6 +491,64 @@ class StateManager(QObject):
         ):
             self._subscribers[state_type].remove(callback)
 
+    def select(
+        self,
+        paths: Union[str, Sequence[str]],
+        callback: Callable[..., None],
+        owner: Optional[QObject] = None,
+    ) -> Callable[[], None]:
+        """订阅指定字段，只在这些字段的值变化时回调
+
+        通过字段版本号判断变化，不比较字段内容。同一次状态操作中多个字段
+        同时变化时只回调一次。
+
+        Args:
+            paths: 字段路径或路径列表，如 'extract.progress'
+            callback: 回调函数，参数为各字段的新值
+            owner: 订阅所属的对象，对象销毁时自动取消订阅
+
+        Returns:
+            Callable[[], None]: 取消订阅函数
+
+        Raises:
+            ValueError: 字段路径不存在
+        """
+        paths = (paths,) if isinstance(paths, str) else tuple(paths)
+        for path in paths:
+            section, _, name = path.partition(".")
+            section_state = getattr(self._state, section, None)
+            if section not in self._subscribers or not hasattr(section_state, name):
+                raise ValueError(f"未知的状态字段: {path}")
+
+        selection = _Selection(
+            paths, callback, tuple(self.get_version(path) for path in paths)
+        )
+        self._selections.append(selection)
+
+        def unsubscribe() -> None:
+            if selection in self._selections:
+                self._selections.remove(selection)
+
+        if owner is not None:
+            owner.destroyed.connect(unsubscribe)
+        return unsubscribe
+
+    def _read_path(self, path: str) -> Any:
+        section, _, name = path.partition(".")
+        return getattr(getattr(self._state, section), name)
+
+    def _notify_selections(self) -> None:
+        """回调字段版本号有变化的字段订阅"""
+        for selection in list(self._selections):
+            versions = tuple(self.get_version(path) for path in selection.paths)
+            if versions == selection.versions:
+                continue
+            selection.versions = versions
+            try:
+                selection.callback(*(self._read_path(path) for path in selection.paths))
+            except Exception as e:
+                print(f"状态订阅回调执行失败: {e}")
+
     def _notify_subscribers(self, state_type: str) -> None:
         """通知订阅者状态变化"""
         if state_type in self._subscribers:
@@ -306,6 +557,7 @@ class StateManager(QObject):
                     callback()
                 except Exception as e:
                     print(f"状态订阅回调执行失败: {e}")
+        self._notify_selections()
 
     # ==================== 便捷方法 ====================
 
@@ -336,18 +588,24 @@ class StateManager(QObject):
         """获取修复的文本"""
         return self._state.refine.refined_text
 
+    def get_refine_source_text(self) -> str:
+        """获取上次修复结果对应的原文"""
+        return self._state.refine.source_text
+
     def set_extracted_text(self, text: str) -> None:
         """设置提取的文本"""
-        self._state.extract.extracted_text = text
+        changed = self._update("extract", extracted_text=text)
         self.extract_text_changed.emit(text)
-        self._notify_subscribers("extract")
-        self._notify_subscribers("refine")  # 修复区域也需要更新
+        if changed:
+            self._notify_subscribers("extract")
+            self._notify_subscribers("refine")  # 修复区域也需要更新
 
     def set_refined_text(self, text: str) -> None:
         """设置修复的文本"""
-        self._state.refine.refined_text = text
+        changed = self._update("refine", refined_text=text)
         self.refine_text_changed.emit(text)
-        self._notify_subscribers("refine")
+        if changed:
+            self._notify_subscribers("refine")
 
 
 # 全局状态管理器实例
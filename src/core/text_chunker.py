@@ -0,0 +1,112 @@
+"""文案分段模块 - 按Token预算将长文案切分为多个分段"""
+
+import math
+import re
+from typing import List, Tuple
+from config.core import AppConstants
+from core.token_counter import get_token_counter
+
+
+# 句末标点，段落过长时在这些位置断句
+_SENTENCE_END_PATTERN = re.compile(r"(?<=[。！？!?；;.])")
+
+
+def estimate_tokens(text: str) -> int:
+    """统计Token数，使用本地分词器，不可用时按官方换算比例估算"""
+    return get_token_counter().count(text)
+
+
+def estimate_output_tokens(text: str) -> int:
+    """预估修复输出的Token数，修复后文案与原文长度相近"""
+    return math.ceil(estimate_tokens(text) * AppConstants.DEEPSEEK_OUTPUT_TOKEN_RATIO)
+
+
+def find_truncation_risks(chunks: List[str], max_tokens: int) -> List[Tuple[int, int]]:
+    """找出预计输出会超过 max_tokens 的分段，返回(分段序号(从1开始), 预计输出Token数)"""
+    risks = []
+    for index, chunk in enumerate(chunks, 1):
+        output_tokens = estimate_output_tokens(chunk)
+        if output_tokens > max_tokens:
+            risks.append((index, output_tokens))
+    return risks
+
+
+def detect_separator(text: str) -> str:
+    """检测文案的分段方式：有空行时按段落，否则按行（字幕片段）"""
+    return "\n\n" if re.search(r"\n\s*\n", text) else "\n"
+
+
+def _split_oversized(unit: str, max_tokens: int) -> List[str]:
+    """将超出预算的单个段落按句子切分，单句仍超出时按字符硬切"""
+    pieces: List[str] = []
+    current = ""
+    current_tokens = 0
+    for sentence in _SENTENCE_END_PATTERN.split(unit):
+        if not sentence:
+            continue
+        sentence_tokens = estimate_tokens(sentence)
+        if current_tokens + sentence_tokens <= max_tokens:
+            current += sentence
+            current_tokens += sentence_tokens
+            continue
+        if current:
+            pieces.append(current)
+        current, current_tokens = sentence, sentence_tokens
+        while current_tokens > max_tokens:
+            # 按Token密度估算能放下的字符数，逐步缩小直到满足预算
+            max_chars = max(1, len(current) * max_tokens // current_tokens)
+            while max_chars > 1 and estimate_tokens(current[:max_chars]) > max_tokens:
+                max_chars = max(1, max_chars * 9 // 10)
+            pieces.append(current[:max_chars])
+            current = current[max_chars:]
+            current_tokens = estimate_tokens(current)
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_text_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """按Token预算切分文案
+
+    优先在段落或字幕片段边界切分，尽量把相邻段落合并到同一分段，
+    单个段落超出预算时再按句子切分。分段按原顺序返回，
+    用 detect_separator(text) 返回的分隔符拼接即可还原。
+
+    Args:
+        text: 原始文案
+        max_tokens: 每个分段的Token预算
+
+    Returns:
+        List[str]: 分段列表
+    """
+    separator = detect_separator(text)
+    units = [
+        unit.strip()
+        for unit in re.split(r"\n\s*\n" if separator == "\n\n" else r"\n", text)
+        if unit.strip()
+    ]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    # 每个段落只分词一次，分段Token数按段落累加，长文案也能在编辑时实时统计
+    separator_tokens = estimate_tokens(separator)
+
+    for unit in units:
+        unit_tokens = estimate_tokens(unit)
+        if unit_tokens > max_tokens:
+            if current:
+                chunks.append(separator.join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(unit, max_tokens))
+            continue
+
+        if current and current_tokens + separator_tokens + unit_tokens > max_tokens:
+            chunks.append(separator.join(current))
+            current, current_tokens = [], 0
+        current_tokens += unit_tokens + (separator_tokens if current else 0)
+        current.append(unit)
+
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
@@ -1,96 +1,310 @@
 """文案修复工作线程模块"""
 
 import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 from PyQt6.QtCore import QThread, pyqtSignal
 from config.core import AppConstants
+from core.connectivity_checker import ConnectivityResult, record_connectivity
+from core.llm_http_client import LLMRequestMetrics, get_llm_http_client, iter_sse_events
+from core.incremental_refine import group_changed_paragraphs
+from core.edit_patch import PatchValidationError, apply_edits, parse_edits
+from core.prompt_builder import RefinePromptBuilder
+from core.llm_request_scheduler import (
+    LLMHTTPError,
+    RequestCancelled,
+    get_llm_request_scheduler,
+)
+from core.refine_cache import RefineCache, get_refine_cache, make_cache_key
+from core.text_chunker import (
+    detect_separator,
+    estimate_tokens,
+    find_truncation_risks,
+    split_text_into_chunks,
+)
+
+
+class RefineAborted(Exception):
+    """文案修复被用户中止"""
 
 
 class TextRefineWorker(QThread):
-    """文案修复工作线程"""
+    """文案修复工作线程
+
+    长文案按Token预算切分为多个分段，分段并行请求后按原顺序拼接，
+    总耗时取决于最慢的分段而不是文案总长度。
+    流式模式下模型输出通过 text_delta 信号逐段发出，可随时中止。
+    每个分段的结果按提示词哈希缓存，未变化的分段不会重复请求。
+    提示词的固定指令和术语表作为system前缀，所有分段共享，以命中服务端前缀缓存。
+    修改列表模式下模型只返回需要修改的片段，本地校验后应用，校验失败时改为返回全文。
+    传入 reused_paragraphs 时只修复变化的段落，未变化的段落沿用上次的修复结果。
+    """
 
     progress_updated = pyqtSignal(int)
     text_refined = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
     domain_detected = pyqtSignal(str)
     prompt_info_updated = pyqtSignal(float, int)  # 发射Prompt大小(KB)和Token数
+    chunk_progress = pyqtSignal(int, int)  # 已完成分段数, 分段总数
+    text_delta = pyqtSignal(int, str)  # 流式输出增量：分段序号(从0开始), 增量文本
+    refine_aborted = pyqtSignal()
+    cache_stats_updated = pyqtSignal(int, int)  # 缓存命中数, 未命中数
+    usage_updated = pyqtSignal(int, int, int)  # 累计输入Token, 其中前缀缓存命中Token, 输出Token
 
-    def __init__(self, text: str, api_key: str, api_url: str = None):
+    def __init__(
+        self,
+        text: str,
+        api_key: str,
+        api_url: str = None,
+        system_prompt: str = None,
+        glossary: list[str] = None,
+        chunk_token_budget: int = AppConstants.DEEPSEEK_CHUNK_TOKEN_BUDGET,
+        max_parallel: int = AppConstants.DEEPSEEK_MAX_PARALLEL_CHUNKS,
+        stream: bool = False,
+        use_cache: bool = True,
+        cache: RefineCache = None,
+        patch_mode: bool = False,
+        reused_paragraphs: dict[int, str] = None,
+    ):
         super().__init__()
         self.text = text
         self.api_key = api_key
         self.api_url = api_url or AppConstants.DEEPSEEK_API_URL
+        self.prompt_builder = RefinePromptBuilder(system_prompt, glossary)
+        self.patch_mode = patch_mode
+        self.reused_paragraphs = reused_paragraphs or {}
+        self.patch_builder = RefinePromptBuilder(
+            AppConstants.DEEPSEEK_PATCH_SYSTEM_PROMPT, glossary
+        )
+        self.chunk_token_budget = chunk_token_budget
+        self.max_parallel = max_parallel
+        self.stream = stream
+        self.use_cache = use_cache  # 为False时跳过读取缓存，结果仍写入缓存
+        self.cache = cache or get_refine_cache()
+        self._aborted = False
+        self._truncated = set()  # 输出被截断的分段序号，不写入缓存
+        self._usage_lock = threading.Lock()
+        self.prompt_tokens = 0
+        self.cache_hit_tokens = 0
+        self.completion_tokens = 0
 
-    def detect_domain_and_refine(self, text: str) -> tuple[str, str]:
-        """检测文案领域并修复文案"""
+    def abort(self) -> None:
+        """中止修复，正在接收的流式响应会在下一个事件处断开"""
+        self._aborted = True
+
+    def build_messages(self, text: str) -> list[dict]:
+        """生成请求消息：固定的系统前缀 + 待修复文案"""
+        return self.prompt_builder.build_messages(text)
+
+    def request_completion(
+        self, messages: list[dict], index: int = 1, json_output: bool = False
+    ) -> str:
+        """发送单次对话请求并返回模型输出内容
+
+        json_output 为True时要求模型输出JSON对象，输出需完整解析后才能使用，不走流式。
+        """
+        stream = self.stream and not json_output
+        payload = {
+            AppConstants.DEEPSEEK_PARAM_MODEL: AppConstants.DEEPSEEK_DEFAULT_MODEL,
+            AppConstants.DEEPSEEK_PARAM_MESSAGES: messages,
+            AppConstants.DEEPSEEK_PARAM_TEMPERATURE: AppConstants.DEEPSEEK_DEFAULT_TEMPERATURE,
+            AppConstants.DEEPSEEK_PARAM_MAX_TOKENS: AppConstants.DEEPSEEK_DEFAULT_MAX_TOKENS,
+        }
+        if json_output:
+            payload[AppConstants.DEEPSEEK_PARAM_RESPONSE_FORMAT] = (
+                AppConstants.DEEPSEEK_RESPONSE_FORMAT_JSON
+            )
+        if stream:
+            payload[AppConstants.DEEPSEEK_PARAM_STREAM] = True
+            # 流式响应默认不返回用量，需显式请求在最后一个事件中附带
+            payload[AppConstants.DEEPSEEK_PARAM_STREAM_OPTIONS] = {"include_usage": True}
+
+        # 由调度器限制并发并在限流、服务端错误和超时时退避重试
         try:
-            headers = {
-                AppConstants.DEEPSEEK_HEADER_CONTENT_TYPE: AppConstants.DEEPSEEK_CONTENT_TYPE_JSON,
-                AppConstants.DEEPSEEK_HEADER_AUTHORIZATION: f"{AppConstants.DEEPSEEK_AUTH_PREFIX}{self.api_key}",
-            }
+            return get_llm_request_scheduler().run(
+                self.api_key,
+                lambda: self._send(payload, index, stream),
+                should_cancel=lambda: self._aborted,
+            )
+        except RequestCancelled:
+            raise RefineAborted()
 
-            # 构建提示词
-            prompt = AppConstants.DEEPSEEK_PROMPT_TEMPLATE.format(text=text)
-            
-            # 计算prompt的字节数和token数
-            prompt_bytes = len(prompt.encode('utf-8'))
-            prompt_kb = prompt_bytes / 1024
-            # 粗略估算token数：中文约1.5字符/token，英文约4字符/token
-            # 这里使用平均值2.5字符/token进行估算
-            estimated_tokens = len(prompt) / 2.5
-            
-            print(f"Prompt大小: {prompt_kb:.2f} KB ({prompt_bytes} bytes)")
-            print(f"估算Token数: {estimated_tokens:.0f} tokens")
-            
-            # 发射Prompt信息信号
-            self.prompt_info_updated.emit(prompt_kb, int(estimated_tokens))
-
-            payload = {
-                AppConstants.DEEPSEEK_PARAM_MODEL: AppConstants.DEEPSEEK_DEFAULT_MODEL,
-                AppConstants.DEEPSEEK_PARAM_MESSAGES: [
-                    {
-                        AppConstants.DEEPSEEK_MESSAGE_ROLE: AppConstants.DEEPSEEK_ROLE_USER,
-                        AppConstants.DEEPSEEK_MESSAGE_CONTENT: prompt,
-                    }
-                ],
-                AppConstants.DEEPSEEK_PARAM_TEMPERATURE: AppConstants.DEEPSEEK_DEFAULT_TEMPERATURE,
-                AppConstants.DEEPSEEK_PARAM_MAX_TOKENS: AppConstants.DEEPSEEK_DEFAULT_MAX_TOKENS,
-            }
+    def _send(self, payload: dict, index: int, stream: bool) -> str:
+        """发送一次请求并读取输出"""
+        if self._aborted:
+            raise RefineAborted()
+
+        # 通过共享客户端发送，复用已建立的长连接
+        client = get_llm_http_client()
+        # 客户端被并行的分段请求共享，指标随本次请求单独返回
+        metrics = LLMRequestMetrics()
+        response = client.post_json(
+            self.api_url, self.api_key, payload, stream=stream, metrics=metrics
+        )
+
+        with response:
+            if response.status_code != AppConstants.DEEPSEEK_SUCCESS_STATUS_CODE:
+                raise LLMHTTPError(
+                    response.status_code,
+                    response.text,
+                    response.headers.get("Retry-After"),
+                )
 
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=AppConstants.DEEPSEEK_REQUEST_TIMEOUT,
+            # 请求成功即说明密钥和网络可用，之后的连通性检查可直接复用
+            record_connectivity(
+                self.api_key,
+                ConnectivityResult(
+                    ok=True,
+                    connect_ms=metrics.connect_time * 1000,
+                    ttfb_ms=metrics.ttfb * 1000,
+                    reused_connection=metrics.reused_connection,
+                    checked_at=time.monotonic(),
+                ),
             )
 
-            if response.status_code == AppConstants.DEEPSEEK_SUCCESS_STATUS_CODE:
-                result = response.json()
-                content = result[AppConstants.DEEPSEEK_RESPONSE_CHOICES][0][
-                    AppConstants.DEEPSEEK_RESPONSE_MESSAGE
-                ][AppConstants.DEEPSEEK_RESPONSE_CONTENT]
-
-                # 解析返回的JSON格式结果
-                try:
-                    parsed_result = json.loads(content)
-                    domain = parsed_result.get(
-                        AppConstants.DEEPSEEK_RESULT_DOMAIN,
-                        AppConstants.DEEPSEEK_DEFAULT_DOMAIN,
-                    )
-                    refined_text = parsed_result.get(
-                        AppConstants.DEEPSEEK_RESULT_REFINED_TEXT, text
-                    )
-                    return domain, refined_text
-                except json.JSONDecodeError:
-                    # 如果返回的不是JSON格式，直接返回内容
-                    return AppConstants.DEEPSEEK_DEFAULT_DOMAIN, content
-            else:
-                raise Exception(
-                    AppConstants.DEEPSEEK_ERROR_API_REQUEST.format(
-                        status_code=response.status_code, error=response.text
+            if stream:
+                return self._read_stream(response, index)
+
+            result = response.json()
+            self._record_usage(result.get(AppConstants.DEEPSEEK_RESPONSE_USAGE))
+            choice = result[AppConstants.DEEPSEEK_RESPONSE_CHOICES][0]
+            self._check_finish_reason(choice, index)
+            return choice[AppConstants.DEEPSEEK_RESPONSE_MESSAGE][
+                AppConstants.DEEPSEEK_RESPONSE_CONTENT
+            ]
+
+    def _read_stream(self, response, index: int) -> str:
+        """逐个读取流式事件，发出增量文本并返回完整输出"""
+        start = time.perf_counter()
+        parts = []
+        try:
+            for delta in self._iter_stream_deltas(response, index):
+                if not parts:
+                    print(
+                        AppConstants.DEEPSEEK_LOG_FIRST_TOKEN.format(
+                            index=index, ms=(time.perf_counter() - start) * 1000
+                        )
                     )
-                )
+                parts.append(delta)
+                self.text_delta.emit(index - 1, delta)
+        except requests.exceptions.RequestException as e:
+            if parts:
+                # 已输出部分增量时重试会导致内容重复，直接失败
+                raise Exception(str(e)) from e
+            raise
+        if self._aborted:
+            raise RefineAborted()
+        return "".join(parts)
+
+    def _iter_stream_deltas(self, response, index: int):
+        """解析流式事件，逐个返回增量文本"""
+        for event in iter_sse_events(response.iter_lines(decode_unicode=True)):
+            if self._aborted:
+                # 退出后关闭响应，服务端随即停止生成
+                raise RefineAborted()
+            # 用量在最后一个事件中返回，该事件的choices为空
+            self._record_usage(event.get(AppConstants.DEEPSEEK_RESPONSE_USAGE))
+            choices = event.get(AppConstants.DEEPSEEK_RESPONSE_CHOICES) or []
+            if not choices:
+                continue
+            delta = (
+                choices[0].get(AppConstants.DEEPSEEK_RESPONSE_DELTA, {})
+                .get(AppConstants.DEEPSEEK_RESPONSE_CONTENT)
+            )
+            self._check_finish_reason(choices[0], index)
+            if delta:
+                yield delta
+
+    def _record_usage(self, usage: dict) -> None:
+        """累计API返回的Token用量并发出信号"""
+        if not usage:
+            return
+        with self._usage_lock:
+            self.prompt_tokens += usage.get(AppConstants.DEEPSEEK_USAGE_PROMPT_TOKENS, 0)
+            self.cache_hit_tokens += usage.get(
+                AppConstants.DEEPSEEK_USAGE_CACHE_HIT_TOKENS, 0
+            )
+            self.completion_tokens += usage.get(
+                AppConstants.DEEPSEEK_USAGE_COMPLETION_TOKENS, 0
+            )
+            totals = (self.prompt_tokens, self.cache_hit_tokens, self.completion_tokens)
+        print(
+            AppConstants.DEEPSEEK_LOG_USAGE.format(
+                prompt=usage.get(AppConstants.DEEPSEEK_USAGE_PROMPT_TOKENS, 0),
+                hit=usage.get(AppConstants.DEEPSEEK_USAGE_CACHE_HIT_TOKENS, 0),
+            )
+        )
+        self.usage_updated.emit(*totals)
 
+    def _check_finish_reason(self, choice: dict, index: int) -> None:
+        """输出达到max_tokens上限时提示结果可能被截断"""
+        if (
+            choice.get(AppConstants.DEEPSEEK_RESPONSE_FINISH_REASON)
+            == AppConstants.DEEPSEEK_FINISH_REASON_LENGTH
+        ):
+            self._truncated.add(index)
+            print(AppConstants.DEEPSEEK_LOG_TRUNCATED.format(index=index))
+
+    @staticmethod
+    def parse_refine_result(content: str, text: str) -> tuple[str, str]:
+        """解析模型输出，JSON格式时提取领域和修复后文案，否则整体作为修复结果"""
+        try:
+            parsed_result = json.loads(content)
+            domain = parsed_result.get(
+                AppConstants.DEEPSEEK_RESULT_DOMAIN,
+                AppConstants.DEEPSEEK_DEFAULT_DOMAIN,
+            )
+            refined_text = parsed_result.get(
+                AppConstants.DEEPSEEK_RESULT_REFINED_TEXT, text
+            )
+            return domain, refined_text
+        except (json.JSONDecodeError, AttributeError):
+            # 如果返回的不是JSON格式，直接返回内容
+            return AppConstants.DEEPSEEK_DEFAULT_DOMAIN, content
+
+    def refine_with_patch(self, text: str, index: int = 1) -> tuple[str, str] | None:
+        """请求修改列表并在本地应用，校验失败时返回None"""
+        content = self.request_completion(
+            self.patch_builder.build_messages(text), index, json_output=True
+        )
+        try:
+            if index in self._truncated:
+                raise PatchValidationError("输出被截断")
+            domain, edits = parse_edits(content)
+            refined_text = apply_edits(text, edits)
+        except PatchValidationError as e:
+            print(AppConstants.DEEPSEEK_LOG_PATCH_FALLBACK.format(index=index, error=e))
+            self._truncated.discard(index)
+            return None
+
+        print(AppConstants.DEEPSEEK_LOG_PATCH_APPLIED.format(index=index, count=len(edits)))
+        if self.stream:
+            self.text_delta.emit(index - 1, refined_text)
+        return domain, refined_text
+
+    def detect_domain_and_refine(self, text: str, index: int = 1) -> tuple[str, str]:
+        """检测文案领域并修复文案"""
+        # 两种模式的系统提示和输出不同，缓存键使用当前模式的前缀；
+        # 修改列表模式校验失败回退全文时，结果仍记在修改列表模式下
+        builder = self.patch_builder if self.patch_mode else self.prompt_builder
+        cache_key = make_cache_key(text, builder.system_prefix)
+        if self.use_cache:
+            cached = self.cache.get(cache_key)
+            if cached:
+                if self.stream:
+                    self.text_delta.emit(index - 1, cached[1])
+                return cached
+
+        try:
+            result = self.refine_with_patch(text, index) if self.patch_mode else None
+            if result is None:
+                content = self.request_completion(self.build_messages(text), index)
+                result = self.parse_refine_result(content, text)
+        except RefineAborted:
+            raise
         except requests.exceptions.Timeout:
             raise Exception(AppConstants.DEEPSEEK_ERROR_TIMEOUT)
         except requests.exceptions.ConnectionError:
@@ -98,6 +312,64 @@ class TextRefineWorker(QThread):
         except Exception as e:
             raise Exception(AppConstants.DEEPSEEK_ERROR_GENERAL.format(error=str(e)))
 
+        if index not in self._truncated:
+            self.cache.put(cache_key, *result)
+        return result
+
+    def emit_prompt_info(self, chunks: list[str]) -> None:
+        """计算并发射所有分段Prompt的总大小和估算Token数"""
+        # 每个分段都携带相同的系统前缀，前缀只需统计一次
+        builder = self.patch_builder if self.patch_mode else self.prompt_builder
+        prefix = builder.system_prefix
+        prompt_bytes = sum(len(chunk.encode("utf-8")) for chunk in chunks) + len(
+            prefix.encode("utf-8")
+        ) * len(chunks)
+        prompt_kb = prompt_bytes / 1024
+        estimated_tokens = sum(estimate_tokens(chunk) for chunk in chunks) + estimate_tokens(
+            prefix
+        ) * len(chunks)
+
+        print(f"Prompt大小: {prompt_kb:.2f} KB ({prompt_bytes} bytes)")
+        print(f"估算Token数: {estimated_tokens} tokens")
+
+        # 发射Prompt信息信号
+        self.prompt_info_updated.emit(prompt_kb, estimated_tokens)
+
+    def refine_chunks(self, chunks: list[str]) -> tuple[str, list[str]]:
+        """并行修复所有分段，返回出现最多的领域和按原顺序排列的修复结果"""
+        total = len(chunks)
+        results: list = [None] * total
+        domains: list[str] = []
+        done = 0
+        self.chunk_progress.emit(done, total)
+
+        progress_span = (
+            AppConstants.DEEPSEEK_PROGRESS_PROCESSING
+            - AppConstants.DEEPSEEK_PROGRESS_VALIDATING
+        )
+        executor = ThreadPoolExecutor(max_workers=min(self.max_parallel, total))
+        try:
+            futures = {
+                executor.submit(self.detect_domain_and_refine, chunk, index + 1): index
+                for index, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                domain, refined_text = future.result()
+                results[futures[future]] = refined_text.strip()
+                domains.append(domain)
+                done += 1
+                self.chunk_progress.emit(done, total)
+                self.cache_stats_updated.emit(self.cache.hits, self.cache.misses)
+                self.progress_updated.emit(
+                    AppConstants.DEEPSEEK_PROGRESS_VALIDATING
+                    + progress_span * done // total
+                )
+        finally:
+            # 任一分段失败时不再发起尚未开始的请求
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return Counter(domains).most_common(1)[0][0], results
+
     def run(self):
         """执行文案修复任务"""
         try:
@@ -119,8 +391,49 @@ class TextRefineWorker(QThread):
                 self.text[:50] + AppConstants.DEEPSEEK_LOG_TEXT_TRUNCATE,
             )
 
+            # 只有变化的段落需要修复，每组变化段落再按Token预算切分
+            groups = group_changed_paragraphs(self.text, self.reused_paragraphs)
+            chunks, owners = [], []
+            for group_index, (needs_refine, group_text) in enumerate(groups):
+                if needs_refine:
+                    group_chunks = split_text_into_chunks(group_text, self.chunk_token_budget)
+                    chunks.extend(group_chunks)
+                    owners.extend([group_index] * len(group_chunks))
+            if self.reused_paragraphs:
+                print(
+                    AppConstants.DEEPSEEK_LOG_INCREMENTAL.format(
+                        reused=len(self.reused_paragraphs)
+                    )
+                )
+            print(AppConstants.DEEPSEEK_LOG_CHUNKS.format(count=len(chunks)))
+            for index, output_tokens in find_truncation_risks(
+                chunks, AppConstants.DEEPSEEK_DEFAULT_MAX_TOKENS
+            ):
+                print(
+                    AppConstants.REFINE_TRUNCATION_WARNING.format(
+                        index=index,
+                        tokens=output_tokens,
+                        limit=AppConstants.DEEPSEEK_DEFAULT_MAX_TOKENS,
+                    )
+                )
+            self.emit_prompt_info(chunks)
+
             # 调用API进行领域检测和文案修复
-            domain, refined_text = self.detect_domain_and_refine(self.text)
+            separator = detect_separator(self.text)
+            if chunks:
+                domain, results = self.refine_chunks(chunks)
+            else:
+                domain, results = AppConstants.DEEPSEEK_DEFAULT_DOMAIN, []
+            group_results = {}
+            for group_index, result in zip(owners, results):
+                group_results.setdefault(group_index, []).append(result)
+            # 切分后没有分段的组(如只有空白)没有修复结果，原样保留
+            refined_text = separator.join(
+                separator.join(group_results[group_index])
+                if group_index in group_results
+                else group_text
+                for group_index, (_, group_text) in enumerate(groups)
+            )
 
             self.progress_updated.emit(AppConstants.DEEPSEEK_PROGRESS_PROCESSING)
 
@@ -134,6 +447,9 @@ class TextRefineWorker(QThread):
 
             print(AppConstants.DEEPSEEK_LOG_REFINING_SUCCESS)
 
+        except RefineAborted:
+            print(AppConstants.DEEPSEEK_ERROR_ABORTED)
+            self.refine_aborted.emit()
         except ValueError as e:
             print(AppConstants.DEEPSEEK_LOG_VALIDATION_ERROR, e)
             self.error_occurred.emit(str(e))
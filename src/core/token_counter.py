@@ -0,0 +1,100 @@
+"""Token计数模块 - 基于本地分词器统计DeepSeek的Token数"""
+
+import math
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+from config.core import AppConstants
+
+
+# 中日韩字符及全角标点
+_CJK_PATTERN = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+
+
+def estimate_tokens_by_ratio(text: str) -> int:
+    """按官方换算比例估算Token数，分词器不可用时使用"""
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return math.ceil(
+        cjk_count * AppConstants.DEEPSEEK_TOKENS_PER_CJK_CHAR
+        + other_count * AppConstants.DEEPSEEK_TOKENS_PER_OTHER_CHAR
+    )
+
+
+def get_tokenizer_path() -> Path:
+    """分词器文件路径，相对于assets目录解析，与工作目录无关
+
+    打包后assets目录位于PyInstaller的解压目录，源码运行时位于src/assets。
+    """
+    if getattr(sys, "frozen", False):
+        assets_dir = Path(getattr(sys, "_MEIPASS", Path(sys.executable).parent)) / "assets"
+    else:
+        assets_dir = Path(__file__).resolve().parent.parent / "assets"
+    return assets_dir / AppConstants.DEEPSEEK_TOKENIZER_ASSET
+
+
+class TokenCounter:
+    """Token计数器
+
+    只加载随应用打包的分词器文件，不访问网络；文件或tokenizers不可用时
+    按官方换算比例估算。分词器只在本地运行，加载后单次计数为毫秒级，
+    可以在编辑时实时统计。
+    """
+
+    def __init__(self, tokenizer_path: Optional[Path] = None):
+        self._tokenizer = None
+        self._load(Path(tokenizer_path) if tokenizer_path else get_tokenizer_path())
+
+    @property
+    def is_exact(self) -> bool:
+        """是否使用真实分词器计数"""
+        return self._tokenizer is not None
+
+    def _load(self, path: Path) -> None:
+        """加载分词器文件"""
+        if not path.exists():
+            print(f"未找到分词器文件 {path}，Token数将按比例估算（运行 python build.py tokenizer 下载）")
+            return
+        try:
+            from tokenizers import Tokenizer
+        except ImportError:
+            print("未安装tokenizers，Token数将按比例估算")
+            return
+        try:
+            self._tokenizer = Tokenizer.from_file(str(path))
+        except Exception as e:
+            print(f"加载分词器失败: {e}")
+
+    def count(self, text: str) -> int:
+        """统计文本的Token数"""
+        if not text:
+            return 0
+        tokenizer = self._tokenizer
+        if tokenizer is None:
+            return estimate_tokens_by_ratio(text)
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+# 全局计数器实例
+_token_counter: Optional[TokenCounter] = None
+_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """获取全局Token计数器实例"""
+    global _token_counter
+    with _counter_lock:
+        if _token_counter is None:
+            _token_counter = TokenCounter()
+        return _token_counter
+
+
+def estimate_cost(input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+    """按DeepSeek价格预估费用（元）"""
+    return (
+        (input_tokens - cached_tokens) * AppConstants.DEEPSEEK_PRICE_INPUT_PER_M
+        + cached_tokens * AppConstants.DEEPSEEK_PRICE_INPUT_CACHE_HIT_PER_M
+        + output_tokens * AppConstants.DEEPSEEK_PRICE_OUTPUT_PER_M
+    ) / 1_000_000
@@ -0,0 +1,232 @@
+"""转录文本格式模块 - 字幕片段与TXT/SRT/VTT/JSON/TSV文本之间的转换"""
+
+import html
+import json
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List
+from config.core import AppConstants
+
+
+@dataclass
+class TranscriptSegment:
+    """转录片段数据类，字段与faster-whisper的Segment保持一致"""
+
+    start: float
+    end: float
+    text: str
+    confidence: float = 1.0  # 0~1，由avg_logprob换算
+
+
+def format_timestamp_srt(seconds: float) -> str:
+    """格式化时间戳为SRT格式 (HH:MM:SS,mmm)"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    milliseconds = int((seconds % 1) * 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+
+
+def format_timestamp_vtt(seconds: float) -> str:
+    """格式化时间戳为VTT格式 (HH:MM:SS.mmm)"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    milliseconds = int((seconds % 1) * 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{milliseconds:03d}"
+
+
+def iter_txt_format(segments: Iterable) -> Iterator[str]:
+    """逐段生成纯文本格式"""
+    for i, segment in enumerate(segments):
+        if i:
+            yield AppConstants.AUDIO_EXTRACT_TEXT_JOIN_SEPARATOR
+        yield segment.text
+
+
+def iter_srt_format(segments: Iterable) -> Iterator[str]:
+    """逐段生成SRT格式的字幕"""
+    for i, segment in enumerate(segments, 1):
+        start_time = format_timestamp_srt(segment.start)
+        end_time = format_timestamp_srt(segment.end)
+        separator = "\n" if i > 1 else ""  # 空行分隔
+        yield f"{separator}{i}\n{start_time} --> {end_time}\n{segment.text.strip()}\n"
+
+
+def iter_vtt_format(segments: Iterable) -> Iterator[str]:
+    """逐段生成VTT格式的字幕"""
+    yield "WEBVTT\n"  # VTT文件头
+    for segment in segments:
+        start_time = format_timestamp_vtt(segment.start)
+        end_time = format_timestamp_vtt(segment.end)
+        yield f"\n{start_time} --> {end_time}\n{segment.text.strip()}\n"
+
+
+def iter_json_format(segments: Iterable) -> Iterator[str]:
+    """逐段生成JSON数组，每个片段一行"""
+    yield "["
+    for i, segment in enumerate(segments):
+        item = {
+            "start": round(segment.start, 3),
+            "end": round(segment.end, 3),
+            "text": segment.text.strip(),
+            "confidence": round(segment_confidence(segment), 4),
+        }
+        yield ("," if i else "") + "\n  " + json.dumps(item, ensure_ascii=False)
+    yield "\n]\n"
+
+
+def iter_tsv_format(segments: Iterable) -> Iterator[str]:
+    """逐段生成TSV表格，时间为毫秒，与whisper的TSV输出一致"""
+    yield "start\tend\ttext\n"
+    for segment in segments:
+        text = " ".join(segment.text.split())  # 去掉制表符和换行
+        yield f"{round(segment.start * 1000)}\t{round(segment.end * 1000)}\t{text}\n"
+
+
+_FORMAT_RENDERERS = {
+    AppConstants.OUTPUT_FORMAT_TXT: iter_txt_format,
+    AppConstants.OUTPUT_FORMAT_SRT: iter_srt_format,
+    AppConstants.OUTPUT_FORMAT_VTT: iter_vtt_format,
+    AppConstants.OUTPUT_FORMAT_JSON: iter_json_format,
+    AppConstants.OUTPUT_FORMAT_TSV: iter_tsv_format,
+}
+
+
+def iter_format(segments: Iterable, output_format: str) -> Iterator[str]:
+    """按输出格式逐段生成文本，未知格式按纯文本处理"""
+    renderer = _FORMAT_RENDERERS.get(output_format, iter_txt_format)
+    return renderer(segments)
+
+
+def generate_txt_format(segments: Iterable) -> str:
+    """生成纯文本格式"""
+    return "".join(iter_txt_format(segments))
+
+
+def generate_srt_format(segments: Iterable) -> str:
+    """生成SRT格式的字幕"""
+    return "".join(iter_srt_format(segments))
+
+
+def generate_vtt_format(segments: Iterable) -> str:
+    """生成VTT格式的字幕"""
+    return "".join(iter_vtt_format(segments))
+
+
+def format_segments(segments: Iterable, output_format: str) -> str:
+    """按输出格式生成文本，未知格式按纯文本处理"""
+    return "".join(iter_format(segments, output_format))
+
+
+def export_segments(segments: Iterable, output_format: str, file_path: str) -> str:
+    """按输出格式逐段写入文件，长转录无需在内存中拼出完整文本
+
+    先写临时文件再重命名，写入失败时不会覆盖已有文件。
+
+    Returns:
+        str: 写入的文件路径
+    """
+    temp_path = f"{file_path}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8", newline="") as f:
+            for chunk in iter_format(segments, output_format):
+                f.write(chunk)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return file_path
+
+
+def segment_confidence(segment) -> float:
+    """片段置信度，faster-whisper片段按平均对数概率换算，没有时为1"""
+    if hasattr(segment, "confidence"):
+        return segment.confidence
+    avg_logprob = getattr(segment, "avg_logprob", None)
+    if avg_logprob is None:
+        return 1.0
+    return min(1.0, math.exp(avg_logprob))
+
+
+def shift_segments(segments: Iterable, offset: float) -> List[TranscriptSegment]:
+    """平移片段时间戳，用于将片段音频的时间对齐到原视频时间轴"""
+    return [
+        TranscriptSegment(
+            segment.start + offset, segment.end + offset, segment.text, segment_confidence(segment)
+        )
+        for segment in segments
+    ]
+
+
+def get_format_extension(output_format: str) -> str:
+    """获取输出格式对应的文件扩展名"""
+    if output_format in _FORMAT_RENDERERS:
+        return f".{output_format}"
+    return ".txt"
+
+
+# ==================== 字幕解析 ====================
+
+_TIMESTAMP_PATTERN = re.compile(
+    r"(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})"
+)
+_CUE_TIMING_PATTERN = re.compile(
+    r"^\s*(\S+)\s*-->\s*(\S+)"
+)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def parse_timestamp(value: str) -> float:
+    """解析SRT/VTT时间戳为秒数"""
+    match = _TIMESTAMP_PATTERN.match(value.strip())
+    if not match:
+        raise ValueError(f"无法解析时间戳: {value}")
+    hours, minutes, seconds, millis = match.groups()
+    return (
+        int(hours or 0) * 3600
+        + int(minutes) * 60
+        + int(seconds)
+        + int(millis.ljust(3, "0")) / 1000
+    )
+
+
+def parse_subtitle(content: str) -> List[TranscriptSegment]:
+    """解析SRT或VTT字幕文本为片段列表
+
+    自动字幕（如YouTube）的相邻字幕块会重复上一块的文本以实现滚动效果，
+    这里去掉与上一行重复的内容，避免转出的文案出现重复句子。
+    """
+    segments: List[TranscriptSegment] = []
+    last_line = ""
+    blocks = re.split(r"\n\s*\n", content.replace("\r\n", "\n").replace("\r", "\n"))
+
+    for block in blocks:
+        lines = block.strip("\n").split("\n")
+        timing_index = next(
+            (i for i, line in enumerate(lines) if _CUE_TIMING_PATTERN.match(line)),
+            None,
+        )
+        if timing_index is None:
+            # WEBVTT头、NOTE、STYLE等非字幕块
+            continue
+
+        start_text, end_text = _CUE_TIMING_PATTERN.match(lines[timing_index]).groups()
+        try:
+            start = parse_timestamp(start_text)
+            end = parse_timestamp(end_text)
+        except ValueError:
+            continue
+
+        texts = []
+        for line in lines[timing_index + 1:]:
+            line = html.unescape(_TAG_PATTERN.sub("", line)).strip()
+            if line and line != last_line:
+                texts.append(line)
+                last_line = line
+        if texts:
+            segments.append(TranscriptSegment(start, end, " ".join(texts)))
+
+    return segments
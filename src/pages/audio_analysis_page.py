@@ -9,7 +9,7 @@ from PyQt6.QtCore import Qt, pyqtSignal, QThread, QTimer
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QPushButton, QProgressBar,
-    QGridLayout, QFrame, QScrollArea
+    QGridLayout, QFrame, QScrollArea, QFileDialog
 )
 from PyQt6.QtGui import QShowEvent
 from qfluentwidgets import (
@@ -17,11 +17,11 @@ from qfluentwidgets import (
     ProgressBar, InfoBar, InfoBarPosition,
     CardWidget, BodyLabel, SubtitleLabel,
     TitleLabel, CaptionLabel, IconWidget,
-    FlowLayout, MessageBox
+    FlowLayout, MessageBox, CheckBox
 )
 
 from config.core import Messages
-from core.project_manager import AudioProjectManager
+from core.async_project_manager import get_async_project_manager
 from pages.components.file_drop_area import FileDropArea
 from core import get_state_manager
 
@@ -140,7 +140,11 @@ class AudioAnalysisPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("AudioAnalysisPage")
-        self.project_manager = AudioProjectManager()
+        self.async_project_manager = get_async_project_manager()
+        self.project_manager = self.async_project_manager.manager
+        self.project_task = None
+        self.project_task_action = ""
+        self.project_task_callback = None
         self.state_manager = get_state_manager()
         self.current_project_id = None
         self.current_file_path = None
@@ -188,6 +192,12 @@ class AudioAnalysisPage(QWidget):
         
         audio_info_layout.addStretch()
         
+        # 固定的项目不会被工作空间清理删除
+        self.pin_checkbox = CheckBox("固定项目，清理时保留")
+        self.pin_checkbox.setEnabled(False)
+        self.pin_checkbox.toggled.connect(self._onPinToggled)
+        audio_info_layout.addWidget(self.pin_checkbox)
+        
         info_layout.addLayout(audio_info_layout)
         
         layout.addWidget(self.info_card)
@@ -201,9 +211,20 @@ class AudioAnalysisPage(QWidget):
         self.progress_label = BodyLabel("准备分析...")
         progress_layout.addWidget(self.progress_label)
         
+        progress_bar_layout = QHBoxLayout()
+        progress_bar_layout.setSpacing(12)
+        
         self.progress_bar = ProgressBar()
         self.progress_bar.setRange(0, 100)
-        progress_layout.addWidget(self.progress_bar)
+        progress_bar_layout.addWidget(self.progress_bar)
+        
+        # 取消按钮，只在导入音频、导入导出项目时显示
+        self.cancel_task_button = PushButton("取消", self, FIF.CLOSE)
+        self.cancel_task_button.clicked.connect(self._onCancelTaskClicked)
+        self.cancel_task_button.setVisible(False)
+        progress_bar_layout.addWidget(self.cancel_task_button)
+        
+        progress_layout.addLayout(progress_bar_layout)
         
         layout.addWidget(self.progress_widget)
         
@@ -259,6 +280,15 @@ class AudioAnalysisPage(QWidget):
         
         button_layout.addStretch()
         
+        self.import_button = PushButton("导入项目", self, FIF.DOWNLOAD)
+        self.import_button.clicked.connect(self._onImportClicked)
+        button_layout.addWidget(self.import_button)
+        
+        self.export_button = PushButton("导出项目", self, FIF.SHARE)
+        self.export_button.clicked.connect(self._onExportClicked)
+        self.export_button.setEnabled(False)
+        button_layout.addWidget(self.export_button)
+        
         layout.addLayout(button_layout)
         
         layout.addStretch()
@@ -368,11 +398,13 @@ class AudioAnalysisPage(QWidget):
             project_id: 项目ID
         """
         self.current_project_id = project_id
+        self.export_button.setEnabled(True)
         metadata = self.project_manager.get_project(project_id)
         
         if metadata:
             # 更新项目信息
             self.project_name_label.setText(f"项目名称: {metadata.name}")
+            self._setPinChecked(metadata.pinned)
             
             # 更新音频信息
             duration = metadata.audio_duration
@@ -447,52 +479,220 @@ class AudioAnalysisPage(QWidget):
             )
             return
             
-        # 如果没有项目ID，创建一个新项目
-        if not self.current_project_id and self.current_file_path:
-            try:
-                import os
-                file_name = os.path.splitext(os.path.basename(self.current_file_path))[0]
-                project_name = f"音频分析_{file_name}"
-                
-                # 创建项目
-                self.current_project_id = self.project_manager.create_project(
-                    project_name, 
-                    self.current_file_path
-                )
-                
-                # 更新项目名称显示
-                self.project_name_label.setText(f"项目名称: {project_name}")
-                
-                InfoBar.success(
-                    title="项目创建成功",
-                    content=f"已创建项目: {project_name}",
-                    orient=Qt.Orientation.Horizontal,
-                    isClosable=True,
-                    position=InfoBarPosition.TOP,
-                    duration=2000,
-                    parent=self
-                )
-                
-            except Exception as e:
-                InfoBar.error(
-                    title="项目创建失败",
-                    content=f"无法创建项目: {str(e)}",
-                    orient=Qt.Orientation.Horizontal,
-                    isClosable=True,
-                    position=InfoBarPosition.TOP,
-                    duration=3000,
-                    parent=self
-                )
-                return
-            
         # 显示进度
         self.progress_widget.setVisible(True)
         self.result_widget.setVisible(False)
         self.analyze_button.setEnabled(False)
         
+        # 如果没有项目ID，在后台创建一个新项目，完成后再开始分析
+        if not self.current_project_id and self.current_file_path:
+            file_name = os.path.splitext(os.path.basename(self.current_file_path))[0]
+            project_name = f"音频分析_{file_name}"
+            
+            self._runProjectTask(
+                self.async_project_manager.create_project_async(
+                    project_name,
+                    self.current_file_path
+                ),
+                "正在导入音频",
+                "项目创建失败",
+                lambda project_id: self._onProjectCreated(project_id, project_name)
+            )
+            return
+            
         # TODO: 启动分析线程
         self._startAnalysis()
         
+    def _runProjectTask(self, task, action: str, error_title: str, on_finished):
+        """
+        显示后台项目任务的进度，任务进行中可以取消
+        
+        Args:
+            task: 异步项目管理器返回的任务
+            action: 进度提示文字
+            error_title: 失败提示标题
+            on_finished: 任务完成回调，参数为任务结果
+        """
+        self.project_task = task
+        self.project_task_action = action
+        self.project_task_callback = on_finished
+        self.progress_widget.setVisible(True)
+        self.progress_label.setText(f"{action}...")
+        self.progress_bar.setValue(0)
+        self.cancel_task_button.setVisible(True)
+        self.cancel_task_button.setEnabled(True)
+        self._setProjectButtonsEnabled(False)
+        
+        task.progress_updated.connect(self._onProjectTaskProgress)
+        task.finished.connect(self._onProjectTaskFinished)
+        task.failed.connect(lambda error: self._onProjectTaskFailed(error_title, error))
+        task.cancelled.connect(self._onProjectTaskCancelled)
+        # 连接信号后再启动，很快结束的任务也不会丢失结果
+        task.start()
+        
+    def _setProjectButtonsEnabled(self, enabled: bool):
+        """后台任务进行中禁用会启动新任务的按钮"""
+        self.analyze_button.setEnabled(enabled)
+        self.import_button.setEnabled(enabled)
+        self.export_button.setEnabled(enabled and bool(self.current_project_id))
+        
+    def _onCancelTaskClicked(self):
+        """取消当前的后台项目任务"""
+        if self.project_task:
+            self.cancel_task_button.setEnabled(False)
+            self.progress_label.setText("正在取消...")
+            self.project_task.cancel()
+        
+    def _onProjectTaskProgress(self, done: int, total: int):
+        """项目文件操作进度"""
+        if not self.project_task:
+            return
+        self.progress_bar.setValue(done * 100 // total if total else 100)
+        self.progress_label.setText(
+            f"{self.project_task_action}... {done / 1024 / 1024:.1f} / {total / 1024 / 1024:.1f} MB"
+        )
+        
+    def _onProjectTaskEnded(self):
+        """后台项目任务结束，恢复界面状态"""
+        self.project_task = None
+        self.cancel_task_button.setVisible(False)
+        self._setProjectButtonsEnabled(True)
+        
+    def _onProjectTaskFinished(self, result):
+        """后台项目任务完成"""
+        callback = self.project_task_callback
+        self._onProjectTaskEnded()
+        callback(result)
+        
+    def _onProjectTaskFailed(self, title: str, error_message: str):
+        """后台项目任务失败"""
+        self._onProjectTaskEnded()
+        self.progress_widget.setVisible(False)
+        InfoBar.error(
+            title=title,
+            content=error_message,
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self
+        )
+        
+    def _onProjectTaskCancelled(self):
+        """后台项目任务已取消，已写入的文件由任务自行清理"""
+        self._onProjectTaskEnded()
+        self.progress_widget.setVisible(False)
+        
+    def _onProjectCreated(self, project_id: str, project_name: str):
+        """项目创建完成"""
+        self.current_project_id = project_id
+        self.export_button.setEnabled(True)
+        # 分析进行中不能再启动其他任务
+        self.analyze_button.setEnabled(False)
+        
+        # 更新项目名称显示
+        self.project_name_label.setText(f"项目名称: {project_name}")
+        self._setPinChecked(False)
+        
+        InfoBar.success(
+            title="项目创建成功",
+            content=f"已创建项目: {project_name}",
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=2000,
+            parent=self
+        )
+        
+        self._startAnalysis()
+        
+    def _setPinChecked(self, pinned: bool):
+        """显示项目的固定状态，不触发保存"""
+        self.pin_checkbox.blockSignals(True)
+        self.pin_checkbox.setChecked(pinned)
+        self.pin_checkbox.blockSignals(False)
+        self.pin_checkbox.setEnabled(True)
+        
+    def _onPinToggled(self, checked: bool):
+        """固定或取消固定当前项目"""
+        if not self.current_project_id:
+            return
+        if not self.project_manager.set_pinned(self.current_project_id, checked):
+            self._setPinChecked(not checked)
+            InfoBar.error(
+                title="操作失败",
+                content="无法更新项目的固定状态",
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=3000,
+                parent=self
+            )
+        
+    def _onImportClicked(self):
+        """导入项目压缩包"""
+        archive_path, _ = QFileDialog.getOpenFileName(
+            self, "导入项目", "", "项目压缩包 (*.zip)"
+        )
+        if not archive_path:
+            return
+        self.result_widget.setVisible(False)
+        self._runProjectTask(
+            self.async_project_manager.import_project_async(archive_path),
+            "正在导入项目",
+            "项目导入失败",
+            self._onProjectImported
+        )
+        
+    def _onProjectImported(self, project_id: Optional[str]):
+        """项目导入完成"""
+        self.progress_widget.setVisible(False)
+        if not project_id:
+            self._onProjectTaskFailed("项目导入失败", "压缩包不是有效的项目")
+            return
+        self.loadProject(project_id)
+        InfoBar.success(
+            title="项目导入成功",
+            content=self.project_name_label.text(),
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=2000,
+            parent=self
+        )
+        
+    def _onExportClicked(self):
+        """导出当前项目为压缩包"""
+        if not self.current_project_id:
+            return
+        export_path, _ = QFileDialog.getSaveFileName(
+            self, "导出项目", f"{self.current_project_id}.zip", "项目压缩包 (*.zip)"
+        )
+        if not export_path:
+            return
+        self._runProjectTask(
+            self.async_project_manager.export_project_async(self.current_project_id, export_path),
+            "正在导出项目",
+            "项目导出失败",
+            lambda exported: self._onProjectExported(exported, export_path)
+        )
+        
+    def _onProjectExported(self, exported: bool, export_path: str):
+        """项目导出完成"""
+        self.progress_widget.setVisible(False)
+        if not exported:
+            self._onProjectTaskFailed("项目导出失败", "项目不存在或导出出错")
+            return
+        InfoBar.success(
+            title="项目导出成功",
+            content=export_path,
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self
+        )
+        
     def _startAnalysis(self):
         """启动分析"""
         # 模拟分析过程
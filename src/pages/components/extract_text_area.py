@@ -27,6 +27,8 @@ from qfluentwidgets import (
 )
 from config.core import AppConstants
 from core import AudioExtractWorker, get_state_manager, ExtractState
+from core.async_project_manager import get_async_project_manager
+from core.transcript_format import export_segments, format_segments, get_format_extension
 
 
 class ExtractTextArea(CardWidget):
@@ -42,6 +44,7 @@ class ExtractTextArea(CardWidget):
         self.state_manager = get_state_manager()
         self.selected_output_format = AppConstants.OUTPUT_FORMAT_DEFAULT
         self.current_project_id = None  # 保存当前项目ID
+        self.output_file_path = None  # 最近一次输出的文件路径
         self.setup_ui()
         self.connect_state_signals()
 
@@ -82,7 +85,9 @@ class ExtractTextArea(CardWidget):
         self.output_format_combo.addItems([
             AppConstants.OUTPUT_FORMAT_TXT,
             AppConstants.OUTPUT_FORMAT_SRT,
-            AppConstants.OUTPUT_FORMAT_VTT
+            AppConstants.OUTPUT_FORMAT_VTT,
+            AppConstants.OUTPUT_FORMAT_JSON,
+            AppConstants.OUTPUT_FORMAT_TSV,
         ])
         self.output_format_combo.setCurrentText(AppConstants.OUTPUT_FORMAT_DEFAULT)
         self.output_format_combo.currentTextChanged.connect(self.on_output_format_changed)
@@ -171,26 +176,22 @@ class ExtractTextArea(CardWidget):
         layout.addLayout(copy_layout)
 
     def connect_state_signals(self):
-        """连接状态管理器信号"""
-        # 连接文件状态变化信号
-        self.state_manager.file_state_changed.connect(self.on_file_state_changed)
-
-        # 连接提取状态变化信号
-        self.state_manager.extract_state_changed.connect(self.on_extract_state_changed)
-        self.state_manager.extract_progress_updated.connect(self.update_progress)
+        """订阅本组件读取的状态字段，完成和失败提示仍通过事件信号"""
+        self.state_manager.select(
+            ("file.state", "extract.state"), self.on_extract_state_changed, self
+        )
+        self.state_manager.select("extract.progress", self.update_progress, self)
+        self.state_manager.select(
+            "extract.extracted_text", self.on_extracted_text_changed, self
+        )
         self.state_manager.extract_completed.connect(self.on_text_extracted)
         self.state_manager.extract_failed.connect(self.on_error)
 
         # 初始状态更新
         self.update_ui_state()
-        self.sync_text_display()
-
-    def on_file_state_changed(self, file_state):
-        """文件状态变化处理"""
-        self.update_ui_state()
 
-    def on_extract_state_changed(self, extract_state):
-        """提取状态变化处理"""
+    def on_extract_state_changed(self, file_state, extract_state):
+        """文件或提取状态变化处理"""
         self.update_ui_state()
 
         # 更新进度条显示
@@ -228,7 +229,10 @@ class ExtractTextArea(CardWidget):
 
     def set_file_path(self, file_path: str):
         """设置文件路径（保留用于向后兼容）"""
-        self.state_manager.set_file(file_path)
+        file_state = self.state_manager.state.file
+        # 同一文件保留片段起始时间，避免页面跳转后时间轴丢失
+        time_offset = file_state.time_offset if file_state.path == file_path else 0.0
+        self.state_manager.set_file(file_path, time_offset)
 
     def init_model_list(self):
         """初始化模型列表"""
@@ -268,10 +272,41 @@ class ExtractTextArea(CardWidget):
         self.check_model_status(model_name)
 
     def on_output_format_changed(self, format_name: str):
-        """输出格式选择改变事件"""
-        # 这里可以将选择的格式保存到状态管理器中
-        # 暂时只是记录选择的格式，后续可以在提取时使用
+        """输出格式选择改变事件，已有转录结果时直接从片段存储重新生成，无需重新转录"""
         self.selected_output_format = format_name
+        if (
+            self.current_project_id
+            and self.state_manager.state.extract.state != ExtractState.PROCESSING
+        ):
+            self.render_stored_segments(format_name)
+
+    def render_stored_segments(self, output_format: str) -> bool:
+        """从项目的片段存储按输出格式生成文本并写入输出文件
+
+        Returns:
+            bool: 项目有已保存的片段时返回True
+        """
+        try:
+            manager = get_async_project_manager().manager
+            store = manager.get_segment_store(self.current_project_id)
+            if not len(store):
+                return False
+
+            output_dir = os.path.join(tempfile.gettempdir(), AppConstants.TXT_OUTPUT_TEMP_DIR)
+            os.makedirs(output_dir, exist_ok=True)
+            file_path, _ = self.state_manager.get_file_info()
+            file_name = Path(file_path).stem if file_path else self.current_project_id
+            self.output_file_path = export_segments(
+                store,
+                output_format,
+                os.path.join(output_dir, file_name + get_format_extension(output_format)),
+            )
+            self.state_manager.set_extracted_text(format_segments(store, output_format))
+            self.show_output_file_info()
+            return True
+        except Exception as e:
+            print(f"从片段存储生成输出失败: {e}")
+            return False
 
     def check_model_status(self, model_name: str):
         """检查模型状态"""
@@ -335,7 +370,13 @@ class ExtractTextArea(CardWidget):
         use_gpu = self.gpu_mode_checkbox.isChecked()
         
         # 创建工作线程，传入选择的模型、输出格式和GPU模式
-        self.worker = AudioExtractWorker(file_path, selected_model, self.selected_output_format, use_gpu)
+        self.worker = AudioExtractWorker(
+            file_path,
+            selected_model,
+            self.selected_output_format,
+            use_gpu,
+            self.state_manager.state.file.time_offset,
+        )
         self.worker.progress_updated.connect(self.state_manager.update_extract_progress)
         self.worker.text_extracted.connect(self.state_manager.complete_extract)
         self.worker.error_occurred.connect(self.state_manager.fail_extract)
@@ -359,9 +400,12 @@ class ExtractTextArea(CardWidget):
         """更新进度条"""
         self.progress_bar.setValue(value)
 
+    def on_extracted_text_changed(self, text: str):
+        """提取的文本变化时同步显示和复制按钮"""
+        self.update_ui_state()
+
     def on_text_extracted(self, text: str):
-        """处理提取的文本"""
-        self.result_text.setPlainText(text)
+        """处理提取完成，文本显示由 on_extracted_text_changed 同步"""
         # 发射信号通知外部（保留向后兼容）
         self.text_extracted.emit(text)
         
@@ -426,8 +470,10 @@ class ExtractTextArea(CardWidget):
     
     def show_output_file_info(self):
         """显示输出文件信息"""
-        if self.worker and hasattr(self.worker, 'output_file_path') and self.worker.output_file_path:
-            file_path = self.worker.output_file_path
+        if self.worker and getattr(self.worker, 'output_file_path', None):
+            self.output_file_path = self.worker.output_file_path
+        if self.output_file_path:
+            file_path = self.output_file_path
             file_name = os.path.basename(file_path)
             self.file_path_label.setText(f"文件已保存: {file_name}")
             self.file_path_label.show()
@@ -70,10 +70,12 @@ class FileDropArea(CardWidget):
         self.update_ui_state()
 
     def connect_state_signals(self):
-        """连接状态管理器的信号"""
-        self.state_manager.file_state_changed.connect(self.on_file_state_changed)
+        """订阅本组件读取的状态字段"""
+        self.state_manager.select(
+            ("file.path", "file.state"), self.on_file_state_changed, self
+        )
 
-    def on_file_state_changed(self, file_state: FileState):
+    def on_file_state_changed(self, file_path: str, file_state: FileState):
         """响应文件状态变化"""
         self.update_ui_state()
 
@@ -6,7 +6,7 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer
-from PyQt6.QtGui import QFont
+from PyQt6.QtGui import QFont, QTextCursor
 from qfluentwidgets import (
     PushButton,
     TextEdit,
@@ -18,6 +18,7 @@ from qfluentwidgets import (
     CaptionLabel,
     LineEdit,
     CardWidget,
+    CheckBox,
 )
 from config.theme import ThemeConfig
 from config.core import AppConstants
@@ -28,6 +29,17 @@ from core import (
     get_state_manager,
     RefineState,
 )
+from core.text_chunker import (
+    detect_separator,
+    estimate_output_tokens,
+    estimate_tokens,
+    find_truncation_risks,
+    split_text_into_chunks,
+)
+from core.connectivity_checker import get_cached_connectivity
+from core.incremental_refine import plan_incremental_refine
+from core.prompt_builder import RefinePromptBuilder, parse_glossary
+from core.token_counter import estimate_cost, get_token_counter
 
 
 class RefineArea(CardWidget):
@@ -40,9 +52,25 @@ class RefineArea(CardWidget):
         super().__init__()
         self.refine_worker = None
         self.connectivity_checker = None
+        self.connectivity_timings = ""
         self.refine_start_time = 0
         self.refine_timer = QTimer()
         self.refine_timer.timeout.connect(self.update_timer_display)
+        # 流式输出按分段缓存，定时合并刷新，避免每个增量都重绘文本框
+        self.stream_buffers = {}
+        # 增量修复时只收到变化段落的输出，不逐段刷新显示
+        self.incremental_refine = False
+        self.refine_source_text = ""
+        self.stream_render_timer = QTimer()
+        self.stream_render_timer.setSingleShot(True)
+        self.stream_render_timer.setInterval(AppConstants.REFINE_STREAM_RENDER_INTERVAL_MS)
+        self.stream_render_timer.timeout.connect(self.render_stream_text)
+        # 文案变化后延迟统计Token和分段，连续编辑只统计一次
+        self.truncation_risks = []
+        self.plan_timer = QTimer()
+        self.plan_timer.setSingleShot(True)
+        self.plan_timer.setInterval(AppConstants.REFINE_PLAN_DEBOUNCE_MS)
+        self.plan_timer.timeout.connect(self.update_refine_plan)
         self.config_manager = ConfigManager()
         self.state_manager = get_state_manager()
         self.setup_ui()
@@ -52,20 +80,27 @@ class RefineArea(CardWidget):
         # 初始状态更新
         self.update_ui_state()
         self.sync_text_display()
+        self.update_refine_plan()
 
     def connect_state_signals(self):
-        """连接状态管理器的信号"""
-        self.state_manager.extract_text_changed.connect(self.on_extract_text_changed)
-        self.state_manager.refine_state_changed.connect(self.on_refine_state_changed)
-        self.state_manager.refine_text_changed.connect(self.on_refine_text_changed)
+        """订阅本组件读取的状态字段"""
+        self.state_manager.select(
+            "extract.extracted_text", self.on_extract_text_changed, self
+        )
+        self.state_manager.select(
+            ("refine.state", "refine.api_key"), self.on_refine_state_changed, self
+        )
+        self.state_manager.select(
+            "refine.refined_text", self.on_refine_text_changed, self
+        )
 
     def on_extract_text_changed(self, text: str):
         """响应提取文本变化"""
-        self.sync_text_display()
         self.update_ui_state()
+        self.plan_timer.start()
 
-    def on_refine_state_changed(self, state: RefineState):
-        """响应修复状态变化"""
+    def on_refine_state_changed(self, state: RefineState, api_key: str):
+        """响应修复状态或API密钥变化"""
         self.update_ui_state()
 
     def on_refine_text_changed(self, text: str):
@@ -138,6 +173,12 @@ class RefineArea(CardWidget):
         self.refine_button.clicked.connect(self.start_refine_text)
         self.refine_button.setEnabled(False)
 
+        # 中止按钮，修复进行中显示
+        self.abort_button = PushButton(AppConstants.REFINE_ABORT_BUTTON_TEXT)
+        self.abort_button.setIcon(FIF.CLOSE)
+        self.abort_button.clicked.connect(self.abort_refine)
+        self.abort_button.setVisible(False)
+
         # 计时器标签
         self.timer_label = BodyLabel(AppConstants.REFINE_TIMER_INITIAL_TEXT)
         self.timer_label.setVisible(False)
@@ -146,10 +187,38 @@ class RefineArea(CardWidget):
         api_key_layout.addWidget(self.api_key_input)
         api_key_layout.addWidget(self.connectivity_button)
         api_key_layout.addWidget(self.refine_button)
+        api_key_layout.addWidget(self.abort_button)
         api_key_layout.addWidget(self.timer_label)
+
+        # 跳过缓存选项，勾选后重新请求并刷新缓存
+        self.cache_bypass_checkbox = CheckBox(AppConstants.REFINE_CACHE_BYPASS_TEXT)
+        api_key_layout.addWidget(self.cache_bypass_checkbox)
+
+        # 修改列表模式，模型只返回需要修改的片段
+        self.patch_mode_checkbox = CheckBox(AppConstants.REFINE_PATCH_MODE_TEXT)
+        self.patch_mode_checkbox.setChecked(
+            bool(self.config_manager.get(AppConstants.REFINE_PATCH_MODE_CONFIG_KEY, False))
+        )
+        self.patch_mode_checkbox.stateChanged.connect(self.save_patch_mode)
+        self.patch_mode_checkbox.stateChanged.connect(self.plan_timer.start)
+        api_key_layout.addWidget(self.patch_mode_checkbox)
         api_key_layout.addStretch()
         layout.addLayout(api_key_layout)
 
+        # 术语表，作为固定前缀的一部分随每个分段发送
+        glossary_layout = QHBoxLayout()
+        glossary_label = BodyLabel(AppConstants.REFINE_GLOSSARY_LABEL)
+        self.glossary_input = LineEdit()
+        self.glossary_input.setPlaceholderText(AppConstants.REFINE_GLOSSARY_PLACEHOLDER)
+        self.glossary_input.setText(
+            self.config_manager.get(AppConstants.REFINE_GLOSSARY_CONFIG_KEY, "")
+        )
+        self.glossary_input.editingFinished.connect(self.save_glossary)
+        self.glossary_input.textChanged.connect(self.plan_timer.start)
+        glossary_layout.addWidget(glossary_label)
+        glossary_layout.addWidget(self.glossary_input)
+        layout.addLayout(glossary_layout)
+
         # 修复进度条
         self.refine_progress_bar = ProgressBar()
         self.refine_progress_bar.setVisible(False)
@@ -170,14 +239,37 @@ class RefineArea(CardWidget):
         prompt_info_layout = QHBoxLayout()
         self.prompt_size_label = CaptionLabel("Prompt: 0.00 KB")
         self.token_count_label = CaptionLabel("估算Token: 0")
+        self.chunk_progress_label = CaptionLabel(
+            AppConstants.REFINE_CHUNK_PROGRESS_TEMPLATE.format(done=0, total=0)
+        )
         self.prompt_size_label.setStyleSheet("color: #666; font-size: 12px;")
         self.token_count_label.setStyleSheet("color: #666; font-size: 12px;")
+        self.chunk_progress_label.setStyleSheet("color: #666; font-size: 12px;")
+        self.cache_stats_label = CaptionLabel(
+            AppConstants.REFINE_CACHE_STATS_TEMPLATE.format(hits=0, misses=0)
+        )
+        self.cache_stats_label.setStyleSheet("color: #666; font-size: 12px;")
         prompt_info_layout.addWidget(self.prompt_size_label)
         prompt_info_layout.addSpacing(20)
         prompt_info_layout.addWidget(self.token_count_label)
+        prompt_info_layout.addSpacing(20)
+        prompt_info_layout.addWidget(self.chunk_progress_label)
+        prompt_info_layout.addSpacing(20)
+        prompt_info_layout.addWidget(self.cache_stats_label)
         prompt_info_layout.addStretch()
         layout.addLayout(prompt_info_layout)
 
+        # API返回的实际Token用量和前缀缓存命中情况
+        self.usage_label = CaptionLabel("")
+        self.usage_label.setStyleSheet("color: #666; font-size: 12px;")
+        layout.addWidget(self.usage_label)
+
+        # 修复前的Token统计、费用预估和截断提示
+        self.plan_label = CaptionLabel("")
+        self.plan_label.setStyleSheet("color: #666; font-size: 12px;")
+        self.plan_label.setWordWrap(True)
+        layout.addWidget(self.plan_label)
+
         # 复制修复后文案按钮
         copy_refined_layout = QHBoxLayout()
         self.copy_refined_button = PushButton("复制修复后文案")
@@ -220,15 +312,29 @@ class RefineArea(CardWidget):
         self.connectivity_checker.check_failed.connect(
             self.on_connectivity_check_failed
         )
+        self.connectivity_checker.timings_measured.connect(self.on_connectivity_timings)
+        self.connectivity_timings = ""
         self.connectivity_checker.start()
 
+    def on_connectivity_timings(
+        self, connect_ms: float, ttfb_ms: float, reused: bool, cached_age: float
+    ):
+        """记录连通性检查的连接和首字节耗时"""
+        self.connectivity_timings = AppConstants.DEEPSEEK_CONNECTIVITY_TIMINGS_TEMPLATE.format(
+            connect=connect_ms, ttfb=ttfb_ms, reused="(复用)" if reused else ""
+        )
+        if cached_age:
+            self.connectivity_timings += AppConstants.DEEPSEEK_CONNECTIVITY_CACHED_SUFFIX.format(
+                age=cached_age
+            )
+
     def on_connectivity_check_completed(self):
         """连通性检查成功"""
         self.connectivity_button.setText("检查连通性")
         self.connectivity_button.setEnabled(True)
         InfoBar.success(
             title="连通性检查成功",
-            content="API密钥有效，可以正常使用DeepSeek服务",
+            content="API密钥有效，可以正常使用DeepSeek服务\n" + self.connectivity_timings,
             orient=Qt.Orientation.Horizontal,
             isClosable=True,
             position=InfoBarPosition.TOP,
@@ -281,6 +387,20 @@ class RefineArea(CardWidget):
             )
             return
 
+        # 最近检查已确认密钥无效时直接提示，不再发起修复请求
+        cached = get_cached_connectivity(api_key)
+        if cached is not None and not cached.ok:
+            InfoBar.error(
+                title="API密钥无效",
+                content=cached.error,
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=5000,
+                parent=self,
+            )
+            return
+
         original_text = self.state_manager.get_extracted_text()
         if not original_text:
             InfoBar.error(
@@ -299,8 +419,10 @@ class RefineArea(CardWidget):
         self.refine_progress_bar.setVisible(True)
         self.refine_progress_bar.setValue(0)
 
-        self.refined_text.clear()
         self.copy_refined_button.setEnabled(False)
+        self.stream_buffers = {}
+        self.abort_button.setEnabled(True)
+        self.abort_button.setVisible(True)
 
         # 启动计时器
         self.start_timer()
@@ -312,39 +434,76 @@ class RefineArea(CardWidget):
         """开始文案修复处理"""
         api_key = self.api_key_input.text().strip()
 
-        # 构建文案修复的提示词
+        # 原始文案由工作线程按Token预算分段后填入修复提示词
         original_text = self.state_manager.get_extracted_text()
-        refine_prompt = f"""请修复文案中的错别字、语法错误、专业术语和断句分段等问题。
-
-原始文案：
-{original_text}
 
-请按照以下要求修复文案：
-1. 修正错别字和语法错误，但是不要变更原文（插入或删除）
-2. 统一专业术语表达
-3. 优化断句和分段，提高可读性
-4. 保持原文的语义和风格
-5. 确保术语的准确性
+        # 修复前提示可能被截断的分段
+        self.plan_timer.stop()
+        self.update_refine_plan()
+        if self.truncation_risks:
+            InfoBar.warning(
+                title="输出可能被截断",
+                content=self.format_truncation_warning(),
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=5000,
+                parent=self,
+            )
 
-请直接返回修复后的文案内容，不需要JSON格式。"""
+        # 对比上次修复的原文，未修改的段落沿用上次结果；勾选跳过缓存时完整修复
+        use_cache = not self.cache_bypass_checkbox.isChecked()
+        reused_paragraphs = (
+            plan_incremental_refine(
+                self.state_manager.get_refine_source_text(),
+                self.state_manager.get_refined_text(),
+                original_text,
+            )
+            if use_cache
+            else None
+        )
+        self.incremental_refine = bool(reused_paragraphs)
+        self.refine_source_text = original_text
+        if not self.incremental_refine:
+            # 完整修复时清空旧结果，逐段显示流式输出
+            self.refined_text.clear()
 
         # 清理之前的worker
         if self.refine_worker:
             self.refine_worker.deleteLater()
 
         # 创建并启动工作线程
-        self.refine_worker = TextRefineWorker(refine_prompt, api_key)
+        self.refine_worker = TextRefineWorker(
+            original_text,
+            api_key,
+            system_prompt=AppConstants.DEEPSEEK_REFINE_SYSTEM_PROMPT,
+            glossary=parse_glossary(self.glossary_input.text()),
+            stream=True,
+            use_cache=use_cache,
+            patch_mode=self.patch_mode_checkbox.isChecked(),
+            reused_paragraphs=reused_paragraphs,
+        )
         self.refine_worker.progress_updated.connect(self.update_refine_progress)
         self.refine_worker.text_refined.connect(self.on_text_refined)
         self.refine_worker.error_occurred.connect(self.on_refine_error)
         self.refine_worker.finished.connect(self.on_refine_finished)
         # 连接Prompt信息信号
         self.refine_worker.prompt_info_updated.connect(self.update_prompt_info)
+        self.refine_worker.chunk_progress.connect(self.update_chunk_progress)
+        self.refine_worker.text_delta.connect(self.on_text_delta)
+        self.refine_worker.refine_aborted.connect(self.on_refine_aborted)
+        self.refine_worker.cache_stats_updated.connect(self.update_cache_stats)
+        self.refine_worker.usage_updated.connect(self.update_usage)
+        self.usage_label.setText("")
         self.refine_worker.start()
 
         InfoBar.info(
             title="开始修复",
-            content="正在修复文案...",
+            content=(
+                AppConstants.REFINE_INCREMENTAL_TEMPLATE.format(reused=len(reused_paragraphs))
+                if reused_paragraphs
+                else "正在修复文案..."
+            ),
             orient=Qt.Orientation.Horizontal,
             isClosable=True,
             position=InfoBarPosition.TOP,
@@ -356,10 +515,52 @@ class RefineArea(CardWidget):
         """更新修复进度条"""
         self.refine_progress_bar.setValue(value)
 
+    def on_text_delta(self, index: int, delta: str):
+        """接收流式输出增量"""
+        self.stream_buffers[index] = self.stream_buffers.get(index, "") + delta
+        if self.incremental_refine:
+            return
+        if not self.stream_render_timer.isActive():
+            self.stream_render_timer.start()
+
+    def render_stream_text(self):
+        """按分段顺序拼接已收到的输出并刷新显示"""
+        separator = detect_separator(self.state_manager.get_extracted_text())
+        self.refined_text.setPlainText(
+            separator.join(self.stream_buffers[i] for i in sorted(self.stream_buffers))
+        )
+        self.refined_text.moveCursor(QTextCursor.MoveOperation.End)
+
+    def abort_refine(self):
+        """中止正在进行的修复"""
+        if self.refine_worker:
+            self.abort_button.setEnabled(False)
+            self.refine_worker.abort()
+
+    def on_refine_aborted(self):
+        """修复已中止，保留已收到的部分输出"""
+        self.stream_render_timer.stop()
+        if not self.incremental_refine:
+            self.render_stream_text()
+        self.state_manager.fail_refine(AppConstants.DEEPSEEK_ERROR_ABORTED)
+
+        InfoBar.warning(
+            title="已中止",
+            content=AppConstants.DEEPSEEK_ERROR_ABORTED,
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self,
+        )
+
     def on_text_refined(self, refined_text: str):
         """文案修复完成"""
+        self.stream_render_timer.stop()
         # 通过状态管理器完成修复并设置文本
-        self.state_manager.complete_refine(refined_text)
+        self.state_manager.complete_refine(
+            refined_text, source_text=self.refine_source_text
+        )
 
         InfoBar.success(
             title="修复完成",
@@ -389,6 +590,7 @@ class RefineArea(CardWidget):
     def on_refine_finished(self):
         """修复任务完成"""
         self.refine_progress_bar.setVisible(False)
+        self.abort_button.setVisible(False)
         # 停止计时器但保持显示
         self.stop_timer()
         if self.refine_worker:
@@ -401,6 +603,90 @@ class RefineArea(CardWidget):
             self.prompt_size_label.setText(f"Prompt: {prompt_kb:.2f} KB")
             self.token_count_label.setText(f"估算Token: {token_count}")
 
+    def update_refine_plan(self):
+        """统计原文Token数、预计分段数和费用，并检查输出是否可能被截断"""
+        text = self.state_manager.get_extracted_text()
+        if not text:
+            self.truncation_risks = []
+            self.plan_label.setText("")
+            return
+
+        chunks = split_text_into_chunks(text, AppConstants.DEEPSEEK_CHUNK_TOKEN_BUDGET)
+        prefix_tokens = estimate_tokens(
+            RefinePromptBuilder(
+                AppConstants.DEEPSEEK_PATCH_SYSTEM_PROMPT
+                if self.patch_mode_checkbox.isChecked()
+                else AppConstants.DEEPSEEK_REFINE_SYSTEM_PROMPT,
+                parse_glossary(self.glossary_input.text()),
+            ).system_prefix
+        )
+        input_tokens = sum(estimate_tokens(chunk) for chunk in chunks)
+        output_tokens = sum(estimate_output_tokens(chunk) for chunk in chunks)
+        # 首个分段写入前缀缓存，之后的分段按缓存命中计费
+        cost = estimate_cost(
+            input_tokens + prefix_tokens * len(chunks),
+            output_tokens,
+            prefix_tokens * (len(chunks) - 1),
+        )
+
+        plan_text = AppConstants.REFINE_PLAN_TEMPLATE.format(
+            tokens=input_tokens,
+            approx="" if get_token_counter().is_exact else AppConstants.REFINE_PLAN_APPROX_SUFFIX,
+            chunks=len(chunks),
+            cost=cost,
+        )
+        self.truncation_risks = find_truncation_risks(
+            chunks, AppConstants.DEEPSEEK_DEFAULT_MAX_TOKENS
+        )
+        if self.truncation_risks:
+            plan_text += "\n" + self.format_truncation_warning()
+            self.plan_label.setStyleSheet("color: #d83b01; font-size: 12px;")
+        else:
+            self.plan_label.setStyleSheet("color: #666; font-size: 12px;")
+        self.plan_label.setText(plan_text)
+
+    def format_truncation_warning(self) -> str:
+        """生成截断风险提示文本"""
+        index, tokens = self.truncation_risks[0]
+        return AppConstants.REFINE_TRUNCATION_WARNING.format(
+            index=index, tokens=tokens, limit=AppConstants.DEEPSEEK_DEFAULT_MAX_TOKENS
+        )
+
+    def update_chunk_progress(self, done: int, total: int):
+        """更新分段修复进度显示"""
+        self.chunk_progress_label.setText(
+            AppConstants.REFINE_CHUNK_PROGRESS_TEMPLATE.format(done=done, total=total)
+        )
+
+    def update_cache_stats(self, hits: int, misses: int):
+        """更新缓存命中统计显示"""
+        self.cache_stats_label.setText(
+            AppConstants.REFINE_CACHE_STATS_TEMPLATE.format(hits=hits, misses=misses)
+        )
+
+    def update_usage(self, prompt_tokens: int, cache_hit_tokens: int, completion_tokens: int):
+        """更新API返回的实际Token用量和费用"""
+        self.usage_label.setText(
+            AppConstants.REFINE_USAGE_TEMPLATE.format(
+                prompt=prompt_tokens,
+                hit=cache_hit_tokens,
+                completion=completion_tokens,
+                cost=estimate_cost(prompt_tokens, completion_tokens, cache_hit_tokens),
+            )
+        )
+
+    def save_patch_mode(self):
+        """保存修改列表模式开关到本地配置"""
+        self.config_manager.set(
+            AppConstants.REFINE_PATCH_MODE_CONFIG_KEY, self.patch_mode_checkbox.isChecked()
+        )
+
+    def save_glossary(self):
+        """保存术语表到本地配置"""
+        self.config_manager.set(
+            AppConstants.REFINE_GLOSSARY_CONFIG_KEY, self.glossary_input.text().strip()
+        )
+
     def on_refined_text_changed(self):
         """修复后文案变化事件"""
         text = self.refined_text.toPlainText().strip()
@@ -1,180 +1,55 @@
 import os
-import tempfile
-import threading
 import re
+import tempfile
 from urllib.parse import urlparse
 from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
     QLabel,
-    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 from qfluentwidgets import (
     InfoBar,
     InfoBarPosition,
     BodyLabel,
-    LineEdit,
+    PlainTextEdit,
     PrimaryPushButton,
+    PushButton,
     ProgressBar,
-    MessageBox,
+    ComboBox,
+    CheckBox,
+    LineEdit,
 )
 from config.core import AppConstants
 from config.theme import ThemeConfig
 from core import get_state_manager
-
-
-class AudioExtractWorker(QThread):
-    """音频提取工作线程"""
-
-    progress_updated = pyqtSignal(str)  # 进度更新信号
-    extraction_completed = pyqtSignal(str)  # 提取完成信号
-    extraction_failed = pyqtSignal(str)  # 提取失败信号
-
-    def __init__(self, url: str, output_dir: str):
-        super().__init__()
-        self.url = url
-        self.output_dir = output_dir
-
-    def sanitize_filename(self, filename: str) -> str:
-        """清理文件名，移除特殊字符"""
-        # 移除或替换Windows文件名中的非法字符
-        illegal_chars = r'[<>:"/\\|?*]'
-        filename = re.sub(illegal_chars, '_', filename)
-        
-        # 移除前后空格并限制长度
-        filename = filename.strip()
-        if len(filename) > 200:
-            filename = filename[:200]
-            
-        return filename
-
-    def run(self):
-        """执行音频提取"""
-        try:
-            import yt_dlp
-
-            # 记录下载前的文件列表
-            files_before = set(os.listdir(self.output_dir)) if os.path.exists(self.output_dir) else set()
-
-            self.progress_updated.emit(AppConstants.ONLINE_AUDIO_MSG_PROCESSING)
-
-            # 先获取视频信息以生成清理后的文件名
-            with yt_dlp.YoutubeDL({"quiet": True}) as ydl_info:
-                info = ydl_info.extract_info(self.url, download=False)
-                title = info.get("title", "unknown")
-                sanitized_title = self.sanitize_filename(title)
-
-            # 生成唯一的文件名（如果文件已存在，添加时间戳）
-            import time
-            timestamp = int(time.time())
-            final_filename = sanitized_title
-            expected_mp3_path = os.path.join(self.output_dir, f"{final_filename}.mp3")
-            
-            # 如果文件已存在，添加时间戳
-            if os.path.exists(expected_mp3_path):
-                final_filename = f"{sanitized_title}_{timestamp}"
-                expected_mp3_path = os.path.join(self.output_dir, f"{final_filename}.mp3")
-
-            # 配置yt-dlp选项，使用清理后的文件名
-            output_template = os.path.join(self.output_dir, f"{final_filename}.%(ext)s")
-            ydl_opts = {
-                "format": "bestaudio/best",
-                "outtmpl": output_template,
-                "postprocessors": [{
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": "mp3",
-                    "preferredquality": "192",
-                }],
-                "noplaylist": True,
-                "restrictfilenames": True,  # 限制文件名为ASCII字符
-                "windowsfilenames": True,   # 确保Windows兼容性
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # 下载并提取音频
-                ydl.download([self.url])
-
-                # 查找新生成的音频文件
-                files_after = set(os.listdir(self.output_dir))
-                new_files = files_after - files_before
-                
-                print(f"下载前文件: {files_before}")
-                print(f"下载后文件: {files_after}")
-                print(f"新增文件: {new_files}")
-                print(f"输出目录: {self.output_dir}")
-                print(f"预期文件名: {final_filename}")
-                print(f"预期MP3文件: {expected_mp3_path}")
-                
-                # 首先检查预期的MP3文件是否存在
-                if os.path.exists(expected_mp3_path):
-                    print(f"找到预期的MP3文件: {expected_mp3_path}")
-                    file_path = os.path.normpath(expected_mp3_path)
-                    self.extraction_completed.emit(file_path)
-                    return
-                
-                # 查找新增的音频文件
-                audio_extensions = [".mp3", ".m4a", ".webm", ".ogg", ".wav"]
-                audio_files = []
-                
-                for ext in audio_extensions:
-                    matching_files = [f for f in new_files if f.lower().endswith(ext.lower())]
-                    if matching_files:
-                        audio_files.extend(matching_files)
-                        break  # 找到匹配的扩展名就停止
-                
-                if audio_files:
-                    # 如果有多个文件，选择最大的（通常是主音频文件）
-                    largest_file = max(audio_files, key=lambda f: os.path.getsize(os.path.join(self.output_dir, f)))
-                    file_path = os.path.join(self.output_dir, largest_file)
-                    
-                    # 规范化路径
-                    file_path = os.path.normpath(file_path)
-                    print(f"从新增文件中找到: {file_path}")
-                    self.extraction_completed.emit(file_path)
-                    return
-                
-                # 最后尝试查找所有匹配预期文件名前缀的音频文件
-                matching_audio_files = []
-                for f in files_after:
-                    if f.startswith(final_filename) and any(f.lower().endswith(ext.lower()) for ext in audio_extensions):
-                        matching_audio_files.append(f)
-                
-                if matching_audio_files:
-                    # 优先选择mp3文件
-                    mp3_files = [f for f in matching_audio_files if f.lower().endswith('.mp3')]
-                    if mp3_files:
-                        file_path = os.path.normpath(os.path.join(self.output_dir, mp3_files[0]))
-                        print(f"从匹配前缀的文件中找到MP3: {file_path}")
-                        self.extraction_completed.emit(file_path)
-                        return
-                    else:
-                        # 选择第一个匹配的文件
-                        file_path = os.path.normpath(os.path.join(self.output_dir, matching_audio_files[0]))
-                        print(f"从匹配前缀的文件中找到: {file_path}")
-                        self.extraction_completed.emit(file_path)
-                        return
-
-                self.extraction_failed.emit("未找到提取的音频文件")
-
-        except ImportError:
-            self.extraction_failed.emit("缺少yt-dlp依赖，请运行: uv sync --extra video")
-        except Exception as e:
-            self.extraction_failed.emit(f"提取失败: {str(e)}")
+from core.download_manager import DownloadManager, DownloadStatus, parse_section_time
 
 
 class ExtractAudioResourcePage(QWidget):
     """在线音频提取页面"""
 
+    # 下载列表列索引
+    COLUMN_TITLE = 0
+    COLUMN_STATUS = 1
+    COLUMN_PROGRESS = 2
+    COLUMN_SPEED = 3
+    COLUMN_ETA = 4
+
     def __init__(self):
         super().__init__()
         self.state_manager = get_state_manager()
         self.temp_audio_dir = None
-        self.worker = None
+        self.extracted_file_path = None
+        self.extracted_transcript_path = None
         self.setup_ui()
         self.setup_temp_dir()
+        self.setup_download_manager()
 
     def setup_ui(self):
         """设置UI"""
@@ -195,7 +70,7 @@ class ExtractAudioResourcePage(QWidget):
         layout.addWidget(title_label)
 
         # 说明文本
-        desc_label = BodyLabel("支持YouTube和Bilibili视频链接，自动提取音频文件")
+        desc_label = BodyLabel("支持YouTube和Bilibili视频及播放列表链接，自动提取音频文件")
         desc_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(desc_label)
 
@@ -203,12 +78,76 @@ class ExtractAudioResourcePage(QWidget):
         input_layout = QVBoxLayout()
         input_layout.setSpacing(15)
 
-        # URL输入框
-        self.url_input = LineEdit()
-        self.url_input.setPlaceholderText(AppConstants.ONLINE_AUDIO_INPUT_PLACEHOLDER)
-        self.url_input.setFixedHeight(40)
+        # URL输入框（每行一个链接）
+        self.url_input = PlainTextEdit()
+        self.url_input.setPlaceholderText(
+            AppConstants.ONLINE_AUDIO_MULTI_INPUT_PLACEHOLDER
+        )
+        self.url_input.setFixedHeight(AppConstants.ONLINE_AUDIO_URL_INPUT_HEIGHT)
         input_layout.addWidget(self.url_input)
 
+        # 后处理配置选择
+        profile_layout = QHBoxLayout()
+        profile_layout.addStretch()
+        profile_label = BodyLabel(AppConstants.ONLINE_AUDIO_PROFILE_LABEL_TEXT)
+        self.profile_combo = ComboBox()
+        self.profile_combo.setMinimumWidth(
+            AppConstants.ONLINE_AUDIO_PROFILE_COMBO_MIN_WIDTH
+        )
+        for profile, label in AppConstants.ONLINE_AUDIO_PROFILE_LABELS.items():
+            self.profile_combo.addItem(label, userData=profile)
+        self.profile_combo.setCurrentText(
+            AppConstants.ONLINE_AUDIO_PROFILE_LABELS[
+                AppConstants.ONLINE_AUDIO_PROFILE_DEFAULT
+            ]
+        )
+        profile_layout.addWidget(profile_label)
+        profile_layout.addWidget(self.profile_combo)
+
+        # 平台字幕选项
+        self.subtitle_checkbox = CheckBox(AppConstants.ONLINE_AUDIO_SUBTITLE_CHECKBOX_TEXT)
+        self.subtitle_checkbox.stateChanged.connect(self.on_subtitle_option_changed)
+        profile_layout.addWidget(self.subtitle_checkbox)
+
+        self.subtitle_format_label = BodyLabel(
+            AppConstants.ONLINE_AUDIO_SUBTITLE_FORMAT_LABEL_TEXT
+        )
+        self.subtitle_format_combo = ComboBox()
+        self.subtitle_format_combo.setMinimumWidth(
+            AppConstants.OUTPUT_FORMAT_COMBO_MIN_WIDTH
+        )
+        self.subtitle_format_combo.addItems([
+            AppConstants.OUTPUT_FORMAT_TXT,
+            AppConstants.OUTPUT_FORMAT_SRT,
+            AppConstants.OUTPUT_FORMAT_VTT
+        ])
+        self.subtitle_format_combo.setCurrentText(AppConstants.OUTPUT_FORMAT_DEFAULT)
+        profile_layout.addWidget(self.subtitle_format_label)
+        profile_layout.addWidget(self.subtitle_format_combo)
+        self.on_subtitle_option_changed()
+        profile_layout.addStretch()
+        input_layout.addLayout(profile_layout)
+
+        # 片段下载：只下载长视频中的一段
+        section_layout = QHBoxLayout()
+        section_layout.addStretch()
+        section_layout.addWidget(BodyLabel(AppConstants.ONLINE_AUDIO_SECTION_LABEL_TEXT))
+        self.section_start_input = LineEdit()
+        self.section_start_input.setPlaceholderText(
+            AppConstants.ONLINE_AUDIO_SECTION_START_PLACEHOLDER
+        )
+        self.section_start_input.setFixedWidth(AppConstants.ONLINE_AUDIO_SECTION_INPUT_WIDTH)
+        self.section_end_input = LineEdit()
+        self.section_end_input.setPlaceholderText(
+            AppConstants.ONLINE_AUDIO_SECTION_END_PLACEHOLDER
+        )
+        self.section_end_input.setFixedWidth(AppConstants.ONLINE_AUDIO_SECTION_INPUT_WIDTH)
+        section_layout.addWidget(self.section_start_input)
+        section_layout.addWidget(BodyLabel("-"))
+        section_layout.addWidget(self.section_end_input)
+        section_layout.addStretch()
+        input_layout.addLayout(section_layout)
+
         # 按钮区域
         button_layout = QHBoxLayout()
         button_layout.addStretch()
@@ -220,13 +159,32 @@ class ExtractAudioResourcePage(QWidget):
         self.extract_button.clicked.connect(self.start_extraction)
         button_layout.addWidget(self.extract_button)
 
+        self.cancel_button = PushButton(AppConstants.ONLINE_AUDIO_CANCEL_BUTTON)
+        self.cancel_button.setFixedSize(120, 40)
+        self.cancel_button.clicked.connect(self.cancel_downloads)
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.cancel_button)
+
+        self.retry_button = PushButton(AppConstants.ONLINE_AUDIO_RETRY_BUTTON)
+        self.retry_button.setFixedSize(120, 40)
+        self.retry_button.clicked.connect(self.retry_downloads)
+        self.retry_button.setEnabled(False)
+        button_layout.addWidget(self.retry_button)
+
         button_layout.addStretch()
         input_layout.addLayout(button_layout)
 
         layout.addLayout(input_layout)
 
-        # 进度条
+        # 下载任务列表
+        self.download_table = QTableWidget()
+        self.setup_download_table()
+        self.download_table.setVisible(False)
+        layout.addWidget(self.download_table)
+
+        # 总体进度条
         self.progress_bar = ProgressBar()
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
 
@@ -263,6 +221,37 @@ class ExtractAudioResourcePage(QWidget):
         layout.addStretch()
         self.setLayout(layout)
 
+    def setup_download_table(self):
+        """设置下载任务表格"""
+        headers = [
+            AppConstants.ONLINE_AUDIO_TABLE_TITLE,
+            AppConstants.ONLINE_AUDIO_TABLE_STATUS,
+            AppConstants.ONLINE_AUDIO_TABLE_PROGRESS,
+            AppConstants.ONLINE_AUDIO_TABLE_SPEED,
+            AppConstants.ONLINE_AUDIO_TABLE_ETA,
+        ]
+        self.download_table.setColumnCount(len(headers))
+        self.download_table.setHorizontalHeaderLabels(headers)
+        self.download_table.setMinimumHeight(AppConstants.ONLINE_AUDIO_TABLE_MIN_HEIGHT)
+
+        # 设置表格属性
+        self.download_table.setAlternatingRowColors(True)
+        self.download_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.download_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.download_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.download_table.itemSelectionChanged.connect(self.on_download_selection_changed)
+
+        # 设置列宽
+        header = self.download_table.horizontalHeader()
+        header.setSectionResizeMode(self.COLUMN_TITLE, QHeaderView.ResizeMode.Stretch)
+        for column in (
+            self.COLUMN_STATUS,
+            self.COLUMN_PROGRESS,
+            self.COLUMN_SPEED,
+            self.COLUMN_ETA,
+        ):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+
     def setup_temp_dir(self):
         """设置临时目录"""
         if not self.temp_audio_dir:
@@ -272,6 +261,18 @@ class ExtractAudioResourcePage(QWidget):
             os.makedirs(self.temp_audio_dir, exist_ok=True)
             print(f"音频临时目录: {self.temp_audio_dir}")
 
+    def setup_download_manager(self):
+        """创建下载管理器并连接信号"""
+        self.download_manager = DownloadManager(self.temp_audio_dir)
+        self.download_manager.item_added.connect(self.on_item_added)
+        self.download_manager.item_removed.connect(self.on_item_removed)
+        self.download_manager.item_status_changed.connect(self.on_item_status_changed)
+        self.download_manager.item_progress.connect(self.on_item_progress)
+        self.download_manager.item_completed.connect(self.on_extraction_completed)
+        self.download_manager.item_transcript_ready.connect(self.on_transcript_ready)
+        self.download_manager.item_failed.connect(self.on_extraction_failed)
+        self.download_manager.queue_finished.connect(self.on_queue_finished)
+
     def validate_url(self, url: str) -> bool:
         """验证URL是否有效"""
         try:
@@ -289,49 +290,254 @@ class ExtractAudioResourcePage(QWidget):
             return False
 
     def start_extraction(self):
-        """开始提取音频"""
-        url = self.url_input.text().strip()
+        """将输入的链接加入下载队列"""
+        urls = [u for u in re.split(r"\s+", self.url_input.toPlainText()) if u]
 
-        if not url:
+        if not urls:
             self.show_error_message("请输入视频链接")
             return
 
-        if not self.validate_url(url):
-            self.show_error_message(AppConstants.ONLINE_AUDIO_MSG_INVALID_URL)
+        invalid_urls = [url for url in urls if not self.validate_url(url)]
+        if invalid_urls:
+            self.show_error_message(
+                f"{AppConstants.ONLINE_AUDIO_MSG_INVALID_URL}: {invalid_urls[0]}"
+            )
             return
 
-        # 禁用按钮和输入框
-        self.extract_button.setEnabled(False)
-        self.url_input.setEnabled(False)
+        try:
+            section = self.parse_section()
+        except ValueError as e:
+            self.show_error_message(str(e))
+            return
 
-        # 显示进度条
+        # 新加入的任务使用当前选择的后处理配置
+        self.download_manager.profile = (
+            self.profile_combo.currentData()
+            or AppConstants.ONLINE_AUDIO_PROFILE_DEFAULT
+        )
+        self.download_manager.prefer_subtitles = self.subtitle_checkbox.isChecked()
+        self.download_manager.subtitle_format = self.subtitle_format_combo.currentText()
+        self.download_manager.section = section
+        self.url_input.clear()
+        self.download_table.setVisible(True)
         self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # 无限进度条
-        self.button_widget.setVisible(False)
+        self.cancel_button.setEnabled(True)
+        self.status_label.setText(AppConstants.ONLINE_AUDIO_MSG_PROCESSING)
 
-        # 启动工作线程
-        self.worker = AudioExtractWorker(url, self.temp_audio_dir)
-        self.worker.progress_updated.connect(self.update_status)
-        self.worker.extraction_completed.connect(self.on_extraction_completed)
-        self.worker.extraction_failed.connect(self.on_extraction_failed)
-        self.worker.start()
+        self.download_manager.add_urls(urls)
 
-    def update_status(self, message: str):
-        """更新状态信息"""
-        self.status_label.setText(message)
+    def parse_section(self):
+        """解析片段输入，未填写时返回None表示下载完整视频
 
-    def on_extraction_completed(self, file_path: str):
-        """提取完成处理"""
-        self.progress_bar.setVisible(False)
-        self.extract_button.setEnabled(True)
-        self.url_input.setEnabled(True)
+        Raises:
+            ValueError: 时间格式无效或结束时间早于开始时间
+        """
+        try:
+            start = parse_section_time(self.section_start_input.text())
+            end = parse_section_time(self.section_end_input.text())
+        except ValueError:
+            raise ValueError(AppConstants.ONLINE_AUDIO_MSG_INVALID_SECTION)
+
+        if start is None and end is None:
+            return None
+        start = start or 0.0
+        end = float("inf") if end is None else end
+        if end <= start:
+            raise ValueError(AppConstants.ONLINE_AUDIO_MSG_SECTION_ORDER)
+        return (start, end)
+
+    def on_subtitle_option_changed(self, *args):
+        """平台字幕选项变化时显示或隐藏文案格式选择"""
+        enabled = self.subtitle_checkbox.isChecked()
+        self.subtitle_format_label.setVisible(enabled)
+        self.subtitle_format_combo.setVisible(enabled)
+
+    def cancel_downloads(self):
+        """取消所有下载任务"""
+        self.download_manager.cancel_all()
+
+    def retry_downloads(self):
+        """重试失败的下载任务"""
+        self.retry_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.download_manager.retry_failed()
+
+    # ==================== 下载列表更新 ====================
+
+    def _find_row(self, item_id: str) -> int:
+        """查找任务所在行，不存在时返回-1"""
+        for row in range(self.download_table.rowCount()):
+            cell = self.download_table.item(row, self.COLUMN_TITLE)
+            if cell and cell.data(Qt.ItemDataRole.UserRole) == item_id:
+                return row
+        return -1
+
+    def _set_cell(self, row: int, column: int, text: str):
+        """设置表格单元格文本"""
+        cell = self.download_table.item(row, column)
+        if cell is None:
+            self.download_table.setItem(row, column, QTableWidgetItem(text))
+        else:
+            cell.setText(text)
+
+    def _refresh_row(self, item_id: str):
+        """根据任务数据刷新所在行"""
+        item = self.download_manager.get_item(item_id)
+        row = self._find_row(item_id)
+        if item is None or row < 0:
+            return
+
+        self.download_table.item(row, self.COLUMN_TITLE).setText(item.title)
+        self._set_cell(
+            row,
+            self.COLUMN_STATUS,
+            AppConstants.ONLINE_AUDIO_STATUS_TEXT.get(item.status.value, item.status.value),
+        )
+        self._set_cell(row, self.COLUMN_PROGRESS, f"{item.progress:.1f}%")
+        downloading = item.status == DownloadStatus.DOWNLOADING
+        self._set_cell(
+            row, self.COLUMN_SPEED, self.format_speed(item.speed) if downloading else ""
+        )
+        self._set_cell(
+            row, self.COLUMN_ETA, self.format_eta(item.eta) if downloading else ""
+        )
 
+    def _update_summary(self):
+        """更新总体进度和任务统计"""
+        items = self.download_manager.items
+        if not items:
+            return
+        done = sum(
+            1
+            for item in items
+            if item.status in (DownloadStatus.COMPLETED, DownloadStatus.SKIPPED)
+        )
+        failed = sum(
+            1
+            for item in items
+            if item.status in (DownloadStatus.FAILED, DownloadStatus.CANCELLED)
+        )
+        self.progress_bar.setValue(int(sum(item.progress for item in items) / len(items)))
+        self.status_label.setText(
+            AppConstants.ONLINE_AUDIO_MSG_QUEUE_SUMMARY.format(
+                total=len(items), done=done, failed=failed
+            )
+        )
+
+    @staticmethod
+    def format_speed(speed: float) -> str:
+        """格式化下载速度"""
+        if speed <= 0:
+            return "-"
+        for unit in ("B/s", "KB/s", "MB/s"):
+            if speed < 1024:
+                return f"{speed:.1f} {unit}"
+            speed /= 1024
+        return f"{speed:.1f} GB/s"
+
+    @staticmethod
+    def format_eta(eta: float) -> str:
+        """格式化剩余时间"""
+        if eta <= 0:
+            return "-"
+        minutes, seconds = divmod(int(eta), 60)
+        return f"{minutes:02d}:{seconds:02d}"
+
+    def on_item_added(self, item_id: str):
+        """新增任务行"""
+        item = self.download_manager.get_item(item_id)
+        row = self.download_table.rowCount()
+        self.download_table.insertRow(row)
+        title_cell = QTableWidgetItem(item.title)
+        title_cell.setData(Qt.ItemDataRole.UserRole, item_id)
+        title_cell.setToolTip(item.url)
+        self.download_table.setItem(row, self.COLUMN_TITLE, title_cell)
+        self._refresh_row(item_id)
+        self._update_summary()
+
+    def on_item_removed(self, item_id: str):
+        """移除任务行（播放列表展开后移除占位任务）"""
+        row = self._find_row(item_id)
+        if row >= 0:
+            self.download_table.removeRow(row)
+        self._update_summary()
+
+    def on_item_status_changed(self, item_id: str, status: DownloadStatus):
+        """任务状态变化"""
+        self._refresh_row(item_id)
+        self._update_summary()
+
+    def on_item_progress(self, item_id: str, percent: float, speed: float, eta: float):
+        """任务下载进度变化"""
+        self._refresh_row(item_id)
+        self._update_summary()
+
+    def on_download_selection_changed(self):
+        """选中已完成的任务时，将其作为后续处理的音频文件"""
+        rows = self.download_table.selectionModel().selectedRows()
+        if not rows:
+            return
+        cell = self.download_table.item(rows[0].row(), self.COLUMN_TITLE)
+        item = self.download_manager.get_item(cell.data(Qt.ItemDataRole.UserRole))
+        if item and item.file_path:
+            self.select_extracted_file(item.file_path, self._section_offset(item))
+        elif item and item.transcript_path and os.path.exists(item.transcript_path):
+            with open(item.transcript_path, "r", encoding="utf-8") as f:
+                self.select_transcript(f.read(), item.transcript_path)
+
+    def on_queue_finished(self):
+        """所有任务结束"""
+        self.cancel_button.setEnabled(False)
+        has_failed = any(
+            item.status in (DownloadStatus.FAILED, DownloadStatus.CANCELLED)
+            for item in self.download_manager.items
+        )
+        self.retry_button.setEnabled(has_failed)
+        self._update_summary()
+
+    def on_extraction_completed(self, item_id: str, file_path: str):
+        """单个任务提取完成处理"""
+        self._refresh_row(item_id)
+        self._update_summary()
+        item = self.download_manager.get_item(item_id)
+        self.select_extracted_file(file_path, self._section_offset(item))
+
+    @staticmethod
+    def _section_offset(item) -> float:
+        """片段任务的起始秒数，用于将转录时间戳对齐到原视频"""
+        return item.section[0] if item and item.section else 0.0
+
+    def on_transcript_ready(self, item_id: str, text: str):
+        """单个任务通过平台字幕得到文案"""
+        self._refresh_row(item_id)
+        self._update_summary()
+        item = self.download_manager.get_item(item_id)
+        self.select_transcript(text, item.transcript_path if item else "")
+
+    def select_transcript(self, text: str, transcript_path: str):
+        """将平台字幕文案作为提取结果写入状态管理器，与语音识别结果一致"""
+        self.state_manager.start_extract()
+        self.state_manager.complete_extract(text)
+
+        file_name = os.path.basename(transcript_path)
+        self.status_label.setText(
+            f"{AppConstants.ONLINE_AUDIO_MSG_SUBTITLE_COMPLETE}\n文件: {file_name}"
+        )
+
+        # 字幕结果没有音频文件，只能进入文案页面查看和修复
+        self.extracted_file_path = None
+        self.extracted_transcript_path = transcript_path
+        self.analyze_button.setVisible(False)
+        self.button_widget.setVisible(True)
+
+    def select_extracted_file(self, file_path: str, time_offset: float = 0.0):
+        """设置当前待处理的音频文件"""
         # 规范化路径显示
         normalized_path = os.path.normpath(file_path)
         file_name = os.path.basename(normalized_path)
         
         # 更新状态管理器
-        self.state_manager.set_file(normalized_path)
+        self.state_manager.set_file(normalized_path, time_offset)
 
         # 显示成功信息，显示文件名和简化的路径
         display_path = normalized_path
@@ -346,12 +552,17 @@ class ExtractAudioResourcePage(QWidget):
 
         # 保存文件路径并显示处理按钮
         self.extracted_file_path = normalized_path
+        self.extracted_transcript_path = None
+        self.analyze_button.setVisible(True)
         self.button_widget.setVisible(True)
 
     def on_extract_text_button_clicked(self):
         """提取文案按钮点击事件"""
         if hasattr(self, 'extracted_file_path') and self.extracted_file_path:
             self.navigate_to_extract_audio_page(self.extracted_file_path)
+        elif self.extracted_transcript_path:
+            # 平台字幕已写入状态管理器，直接跳转查看文案
+            self.navigate_to_extract_audio_page(None)
         else:
             self.show_error_message("没有可处理的音频文件")
 
@@ -371,7 +582,8 @@ class ExtractAudioResourcePage(QWidget):
             main_window.show_page(AppConstants.ROUTE_EXTRACT_AUDIO)
             
             # 使用QTimer延迟设置文件路径，确保页面已经加载
-            QTimer.singleShot(100, lambda: self.set_file_to_extract_page(file_path))
+            if file_path:
+                QTimer.singleShot(100, lambda: self.set_file_to_extract_page(file_path))
 
     def navigate_to_audio_analysis_page(self, file_path: str):
         """跳转到音频分析页面"""
@@ -416,19 +628,16 @@ class ExtractAudioResourcePage(QWidget):
         except Exception as e:
             self.show_error_message(f"文件路径设置失败: {str(e)}")
 
-    def on_extraction_failed(self, error_message: str):
-        """提取失败处理"""
-        self.progress_bar.setVisible(False)
-        self.extract_button.setEnabled(True)
-        self.url_input.setEnabled(True)
-
-        # 隐藏处理按钮
-        self.button_widget.setVisible(False)
+    def on_extraction_failed(self, item_id: str, error_message: str):
+        """单个任务提取失败处理"""
+        self._refresh_row(item_id)
+        self._update_summary()
 
+        item = self.download_manager.get_item(item_id)
+        title = item.title if item else ""
         self.show_error_message(
-            f"{AppConstants.ONLINE_AUDIO_MSG_FAILED}\n{error_message}"
+            f"{AppConstants.ONLINE_AUDIO_MSG_FAILED}: {title}\n{error_message}"
         )
-        self.status_label.setText(AppConstants.ONLINE_AUDIO_MSG_FAILED)
 
     def show_success_message(self, message: str):
         """显示成功消息"""
@@ -456,7 +665,7 @@ class ExtractAudioResourcePage(QWidget):
 
     def closeEvent(self, event):
         """关闭事件处理"""
-        if self.worker and self.worker.isRunning():
-            self.worker.terminate()
-            self.worker.wait()
+        # 取消后.part文件会保留，下次下载同一视频时继续
+        self.download_manager.cancel_all()
+        self.download_manager.wait_all()
         event.accept()
@@ -8,8 +8,8 @@ from PyQt6.QtWidgets import (
     QWidget,
     QSizePolicy,
 )
-from PyQt6.QtCore import Qt, QEvent
-from qfluentwidgets import FluentIcon, NavigationItemPosition
+from PyQt6.QtCore import Qt, QEvent, QTimer
+from qfluentwidgets import FluentIcon, MessageBox, NavigationItemPosition
 
 from config.theme import ThemeConfig
 from config.core import AppConstants, Messages
@@ -18,6 +18,8 @@ from ui.title_bar import CustomTitleBar
 from pages import ExtractAudioPage
 from pages.audio_analysis_page import AudioAnalysisPage
 from pages import ExtractAudioResourcePage
+from core.async_project_manager import get_async_project_manager
+from core.project_retention import RetentionWorker
 
 
 class MainWindow(QMainWindow):
@@ -29,6 +31,8 @@ class MainWindow(QMainWindow):
         self.drag_position = None
         self.title_bar = None
         self.pages_cache = {}  # 页面缓存
+        self.retention_worker = None
+        self.retention_plan = None
 
         self.setup_window()
         self.setup_ui()
@@ -37,6 +41,67 @@ class MainWindow(QMainWindow):
         # 显示默认页面
         self.show_page(AppConstants.DEFAULT_PAGE)
 
+        # 启动后在后台检查项目工作空间，可清理的项目经用户确认后再删除
+        QTimer.singleShot(AppConstants.RETENTION_START_DELAY_MS, self.start_retention)
+
+    def start_retention(self, plan=None):
+        """
+        在后台执行项目保留策略
+
+        Args:
+            plan: 用户确认过的清理计划，为None时只生成计划
+        """
+        if self.retention_worker is not None:
+            return
+        self.retention_worker = RetentionWorker(get_async_project_manager().manager, plan=plan)
+        if plan is None:
+            self.retention_worker.plan_ready.connect(self.on_retention_plan_ready)
+        self.retention_worker.finished.connect(self.on_retention_finished)
+        self.retention_worker.start()
+
+    def on_retention_plan_ready(self, plan):
+        """保存清理计划，等线程结束后请用户确认"""
+        self.retention_plan = plan
+
+    def on_retention_finished(self):
+        """项目清理线程结束，有待清理项时请用户确认"""
+        self.retention_worker.deleteLater()
+        self.retention_worker = None
+        plan, self.retention_plan = self.retention_plan, None
+        if plan is None or not plan.candidates:
+            return
+        if self.confirm_retention(plan):
+            self.start_retention(plan)
+
+    def confirm_retention(self, plan) -> bool:
+        """
+        列出待清理项，请用户确认
+
+        Args:
+            plan: 清理计划
+
+        Returns:
+            用户是否确认清理
+        """
+        limit = AppConstants.RETENTION_CONFIRM_MAX_ITEMS
+        lines = [
+            f"• {candidate.name or candidate.path.name}"
+            f"（{AppConstants.RETENTION_REASON_LABELS.get(candidate.reason, candidate.reason)}，"
+            f"{candidate.reclaimable_bytes / (1024 * 1024):.1f} MB）"
+            for candidate in plan.candidates[:limit]
+        ]
+        if len(plan.candidates) > limit:
+            lines.append(
+                AppConstants.RETENTION_CONFIRM_MORE_TEMPLATE.format(count=len(plan.candidates))
+            )
+        content = AppConstants.RETENTION_CONFIRM_TEMPLATE.format(
+            count=len(plan.candidates),
+            size=plan.reclaimable_bytes / (1024 * 1024),
+            details="\n".join(lines),
+        )
+        msg_box = MessageBox(AppConstants.RETENTION_CONFIRM_TITLE, content, self)
+        return bool(msg_box.exec())
+
     def setup_window(self):
         """设置窗口属性"""
         self.setWindowTitle(AppConstants.APP_TITLE)
@@ -244,6 +309,9 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """窗口关闭事件"""
-        # 可以在这里添加关闭前的清理工作
+        # 停止后台清理，当前项目删除完成后退出
+        if self.retention_worker is not None:
+            self.retention_worker.requestInterruption()
+            self.retention_worker.wait()
         event.accept()
         super().closeEvent(event)
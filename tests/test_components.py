@@ -1,5 +1,6 @@
 """组件单元测试"""
 
+import os
 import unittest
 import time
 from unittest.mock import Mock, patch
@@ -11,7 +12,7 @@ from tests.utils import FileTestHelper, MockAPIHelper
 from pages.components.file_drop_area import FileDropArea
 from pages.components.refine_area import RefineArea
 from core.text_refine_worker import TextRefineWorker
-from core.state_manager import StateManager
+from core.state_manager import RefineState, StateManager
 from config.core import AppConstants
 
 
@@ -152,8 +153,8 @@ class TestTextRefineWorker(unittest.TestCase):
         self.assertEqual(worker.api_key, self.test_api_key, "API密钥设置错误")
         self.assertEqual(worker.api_url, self.test_api_url, "API URL设置错误")
     
-    @patch('requests.post')
-    def test_mock_api_request(self, mock_post):
+    @patch('core.text_refine_worker.get_llm_http_client')
+    def test_mock_api_request(self, mock_get_client):
         """测试模拟API请求"""
         # 模拟API响应
         mock_response = Mock()
@@ -165,7 +166,7 @@ class TestTextRefineWorker(unittest.TestCase):
                 }
             }]
         }
-        mock_post.return_value = mock_response
+        mock_get_client.return_value.post_json.return_value = mock_response
         
         # 创建工作线程
         worker = TextRefineWorker(
@@ -220,6 +221,83 @@ class TestStateManager(unittest.TestCase):
         reset_path = manager.state.file.path
         self.assertEqual(reset_path, "", "文件状态重置失败")
 
+    def test_progress_notifications_coalesced(self):
+        """测试高频进度更新按帧合并，只保留最新值"""
+        from PyQt6.QtWidgets import QApplication
+
+        app = QApplication.instance() or QApplication([])
+        manager = StateManager()
+        received, notified = [], []
+        manager.extract_progress_updated.connect(received.append)
+        manager.subscribe("extract", lambda: notified.append(manager.state.extract.progress))
+
+        manager.start_extract("base")
+        notified.clear()
+        for progress in range(100):
+            manager.update_extract_progress(progress)
+        # 进度0与开始时相同，不通知；1立即通知，其余合并
+        self.assertEqual(received, [1])
+
+        deadline = time.monotonic() + 1
+        while len(received) < 2 and time.monotonic() < deadline:
+            app.processEvents()
+        self.assertEqual(received, [1, 99])
+        self.assertEqual(notified, [1, 99])
+
+        stats = manager.get_progress_stats("extract")
+        self.assertEqual((stats.received, stats.emitted, stats.dropped), (100, 2, 98))
+        self.assertGreater(stats.emit_rate, 0)
+
+        # 完成前先发出尚未发出的进度
+        manager.update_extract_progress(50)
+        manager.update_extract_progress(60)
+        manager.complete_extract("文本")
+        self.assertEqual(received[-1], 60)
+
+    def test_selector_fires_only_on_field_change(self):
+        """测试字段订阅只在所选字段变化时回调"""
+        manager = StateManager()
+        texts, states = [], []
+        manager.select("extract.extracted_text", texts.append)
+        unsubscribe = manager.select(
+            ["refine.state", "refine.detected_domain"],
+            lambda state, domain: states.append((state, domain)),
+        )
+
+        manager.complete_extract("原文")
+        manager.set_api_key("key")
+        manager.update_refine_time(0)  # 值未变化
+        manager.start_refine()
+        manager.complete_refine("修复", "科技")
+        version = manager.get_version("refine.refined_text")
+        manager.fail_refine("")
+        unsubscribe()
+        manager.reset_refine()
+
+        self.assertEqual(texts, ["原文"])
+        self.assertEqual(
+            states,
+            [
+                (RefineState.PROCESSING, ""),
+                (RefineState.COMPLETED, "科技"),
+                (RefineState.ERROR, "科技"),
+            ],
+        )
+        self.assertEqual(manager.get_version("refine.refined_text"), version + 1)
+        with self.assertRaises(ValueError):
+            manager.select("extract.missing", print)
+
+        # 所属对象销毁后自动取消订阅
+        from PyQt6 import sip
+        from PyQt6.QtCore import QObject
+
+        owner, errors = QObject(), []
+        manager.select("extract.progress", errors.append, owner)
+        sip.delete(owner)
+        manager.start_extract()
+        manager.update_extract_progress(10)
+        self.assertEqual(errors, [])
+
 
 class TestMockAPIHelper(unittest.TestCase):
     """模拟API辅助类测试"""
@@ -265,5 +343,811 @@ class TestMockAPIHelper(unittest.TestCase):
             )
 
 
+class TestDownloadManagerHelpers(unittest.TestCase):
+    """下载管理器辅助函数测试"""
+
+    def test_parse_video_key(self):
+        """测试从链接解析视频ID"""
+        from core.download_manager import parse_video_key
+
+        self.assertEqual(
+            parse_video_key("https://www.youtube.com/watch?v=abc123&t=10"),
+            "youtube:abc123",
+        )
+        self.assertEqual(parse_video_key("https://youtu.be/abc123"), "youtube:abc123")
+        self.assertEqual(
+            parse_video_key("https://www.bilibili.com/video/BV1xx411c7mD"),
+            "bilibili:BV1xx411c7mD",
+        )
+        self.assertEqual(
+            parse_video_key("https://www.bilibili.com/video/BV1xx411c7mD?p=2"),
+            "bilibili:BV1xx411c7mD_p2",
+        )
+        self.assertEqual(parse_video_key("https://b23.tv/abcd"), "")
+
+    def test_is_playlist_url(self):
+        """测试播放列表链接识别"""
+        from core.download_manager import is_playlist_url
+
+        self.assertTrue(is_playlist_url("https://www.youtube.com/playlist?list=PL123"))
+        self.assertFalse(
+            is_playlist_url("https://www.youtube.com/watch?v=abc123&list=PL123")
+        )
+        self.assertFalse(is_playlist_url("https://www.bilibili.com/video/BV1xx411c7mD"))
+
+    def test_parse_section_time(self):
+        """测试片段时间解析"""
+        from core.download_manager import parse_section_time
+
+        self.assertIsNone(parse_section_time(""))
+        self.assertEqual(parse_section_time("90"), 90.0)
+        self.assertEqual(parse_section_time("1:30"), 90.0)
+        self.assertEqual(parse_section_time("1:00:05.5"), 3605.5)
+        with self.assertRaises(ValueError):
+            parse_section_time("1:xx")
+
+    def test_postprocessing_profiles(self):
+        """测试各音频格式配置生成的后处理器和FFmpeg参数"""
+        from core.download_manager import build_postprocessor_args, build_postprocessors
+
+        # 原始音频不转码
+        native = AppConstants.ONLINE_AUDIO_PROFILE_NATIVE
+        self.assertEqual(build_postprocessors(native), [])
+        self.assertEqual(build_postprocessor_args(native), {})
+
+        mp3 = AppConstants.ONLINE_AUDIO_PROFILE_MP3
+        self.assertEqual(
+            build_postprocessors(mp3),
+            [{
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "mp3",
+                "preferredquality": AppConstants.ONLINE_AUDIO_MP3_QUALITY,
+            }],
+        )
+        self.assertEqual(build_postprocessor_args(mp3), {})
+
+        # WAV直接输出16kHz单声道
+        wav = AppConstants.ONLINE_AUDIO_PROFILE_WAV_16K
+        self.assertEqual(
+            build_postprocessors(wav),
+            [{"key": "FFmpegExtractAudio", "preferredcodec": "wav"}],
+        )
+        self.assertEqual(
+            build_postprocessor_args(wav),
+            {"extractaudio+ffmpeg_o": ["-ar", "16000", "-ac", "1"]},
+        )
+        self.assertEqual(AppConstants.ONLINE_AUDIO_PROFILE_DEFAULT, native)
+
+    @patch("core.download_manager.PlaylistResolveWorker")
+    def test_playlist_keeps_submitted_options_and_honours_cancel(self, mock_resolver):
+        """测试播放列表沿用提交时的时间段和格式，取消后丢弃解析结果"""
+        import tempfile
+        from core.download_manager import DownloadManager, DownloadStatus, build_download_key
+
+        self.assertNotEqual(
+            build_download_key("youtube:abc", AppConstants.ONLINE_AUDIO_PROFILE_NATIVE),
+            build_download_key("youtube:abc", AppConstants.ONLINE_AUDIO_PROFILE_MP3),
+        )
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            manager = DownloadManager(output_dir)
+            manager._start_item = Mock()
+            playlist = "https://www.youtube.com/playlist?list=PL123"
+
+            manager.section = (0.0, 30.0)
+            manager.profile = AppConstants.ONLINE_AUDIO_PROFILE_MP3
+            manager.add_urls([playlist])
+            placeholder = manager.items[0]
+            # 解析期间修改输入不影响已提交的播放列表
+            manager.section = None
+            manager.profile = AppConstants.ONLINE_AUDIO_PROFILE_NATIVE
+            manager._on_playlist_resolved(
+                placeholder.item_id, [("https://youtu.be/abc", "a")]
+            )
+            entry = manager.items[0]
+            self.assertEqual(entry.section, (0.0, 30.0))
+            self.assertEqual(entry.profile, AppConstants.ONLINE_AUDIO_PROFILE_MP3)
+
+            manager.add_urls([playlist])
+            placeholder = manager.items[-1]
+            manager.cancel_all()
+            self.assertEqual(placeholder.status, DownloadStatus.CANCELLED)
+            manager._on_playlist_resolved(
+                placeholder.item_id, [("https://youtu.be/xyz", "x")]
+            )
+            self.assertEqual(len(manager.items), 2)
+
+
+class TestTranscriptFormat(unittest.TestCase):
+    """转录文本格式测试"""
+
+    def test_parse_subtitle_removes_rolling_duplicates(self):
+        """测试自动字幕滚动重复行被去除"""
+        from core.transcript_format import parse_subtitle
+
+        content = (
+            "WEBVTT\n\n"
+            "00:00:00.000 --> 00:00:02.000\n第一句\n\n"
+            "00:00:02.000 --> 00:00:04.500\n第一句\n<c>第二句</c>\n"
+        )
+        segments = parse_subtitle(content)
+
+        self.assertEqual([s.text for s in segments], ["第一句", "第二句"])
+        self.assertAlmostEqual(segments[1].end, 4.5)
+
+    def test_format_segments_srt(self):
+        """测试片段渲染为SRT格式"""
+        from core.transcript_format import TranscriptSegment, format_segments
+
+        text = format_segments(
+            [TranscriptSegment(61.5, 62.0, " 你好 ")], AppConstants.OUTPUT_FORMAT_SRT
+        )
+        self.assertEqual(text, "1\n00:01:01,500 --> 00:01:02,000\n你好\n")
+
+    def test_export_segments_streams_json_and_tsv(self):
+        """测试从片段流式导出JSON和TSV文件"""
+        import json
+        import tempfile
+        from core.transcript_format import TranscriptSegment, export_segments
+
+        segments = [TranscriptSegment(0.0, 1.25, "你好", 0.5), TranscriptSegment(2.0, 3.0, "a\tb")]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_path = export_segments(
+                segments, AppConstants.OUTPUT_FORMAT_JSON, os.path.join(temp_dir, "out.json")
+            )
+            with open(json_path, encoding="utf-8") as f:
+                items = json.load(f)
+            tsv_path = export_segments(
+                segments, AppConstants.OUTPUT_FORMAT_TSV, os.path.join(temp_dir, "out.tsv")
+            )
+            with open(tsv_path, encoding="utf-8") as f:
+                rows = f.read().splitlines()
+
+        self.assertEqual(items[0], {"start": 0.0, "end": 1.25, "text": "你好", "confidence": 0.5})
+        self.assertEqual(rows, ["start\tend\ttext", "0\t1250\t你好", "2000\t3000\ta b"])
+
+
+class TestTextChunker(unittest.TestCase):
+    """文案分段测试"""
+
+    def test_split_respects_budget_and_boundaries(self):
+        """测试按段落边界切分且每段不超出预算"""
+        from core.text_chunker import estimate_tokens, split_text_into_chunks
+
+        paragraphs = [f"第{i}段。" + "内容" * 40 for i in range(10)]
+        text = "\n\n".join(paragraphs)
+        chunks = split_text_into_chunks(text, 100)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(estimate_tokens(chunk) <= 100 for chunk in chunks))
+        self.assertEqual("\n\n".join(chunks), text)
+
+    def test_truncation_risk_for_oversized_chunk(self):
+        """测试预计输出超过max_tokens时给出截断提示"""
+        from core.text_chunker import find_truncation_risks
+        from core.token_counter import estimate_tokens_by_ratio
+
+        self.assertEqual(estimate_tokens_by_ratio("中文abc"), 3)
+        risks = find_truncation_risks(["短", "长" * 5000], 2000)
+        self.assertEqual([index for index, _ in risks], [2])
+
+    def test_worker_reassembles_chunks_in_order(self):
+        """测试并行修复后按原顺序拼接"""
+        worker = TextRefineWorker(
+            "甲\n乙\n丙", TestConfig.MOCK_API_KEY, chunk_token_budget=1, use_cache=False
+        )
+        worker.request_completion = lambda messages, index=1: f"[{messages[-1]['content']}]"
+        refined = []
+        worker.text_refined.connect(refined.append)
+        worker.run()
+
+        self.assertEqual(refined, ["[甲]\n[乙]\n[丙]"])
+
+    @patch('core.text_refine_worker.get_llm_http_client')
+    def test_worker_streams_deltas(self, mock_get_client):
+        """测试流式响应逐段发出增量"""
+        from unittest.mock import MagicMock
+        from PyQt6.QtWidgets import QApplication
+
+        app = QApplication.instance() or QApplication([])
+
+        response = MagicMock()
+        response.status_code = 200
+        response.__enter__.return_value = response
+        response.iter_lines.return_value = [
+            ": keep-alive",
+            'data: {"choices": [{"delta": {"content": "你"}}]}',
+            "",
+            'data: {"choices": [{"delta": {"content": "好"}, "finish_reason": "stop"}]}',
+            'data: {"choices": [], "usage": {"prompt_tokens": 80, '
+            '"prompt_cache_hit_tokens": 64, "completion_tokens": 2}}',
+            "data: [DONE]",
+        ]
+        mock_get_client.return_value.post_json.return_value = response
+
+        worker = TextRefineWorker(
+            "你号",
+            TestConfig.MOCK_API_KEY,
+            stream=True,
+            use_cache=False,
+        )
+        deltas, refined, usages = [], [], []
+        worker.text_delta.connect(lambda index, delta: deltas.append((index, delta)))
+        worker.text_refined.connect(refined.append)
+        worker.usage_updated.connect(lambda *usage: usages.append(usage))
+        worker.run()
+        # 增量信号在线程池中发出，需处理排队的事件
+        app.processEvents()
+
+        self.assertEqual(deltas, [(0, "你"), (0, "好")])
+        self.assertEqual(refined, ["你好"])
+        self.assertEqual(usages, [(80, 64, 2)])
+        payload = mock_get_client.return_value.post_json.call_args[0][2]
+        self.assertTrue(payload["stream_options"]["include_usage"])
+
+    def test_patch_mode_applies_edits_and_falls_back(self):
+        """测试修改列表在本地应用，无法定位时改为请求全文"""
+        import json
+        from core.edit_patch import PatchValidationError, TextEdit, apply_edits
+
+        self.assertEqual(
+            apply_edits("他在北京工做，在北京生活", [TextEdit("工做", "工作")]),
+            "他在北京工作，在北京生活",
+        )
+        with self.assertRaises(PatchValidationError):
+            apply_edits("在北京，在北京", [TextEdit("在北京", "在上海")])
+
+        requests_made = []
+
+        def request_completion(messages, index=1, json_output=False):
+            requests_made.append(json_output)
+            if json_output:
+                edits = [{"original": "不存在的片段", "replacement": "x"}]
+                if "工做" in messages[-1]["content"]:
+                    edits = [{"original": "工做", "replacement": "工作"}]
+                return json.dumps({"domain": "生活", "edits": edits}, ensure_ascii=False)
+            return "全文修复"
+
+        worker = TextRefineWorker(
+            "他在工做", TestConfig.MOCK_API_KEY, use_cache=False, patch_mode=True
+        )
+        worker.request_completion = request_completion
+        self.assertEqual(worker.detect_domain_and_refine("他在工做"), ("生活", "他在工作"))
+        self.assertEqual(worker.detect_domain_and_refine("其他")[1], "全文修复")
+        self.assertEqual(requests_made, [True, True, False])
+
+        # 两种模式的缓存互不命中
+        import tempfile
+        from pathlib import Path
+        from core.refine_cache import RefineCache
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = RefineCache(Path(cache_dir))
+            for patch_mode, expected in ((False, "全文修复"), (True, "他在工作")):
+                worker = TextRefineWorker(
+                    "他在工做", TestConfig.MOCK_API_KEY, cache=cache, patch_mode=patch_mode
+                )
+                worker.request_completion = request_completion
+                self.assertEqual(worker.detect_domain_and_refine("他在工做")[1], expected)
+            self.assertEqual(cache.hits, 0)
+
+    def test_incremental_refine_only_changed_paragraphs(self):
+        """测试只重新修复修改过的段落，并拼回上次的修复结果"""
+        from core.incremental_refine import plan_incremental_refine
+
+        source = "第一段\n\n第二段\n\n第三段"
+        refined = "第一段。\n\n第二段。\n\n第三段。"
+        edited = "第一段\n\n第二段改\n\n新增段\n\n第三段"
+        reused = plan_incremental_refine(source, refined, edited)
+        self.assertEqual(reused, {0: "第一段。", 3: "第三段。"})
+        # 修复结果调整了分段时无法对应，需完整修复
+        self.assertIsNone(plan_incremental_refine(source, "第一段。第二段。\n\n第三段。", edited))
+        # 合并一段又拆分另一段，段落数不变但无法对应，同样完整修复
+        source = "今天天气很好\n\n我们去公园\n\n公园里有很多人在散步和跑步\n\n然后回家"
+        refined = "今天天气很好，我们去公园。\n\n公园里有很多人。\n\n在散步和跑步。\n\n然后回家。"
+        self.assertIsNone(plan_incremental_refine(source, refined, source + "\n\n新增段"))
+
+        requested = []
+        worker = TextRefineWorker(
+            edited, TestConfig.MOCK_API_KEY, use_cache=False, reused_paragraphs=reused
+        )
+
+        def request_completion(messages, index=1):
+            requested.append(messages[-1]["content"])
+            return messages[-1]["content"] + "！"
+
+        worker.request_completion = request_completion
+        results = []
+        worker.text_refined.connect(results.append)
+        worker.run()
+
+        self.assertEqual(requested, ["第二段改\n\n新增段"])
+        self.assertEqual(results, ["第一段。\n\n第二段改\n\n新增段！\n\n第三段。"])
+
+        # 末尾只多了空白段落时无需请求，空白原样保留
+        source = "第一段内容很长。\n\n第二段内容。"
+        edited = source + "\n\n"
+        reused = plan_incremental_refine(source, source, edited)
+        self.assertEqual(reused, {0: "第一段内容很长。", 1: "第二段内容。"})
+        worker = TextRefineWorker(
+            edited, TestConfig.MOCK_API_KEY, use_cache=False, reused_paragraphs=reused
+        )
+        worker.request_completion = request_completion
+        results, errors = [], []
+        worker.text_refined.connect(results.append)
+        worker.error_occurred.connect(errors.append)
+        requested.clear()
+        worker.run()
+        self.assertEqual((requested, errors, results), ([], [], [edited]))
+
+    def test_prompt_builder_stable_prefix(self):
+        """测试术语顺序不同时系统前缀保持一致，文案只出现在最后的user消息中"""
+        from core.prompt_builder import RefinePromptBuilder, parse_glossary
+
+        first = RefinePromptBuilder(glossary=parse_glossary("微调，DeepSeek、Transformer"))
+        second = RefinePromptBuilder(glossary=["Transformer", "DeepSeek", "微调", "微调"])
+        self.assertEqual(first.system_prefix, second.system_prefix)
+        self.assertTrue(first.system_prefix.startswith(AppConstants.DEEPSEEK_SYSTEM_PROMPT))
+
+        messages = first.build_messages("待修复文案")
+        self.assertEqual([m["role"] for m in messages], ["system", "user"])
+        self.assertEqual(messages[0]["content"], first.system_prefix)
+        self.assertEqual(messages[1]["content"], "待修复文案")
+
+
+    def test_cached_chunks_skip_request(self):
+        """测试未变化的分段命中缓存，不再请求"""
+        import tempfile
+        from pathlib import Path
+        from core.refine_cache import RefineCache, make_cache_key
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = RefineCache(Path(cache_dir), max_entries=2)
+            requested = []
+
+            def run_worker(text):
+                worker = TextRefineWorker(
+                    text, TestConfig.MOCK_API_KEY, chunk_token_budget=1, cache=cache
+                )
+
+                def request_completion(messages, index=1):
+                    text = messages[-1]["content"]
+                    requested.append(text)
+                    return text.upper()
+
+                worker.request_completion = request_completion
+                refined = []
+                worker.text_refined.connect(refined.append)
+                worker.run()
+                return refined[0]
+
+            self.assertEqual(run_worker("a\nb"), "A\nB")
+            self.assertEqual(run_worker("a\nc"), "A\nC")
+            self.assertEqual(sorted(requested), ["a", "b", "c"])
+            self.assertEqual(cache.hits, 1)
+            # 超出条目上限时淘汰最久未使用的 b
+            self.assertIsNone(
+                cache.get(make_cache_key("b", AppConstants.DEEPSEEK_SYSTEM_PROMPT))
+            )
+
+
+class TestLLMHttpClient(unittest.TestCase):
+    """大模型HTTP客户端测试"""
+
+    def test_connection_reused_between_requests(self):
+        """测试连续请求复用同一长连接"""
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from core.llm_http_client import LLMHttpClient, LLMRequestMetrics
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                body = json.dumps({"choices": [{}]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = LLMHttpClient()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/chat"
+            reused = []
+            for _ in range(3):
+                metrics = LLMRequestMetrics()
+                response = client.post_json(url, "key", {"messages": []}, metrics=metrics)
+                self.assertEqual(response.json(), {"choices": [{}]})
+                reused.append(metrics.reused_connection)
+            self.assertEqual(client.stats.request_count, 3)
+            self.assertEqual(client.stats.new_connections, 1)
+            self.assertEqual(reused, [False, True, True])
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_connectivity_probe_cached(self):
+        """测试连通性检查请求模型列表，有效期内重复检查不再请求"""
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from core.connectivity_checker import ConnectivityChecker, clear_connectivity_cache
+        from core.llm_http_client import reset_llm_http_client
+
+        paths = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                paths.append(self.path)
+                body = b'{"object": "list", "data": []}'
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        clear_connectivity_cache()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/models"
+            results = []
+            for _ in range(2):
+                checker = ConnectivityChecker("key", url)
+                checker.check_completed.connect(lambda: results.append("ok"))
+                checker.timings_measured.connect(
+                    lambda connect, ttfb, reused, age: results.append(age > 0)
+                )
+                checker.run()
+
+            self.assertEqual(paths, ["/models"])
+            self.assertEqual(results, [False, "ok", True, "ok"])
+            # 命中缓存的检查没有发出请求，耗时指标保持初始值
+            self.assertEqual(checker._metrics.total_time, 0.0)
+        finally:
+            clear_connectivity_cache()
+            reset_llm_http_client()
+            server.shutdown()
+            server.server_close()
+
+
+class TestLLMRequestScheduler(unittest.TestCase):
+    """大模型请求调度器测试"""
+
+    def test_retry_after_and_circuit_breaker(self):
+        """测试限流按Retry-After重试，持续服务端错误时熔断"""
+        from core.llm_request_scheduler import (
+            CircuitBreaker,
+            CircuitOpenError,
+            LLMHTTPError,
+            LLMRequestScheduler,
+        )
+
+        scheduler = LLMRequestScheduler(
+            base_delay=0.01,
+            max_delay=0.01,
+            circuit_breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60),
+        )
+        self.assertEqual(scheduler.compute_delay(1, "0"), 0.0)
+
+        responses = [LLMHTTPError(429, "busy", "0"), "ok"]
+
+        def send():
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self.assertEqual(scheduler.run("key", send), "ok")
+
+        def fail():
+            raise LLMHTTPError(503, "down")
+
+        with self.assertRaises(LLMHTTPError):
+            scheduler.run("key", fail, max_retries=1)
+        with self.assertRaises(CircuitOpenError):
+            scheduler.run("key", fail)
+
+
+
+class TestProjectManager(unittest.TestCase):
+    """项目管理器测试"""
+
+    def setUp(self):
+        import tempfile
+        from pathlib import Path
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.temp_dir.name) / "projects"
+        self.audio_file = Path(self.temp_dir.name) / "audio.wav"
+        self.audio_file.write_bytes(b"RIFF" + b"\0" * 64)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_index_queries_and_rebuild(self):
+        """测试索引随增删改更新，支持筛选分页，并可从磁盘重建"""
+        from core.project_manager import AudioProjectManager
+
+        manager = AudioProjectManager(str(self.workspace))
+        ids = [manager.create_project(f"项目{i}", str(self.audio_file)) for i in range(5)]
+        manager.update_project(ids[0], status="analyzed", name="100%_done")
+        manager.delete_project(ids[1])
+
+        self.assertEqual(manager.count_projects(), 4)
+        self.assertEqual(manager.list_projects()[0].id, ids[0])
+        self.assertEqual([p.id for p in manager.list_projects(status="analyzed")], [ids[0]])
+        self.assertEqual(len(manager.list_projects(name_contains="%_")), 1)
+        self.assertEqual(len(manager.list_projects(limit=2, offset=3)), 1)
+
+        # 删除索引文件后重新打开，从磁盘重建
+        (self.workspace / AppConstants.PROJECT_INDEX_FILE_NAME).unlink()
+        rebuilt = AudioProjectManager(str(self.workspace))
+        self.assertEqual(
+            sorted(p.id for p in rebuilt.list_projects()), sorted(set(ids) - {ids[1]})
+        )
+
+    def test_duplicate_audio_stored_once(self):
+        """测试相同音频只存一份，最后一个引用的项目删除后回收"""
+        from core.project_manager import AudioProjectManager
+
+        manager = AudioProjectManager(str(self.workspace))
+        first = manager.create_project("a", str(self.audio_file))
+        second = manager.create_project("b", str(self.audio_file))
+        digest = manager.get_project(first).audio_blob
+
+        self.assertEqual(digest, manager.get_project(second).audio_blob)
+        self.assertEqual(manager.get_audio_path(second).read_bytes(), self.audio_file.read_bytes())
+        blob = manager.blobs.blob_path(digest)
+        self.assertEqual([p for p in blob.parent.iterdir()], [blob])
+        self.assertEqual(list((manager.blobs.root / AppConstants.BLOB_TEMP_DIR_NAME).iterdir()), [])
+
+        # 新文件边复制边计算哈希，只读取一遍
+        other_file = self.audio_file.with_name("other.wav")
+        other_file.write_bytes(b"RIFF" + b"\1" * 64)
+        reported = []
+        manager.blobs.put(str(other_file), lambda done, total: reported.append(done))
+        self.assertEqual(reported, [other_file.stat().st_size])
+
+        manager.delete_project(first)
+        self.assertTrue(blob.exists())
+        manager.delete_project(second)
+        self.assertFalse(blob.exists())
+
+    def test_metadata_updates_coalesced(self):
+        """测试连续更新只在合并窗口结束时写一次，外部修改能被检测到"""
+        import json
+        from core.metadata_store import get_metadata_store
+        from core.project_manager import AudioProjectManager
+
+        manager = AudioProjectManager(str(self.workspace))
+        project_id = manager.create_project("a", str(self.audio_file))
+        metadata_file = manager.get_project_dir(project_id) / "metadata.json"
+        mtime = metadata_file.stat().st_mtime_ns
+
+        for count in range(1, 4):
+            manager.update_project(project_id, speakers_count=count)
+        self.assertEqual(manager.get_project(project_id).speakers_count, 3)
+        self.assertEqual(metadata_file.stat().st_mtime_ns, mtime)
+        # 索引不比文件新，落盘后才更新
+        self.assertEqual(manager.list_projects()[0].speakers_count, 0)
+
+        get_metadata_store().flush()
+        self.assertEqual(json.loads(metadata_file.read_text("utf-8"))["speakers_count"], 3)
+        self.assertEqual(manager.list_projects()[0].speakers_count, 3)
+
+        # 状态立即写入文件和索引
+        manager.update_project(project_id, status="analyzed")
+        self.assertEqual(json.loads(metadata_file.read_text("utf-8"))["status"], "analyzed")
+        self.assertEqual(manager.list_projects(status="analyzed")[0].id, project_id)
+        self.assertEqual(
+            [p.name for p in metadata_file.parent.iterdir() if p.suffix == ".tmp"], []
+        )
+
+        # 外部修改文件后缓存失效
+        data = json.loads(metadata_file.read_text("utf-8"))
+        data["name"] = "外部修改的名称"
+        metadata_file.write_text(json.dumps(data, ensure_ascii=False), "utf-8")
+        self.assertEqual(manager.get_project(project_id).name, "外部修改的名称")
+
+    def test_archive_stores_media_and_validates_manifest(self):
+        """测试导出时媒体文件不压缩、带清单，清单不一致的压缩包拒绝导入"""
+        import zipfile
+        from core.project_archive import ArchiveValidationError
+        from core.project_manager import AudioProjectManager
+
+        manager = AudioProjectManager(str(self.workspace))
+        project_id = manager.create_project("a", str(self.audio_file))
+        archive_path = str(self.workspace.parent / "export.zip")
+        audio_path = manager.get_audio_path(project_id)
+        grown = []
+
+        def grow_audio(done, total):
+            # 导出期间文件被改写，清单记录实际写入的大小
+            if not grown:
+                grown.append(done)
+                with open(audio_path, "ab") as f:
+                    f.write(b"\0" * 16)
+
+        manager.export_project(project_id, archive_path, grow_audio)
+        self.assertTrue(grown)
+        self.assertIsNotNone(manager.import_project(archive_path))
+
+        with zipfile.ZipFile(archive_path) as archive:
+            infos = archive.infolist()
+            self.assertEqual(infos[-1].filename, AppConstants.PROJECT_ARCHIVE_MANIFEST_NAME)
+            compress_types = {info.filename: info.compress_type for info in infos}
+        self.assertEqual(compress_types["original_audio.wav"], zipfile.ZIP_STORED)
+        self.assertEqual(compress_types["metadata.json"], zipfile.ZIP_DEFLATED)
+
+        # 追加清单外的文件后导入失败，且不留下项目目录
+        with zipfile.ZipFile(archive_path, "a") as archive:
+            archive.writestr("extra.txt", "x")
+        dirs_before = sorted(self.workspace.iterdir())
+        with self.assertRaises(ArchiveValidationError):
+            manager.import_project(archive_path)
+        self.assertEqual(sorted(self.workspace.iterdir()), dirs_before)
+
+    def test_segment_store_lookup_and_recovery(self):
+        """测试片段存储的追加、按时间查找、搜索和中途写入的恢复"""
+        from core.project_manager import AudioProjectManager
+        from core.transcript_format import TranscriptSegment
+
+        manager = AudioProjectManager(str(self.workspace))
+        project_id = manager.create_project("a", str(self.audio_file))
+        store = manager.get_segment_store(project_id)
+        store.extend(
+            TranscriptSegment(i * 2.0, i * 2.0 + 1.5, f"第{i}句", 0.5) for i in range(100)
+        )
+        store.append(200.0, 201.0, "未落盘前退出")
+        store.close()
+
+        # 模拟最后一个片段的偏移只写入了一半
+        offsets_file = store.directory / "offsets.bin"
+        offsets_file.write_bytes(offsets_file.read_bytes()[:-3])
+
+        reopened = manager.get_segment_store(project_id)
+        self.assertEqual(len(reopened), 100)
+        self.assertEqual(reopened[10], TranscriptSegment(20.0, 21.5, "第10句", 0.5))
+        self.assertEqual(reopened.index_at(21.0), 10)
+        self.assertIsNone(reopened.index_at(21.7))
+        self.assertEqual([s.text for s in reopened.between(3.0, 6.5)], ["第1句", "第2句", "第3句"])
+        self.assertEqual(reopened.search("第9"), [9] + list(range(90, 100)))
+
+        reopened.append(198.5, 199.0, "续写")
+        with self.assertRaises(ValueError):
+            reopened.append(1.0, 2.0, "乱序")
+        reopened.close()
+        self.assertEqual(manager.get_segment_store(project_id)[-1].text, "续写")
+
+        # 重叠的片段：较长的早期片段仍覆盖之后较短片段结束后的时间
+        overlapping = manager.get_segment_store(manager.create_project("b", str(self.audio_file)))
+        overlapping.extend(
+            [
+                TranscriptSegment(0.0, 10.0, "长句", 0.5),
+                TranscriptSegment(2.0, 3.0, "插话", 0.5),
+                TranscriptSegment(4.0, 5.0, "再插话", 0.5),
+            ]
+        )
+        self.assertEqual(
+            [overlapping.index_at(t) for t in (1.0, 2.5, 3.5, 4.5, 9.0, 10.0)],
+            [0, 1, 0, 2, 0, None],
+        )
+        overlapping.close()
+
+    def test_retention_policy_plan_and_apply(self):
+        """测试保留策略清理过期项目和不完整目录，保留固定的项目"""
+        from core.project_manager import AudioProjectManager
+        from core.project_retention import RetentionEngine, RetentionPolicy, RetentionWorker
+
+        manager = AudioProjectManager(str(self.workspace))
+        expired = manager.create_project("过期", str(self.audio_file))
+        pinned = manager.create_project("固定", str(self.audio_file))
+        self.assertTrue(manager.set_pinned(pinned, True))
+        done = manager.create_project("完成", str(self.audio_file))
+        manager.update_project(done, status="transcribed")
+
+        # 创建中途失败留下的目录
+        orphan = self.workspace / "half-created"
+        (orphan / "speakers").mkdir(parents=True)
+        (orphan / "original_audio.wav").write_bytes(b"\0" * 100)
+        os.utime(orphan, (0, 0))
+
+        policy = RetentionPolicy(max_age_days={"created": 0}, grace_seconds=0)
+        engine = RetentionEngine(manager, policy)
+        plan = engine.plan()
+        self.assertEqual(
+            [(c.reason, c.project_id, c.name) for c in plan.candidates],
+            [("orphan", "", "half-created"), ("expired", expired, "过期")],
+        )
+        self.assertEqual(plan.reclaimable_bytes, 100 + plan.candidates[1].reclaimable_bytes)
+
+        # 后台线程默认只报告计划，不删除
+        plans = []
+        worker = RetentionWorker(manager, policy)
+        worker.plan_ready.connect(plans.append)
+        worker.run()
+        self.assertEqual(len(plans[0].candidates), 2)
+        self.assertTrue(orphan.exists())
+        self.assertIsNotNone(manager.get_project(expired))
+
+        # 计划生成后被固定的项目不删除
+        self.assertTrue(manager.set_pinned(expired, True))
+        engine.apply(plan)
+        self.assertFalse(orphan.exists())
+        self.assertIsNotNone(manager.get_project(expired))
+
+        manager.set_pinned(expired, False)
+        engine.apply(engine.plan())
+        self.assertEqual(sorted(p.id for p in manager.list_projects()), sorted([pinned, done]))
+
+        # 超出容量上限时从最旧的未固定项目开始清理
+        quota_plan = RetentionEngine(
+            manager, RetentionPolicy(max_total_bytes=1, grace_seconds=0)
+        ).plan()
+        self.assertEqual([c.project_id for c in quota_plan.candidates], [done])
+
+    def test_async_export_import_with_progress(self):
+        """测试在线程池中导出、导入项目，报告进度并支持取消"""
+        from PyQt6.QtWidgets import QApplication
+        from core.async_project_manager import AsyncProjectManager
+        from core.project_manager import AudioProjectManager
+
+        app = QApplication.instance() or QApplication([])
+        async_manager = AsyncProjectManager(AudioProjectManager(str(self.workspace)))
+        self.addCleanup(async_manager.shutdown)
+
+        results, progress = [], []
+        task = async_manager.create_project_async("a", str(self.audio_file))
+        task.progress_updated.connect(lambda done, total: progress.append((done, total)))
+        task.finished.connect(results.append)
+        self.assertIsNone(task.future)  # 连接信号前不会执行
+        project_id = task.start().future.result()
+        app.processEvents()
+        self.assertEqual(results, [project_id])
+        self.assertEqual(progress[-1][0], progress[-1][1])
+
+        archive = str(self.workspace.parent / "export")
+        self.assertTrue(
+            async_manager.export_project_async(project_id, archive).start().future.result()
+        )
+        imported = async_manager.import_project_async(archive + ".zip").start().future.result()
+
+        # 立即结束的任务在启动前连接信号，结果不会丢失
+        results = []
+        task = async_manager.import_project_async(archive + ".missing.zip")
+        task.finished.connect(results.append)
+        self.assertIsNone(task.start().future.result())
+        app.processEvents()
+        self.assertEqual(results, [None])
+        self.assertEqual(
+            async_manager.manager.get_audio_path(imported).read_bytes(),
+            self.audio_file.read_bytes(),
+        )
+
+        # 取消后抛出InterruptedError，不留下项目
+        other_audio = self.workspace.parent / "other.wav"
+        other_audio.write_bytes(b"RIFF" + b"\1" * 64)
+        with self.assertRaises(InterruptedError):
+            async_manager.manager.create_project(
+                "b", str(other_audio), should_cancel=lambda: True
+            )
+        self.assertEqual(async_manager.manager.count_projects(), 2)
+        self.assertEqual(len([p for p in self.workspace.iterdir() if p.is_dir()]), 3)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file